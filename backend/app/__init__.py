@@ -16,7 +16,8 @@ from flask_login import LoginManager
 
 db = SQLAlchemy()
 migrate = Migrate()
-cache = Cache()
+# Not named `cache`: that would be rebound by importing the app.cache submodule
+flask_cache = Cache()
 login_manager = LoginManager()
 
 def create_app():
@@ -56,13 +57,60 @@ def create_app():
         ]
     )
 
-    cache.init_app(app)
+    flask_cache.init_app(app)
+    from app.cache import start_invalidation_listener
+    start_invalidation_listener()
     db.init_app(app)
     migrate.init_app(app, db)
     register_blueprints(app)
 
+    from app.suggest import start_suggest_index
+    start_suggest_index(app)
+
+    from app.jobs import jobs_cli
+    from app.warmup import cache_cli
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(cache_cli)
+
     return app
 
+def create_async_app():
+    """
+    ASGI entry point for the asyncio serving mode (see asgi.py). The summary and
+    learning-path endpoints are handled by a Quart app with non-blocking
+    Wikipedia/Anthropic clients; every other request falls through to the
+    regular Flask app, run in a thread pool.
+    """
+    import re
+    from quart import Quart
+    from quart_cors import cors
+    from hypercorn.middleware import AsyncioWSGIMiddleware
+    from werkzeug.exceptions import HTTPException
+
+    flask_app = create_app()
+
+    from app.async_retrieval import init_async_retrieval
+    from app.async_routes import async_main
+    init_async_retrieval(flask_app)
+
+    # Same policy as CORS(app, supports_credentials=True) on the Flask app: any
+    # origin is echoed back, with credentials allowed
+    quart_app = cors(Quart(__name__), allow_origin=re.compile(".*"), allow_credentials=True)
+    quart_app.config["SECRET_KEY"] = flask_app.config["SECRET_KEY"]
+    quart_app.register_blueprint(async_main)
+    async_urls = quart_app.url_map.bind("localhost")
+    wsgi_fallback = AsyncioWSGIMiddleware(flask_app)
+
+    async def asgi_app(scope, receive, send):
+        if scope["type"] == "http":
+            try:
+                async_urls.match(scope["path"], method=scope["method"])
+            except HTTPException:
+                return await wsgi_fallback(scope, receive, send)
+        return await quart_app(scope, receive, send)
+
+    return asgi_app
+
 @login_manager.user_loader
 def load_user(user_id):
     from app.database import get_user_by_id
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+
+import httpx
+import anthropic
+
+from app.content_retrieval import (
+    find_canonical_topic,
+    fuzzy_canonical_topic,
+    find_article_text,
+    find_article_links,
+    find_summary,
+    find_learning_path,
+    save_summaries,
+    summary_flight_key,
+    save_learning_path,
+    local_learning_path
+)
+from app.cache import (
+    get_learning_path_from_cache,
+    get_negative_topic_from_cache,
+    store_negative_topic_in_cache,
+    NEGATIVE_MISSING,
+    NEGATIVE_ERROR
+)
+from app.freshness import revalidate
+from app.llm import summarize_level_async, rank_learning_path_async
+from app.ranking import prefilter_links
+from app.singleflight import single_flight_async
+from app.utils import normalize_topic
+from app.wiki_client import async_wiki_get, get_latest_revision_async
+from app.wikipedia import (
+    stored_revision,
+    reuse_stored_article,
+    parse_page_params,
+    extract_parsed_page,
+    parse_failure_reason,
+    store_parsed_page,
+    needs_link_top_up,
+    page_links_params,
+    parse_page_links,
+    merge_links
+)
+
+logger = logging.getLogger(__name__)
+
+_flask_app = None
+
+
+def init_async_retrieval(flask_app):
+    """Remember the Flask app whose context the blocking cache/DB helpers need."""
+    global _flask_app
+    _flask_app = flask_app
+
+
+async def run_sync(fn, *args):
+    """
+    Run a blocking cache/DB helper in a worker thread inside the Flask app
+    context, so it never stalls the event loop.
+    """
+    def call():
+        with _flask_app.app_context():
+            return fn(*args)
+    return await asyncio.to_thread(call)
+
+
+async def get_wiki_html_async(topic):
+    try:
+        # Only a stored article can be revalidated; without one, go straight to
+        # the parse request, which reports the revision itself
+        if await run_sync(stored_revision, topic):
+            canonical_title, revid = await get_latest_revision_async(topic)
+            if not canonical_title:
+                logger.warning(f"Wikipedia page not found for '{topic}'")
+                await run_sync(store_negative_topic_in_cache, topic, NEGATIVE_MISSING)
+                return None
+
+            if await run_sync(reuse_stored_article, topic, canonical_title, revid):
+                return canonical_title
+
+        data = await async_wiki_get(parse_page_params(topic))
+        # HTML extraction is CPU-bound, so keep it off the event loop too
+        page = await asyncio.to_thread(extract_parsed_page, topic, data)
+        if not page:
+            await run_sync(store_negative_topic_in_cache, topic, parse_failure_reason(data))
+            return None
+
+        if needs_link_top_up(page["links"]):
+            try:
+                extra_links = parse_page_links(await async_wiki_get(page_links_params(page["title"])))
+            except (httpx.HTTPError, ValueError) as e:
+                logger.error(f"Wikipedia links query failed for '{page['title']}': {e}")
+                extra_links = []
+            page["links"] = merge_links(page["links"], extra_links)
+
+        return await run_sync(store_parsed_page, topic, page)
+
+    except (httpx.HTTPError, ValueError) as e:
+        logger.error(f"Wikipedia API error for '{topic}': {e}")
+        await run_sync(store_negative_topic_in_cache, topic, NEGATIVE_ERROR)
+        return None
+
+
+async def get_canonical_topic_async(user_input):
+    canonical = await run_sync(find_canonical_topic, user_input)
+    if canonical:
+        return canonical
+    if not await run_sync(get_negative_topic_from_cache, user_input):
+        async def lookup():
+            return await run_sync(find_canonical_topic, user_input)
+
+        await single_flight_async("wiki", normalize_topic(user_input), lambda: get_wiki_html_async(user_input), lookup)
+        canonical = await lookup()
+        if canonical:
+            return canonical
+    return await run_sync(fuzzy_canonical_topic, user_input)
+
+
+async def _ingest_async(canonical_topic, find):
+    found = await run_sync(find, canonical_topic)
+    if found:
+        # Same as get_article_text/get_article_links: refresh stale articles in the background
+        await run_sync(revalidate, canonical_topic, [("article", None)])
+        return found
+
+    async def lookup():
+        return await run_sync(find, canonical_topic)
+
+    await single_flight_async(
+        "wiki", normalize_topic(canonical_topic), lambda: get_wiki_html_async(canonical_topic), lookup
+    )
+    return await lookup()
+
+
+async def get_article_text_async(canonical_topic):
+    return await _ingest_async(canonical_topic, find_article_text)
+
+
+async def get_article_links_async(canonical_topic):
+    return await _ingest_async(canonical_topic, find_article_links) or []
+
+
+async def get_article_summary_async(canonical_topic, level="basic"):
+    summary = await run_sync(find_summary, canonical_topic, level)
+    if summary:
+        return summary
+
+    async def lookup():
+        return await run_sync(find_summary, canonical_topic, level)
+
+    return await single_flight_async(
+        "summary",
+        summary_flight_key(canonical_topic, level),
+        lambda: _generate_summary_async(canonical_topic, level),
+        lookup
+    )
+
+
+async def _generate_summary_async(canonical_topic, level):
+    article_text = await get_article_text_async(canonical_topic)
+    if not article_text:
+        logger.warning(f"No article text found for topic '{canonical_topic}'")
+        return None
+
+    try:
+        summary = await summarize_level_async(article_text, level)
+    except anthropic.APIError as e:
+        logger.error(f"Anthropic API error summarizing '{canonical_topic}': {e}")
+        return None
+    if not summary:
+        logger.error(f"Summarization failed for topic '{canonical_topic}' at level '{level}'")
+        return None
+
+    await run_sync(save_summaries, canonical_topic, {level: summary})
+    return summary
+
+
+async def get_learning_path_async(canonical_topic):
+    learning_path = await run_sync(find_learning_path, canonical_topic)
+    if learning_path:
+        return learning_path
+
+    async def lookup():
+        return await run_sync(find_learning_path, canonical_topic)
+
+    return await single_flight_async(
+        "learning_path", normalize_topic(canonical_topic), lambda: _generate_learning_path_async(canonical_topic), lookup
+    ) or await run_sync(local_learning_path, canonical_topic)
+
+
+async def _generate_learning_path_async(canonical_topic):
+    # Links and summary are independent, so fetch/generate them concurrently
+    links, summary = await asyncio.gather(
+        get_article_links_async(canonical_topic),
+        get_article_summary_async(canonical_topic)
+    )
+    intro = await run_sync(find_article_text, canonical_topic)
+    candidates = prefilter_links(canonical_topic, links, intro, summary)
+    try:
+        ranked = await rank_learning_path_async(canonical_topic, candidates, summary)
+    except anthropic.APIError as e:
+        logger.error(f"Anthropic API error ranking '{canonical_topic}': {e}")
+        ranked = None
+
+    if not ranked:
+        logger.warning(f"LLM ranking unavailable for '{canonical_topic}'; using local ranking")
+        return await run_sync(local_learning_path, canonical_topic, links)
+    return await run_sync(save_learning_path, canonical_topic, ranked)
+
+
+async def regenerate_learning_path_async(canonical_topic):
+    async def wait_for_release():
+        return None
+
+    ranked = await single_flight_async(
+        "learning_path", normalize_topic(canonical_topic), lambda: _generate_learning_path_async(canonical_topic), wait_for_release
+    )
+    return ranked or await run_sync(get_learning_path_from_cache, canonical_topic) or []
@@ -0,0 +1,155 @@
+import logging
+from quart import Blueprint, request, jsonify
+from app.async_retrieval import (
+    run_sync,
+    get_canonical_topic_async,
+    get_article_summary_async,
+    get_learning_path_async,
+    regenerate_learning_path_async
+)
+from app.cache import get_topic_bundle_from_cache
+from app.content_retrieval import (
+    find_topic_for_queue,
+    find_summary,
+    find_learning_path,
+    local_learning_path,
+    is_degraded
+)
+from app.freshness import revalidate, has_expired, age_header
+from app.jobs import QUEUE_ENABLED, enqueue_job, job_accepted_payload
+from app.routes import VALID_LEVELS
+
+logger = logging.getLogger(__name__)
+
+# Same endpoints and responses as app/routes.py, served from one event loop
+async_main = Blueprint("async_main", __name__)
+
+
+@async_main.route("/summary/<topic>", methods=["GET"])
+async def get_summary_route(topic):
+    level = request.args.get("level", "basic").lower()
+    if level not in VALID_LEVELS:
+        return jsonify({"error": "Invalid level."}), 400
+
+    bundle = await run_sync(get_topic_bundle_from_cache, topic, level, False)
+    if bundle and bundle["summary"]:
+        ages = await run_sync(revalidate, bundle["topic"], [("summary", level)])
+        if not has_expired(ages):
+            return _with_age({"topic": bundle["topic"], "level": level, "summary": bundle["summary"]}, ages)
+
+    if QUEUE_ENABLED:
+        canonical_topic = await run_sync(find_topic_for_queue, topic)
+        if not canonical_topic:
+            return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+        summary = await run_sync(find_summary, canonical_topic, level)
+        if summary:
+            ages = await run_sync(revalidate, canonical_topic, [("summary", level)])
+            return _with_age({"topic": canonical_topic, "level": level, "summary": summary}, ages)
+        return _accepted(await run_sync(enqueue_job, "summary", canonical_topic, level))
+
+    canonical_topic = await get_canonical_topic_async(topic)
+    if not canonical_topic:
+        return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+
+    summary = await get_article_summary_async(canonical_topic, level)
+
+    if summary:
+        ages = await run_sync(revalidate, canonical_topic, [("summary", level)])
+        return _with_age({"topic": canonical_topic, "level": level, "summary": summary}, ages)
+    logger.error(f"Failed to retrieve summary for '{canonical_topic}' at level '{level}'")
+    return jsonify({"error": f"Failed to retrieve summary for '{canonical_topic}'"}), 500
+
+
+@async_main.route("/learning-path/<topic>", methods=["GET"])
+async def retrieve_learning_path(topic):
+    level = request.args.get("level", "basic").lower()
+    if level not in VALID_LEVELS:
+        return jsonify({"error": "Invalid level."}), 400
+
+    bundle = await run_sync(get_topic_bundle_from_cache, topic, level)
+    if bundle and bundle["summary"] and bundle["learning_path"]:
+        ages = await run_sync(revalidate, bundle["topic"], [("summary", level), ("learning_path", None)])
+        if not has_expired(ages):
+            return _with_age({
+                "topic": bundle["topic"],
+                "level": level,
+                "summary": bundle["summary"],
+                "links": bundle["learning_path"]
+            }, ages)
+
+    if QUEUE_ENABLED:
+        canonical_topic = await run_sync(find_topic_for_queue, topic)
+        if not canonical_topic:
+            return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+        summary = await run_sync(find_summary, canonical_topic, level)
+        learning_path = await run_sync(find_learning_path, canonical_topic)
+        if summary and learning_path:
+            ages = await run_sync(revalidate, canonical_topic, [("summary", level), ("learning_path", None)])
+            return _with_age({
+                "topic": canonical_topic,
+                "level": level,
+                "summary": summary,
+                "links": learning_path
+            }, ages)
+        job = await run_sync(enqueue_job, "learning_path", canonical_topic, level)
+        return _accepted(job, await run_sync(local_learning_path, canonical_topic))
+
+    canonical_topic = await get_canonical_topic_async(topic)
+    if not canonical_topic:
+        return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+
+    summary = await get_article_summary_async(canonical_topic, level)
+    learning_path = await get_learning_path_async(canonical_topic)
+
+    if learning_path:
+        ages = await run_sync(revalidate, canonical_topic, [("summary", level), ("learning_path", None)])
+        return _with_age({
+            "topic": canonical_topic,
+            "level": level,
+            "summary": summary,
+            "links": learning_path,
+            "degraded": await run_sync(is_degraded, canonical_topic, summary, learning_path)
+        }, ages)
+
+    logger.error(f"Failed to retrieve learning path for '{canonical_topic}'")
+    return jsonify({"error": f"Failed to retrieve learning path for '{canonical_topic}'"}), 500
+
+
+@async_main.route("/rerank-learning-path/<topic>", methods=["POST"])
+async def rerank_learning_path(topic):
+    if QUEUE_ENABLED:
+        canonical_topic = await run_sync(find_topic_for_queue, topic)
+        if not canonical_topic:
+            return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+        return _accepted(await run_sync(enqueue_job, "rerank", canonical_topic))
+
+    canonical_topic = await get_canonical_topic_async(topic)
+    if not canonical_topic:
+        return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+
+    ranked_links = await regenerate_learning_path_async(canonical_topic)
+    if not ranked_links:
+        return jsonify({"error": "Failed to generate learning path"}), 500
+
+    summary = await get_article_summary_async(canonical_topic, level="basic")
+
+    logger.info(f"Learning path regenerated and stored for topic '{canonical_topic}'")
+
+    return jsonify({
+        "topic": canonical_topic,
+        "summary": summary,
+        "links": ranked_links,
+        "degraded": await run_sync(is_degraded, canonical_topic, summary, ranked_links)
+    })
+
+
+def _with_age(payload, ages):
+    payload["age"] = ages
+    return jsonify(payload), 200, age_header(ages)
+
+
+def _accepted(job, provisional_links=None):
+    if not job:
+        return jsonify({"error": "Could not queue request"}), 503
+    payload = job_accepted_payload(job, provisional_links)
+    return jsonify(payload), 202, {"Location": payload["status_url"]}
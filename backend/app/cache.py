@@ -2,10 +2,311 @@ import redis
 import json
 import logging
 import os
+import socket
+import threading
+import time
+import zlib
+from collections import OrderedDict
 
+import orjson
+
+from app.metrics import timed, redis_latency, record_cache_lookup
+from app.utils import normalize_topic
 logger = logging.getLogger(__name__)
+
+
+class TimedPipeline(redis.client.Pipeline):
+    def execute(self, raise_on_error=True):
+        with timed(redis_latency, "PIPELINE"):
+            return super().execute(raise_on_error)
+
+
+class TimedRedis(redis.Redis):
+    """Redis client that records the latency of every command it sends."""
+
+    def execute_command(self, *args, **options):
+        with timed(redis_latency, str(args[0]).upper()):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
 redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-redis_client = redis.from_url(redis_url, decode_responses=True)
+redis_client = TimedRedis.from_url(redis_url, decode_responses=True)
+# Articles, links, summaries and learning paths are stored with the value codec
+# below, which produces bytes, so they go through a client that doesn't decode.
+binary_client = TimedRedis.from_url(redis_url)
+
+# Encoded values start with 0xC1, which never appears in UTF-8 text, so entries
+# written before the codec existed are still recognised and read as-is.
+CODEC_MAGIC = b"\xc1"
+CODEC_VERSION = 1
+CODEC_PLAIN = 0
+CODEC_ZLIB = 1
+COMPRESS_THRESHOLD = int(os.getenv("CACHE_COMPRESS_THRESHOLD", 512))
+BYTES_STATS_KEY = "cache:bytes"
+
+L1_CACHE_MAXSIZE = int(os.getenv("L1_CACHE_MAXSIZE", 2048))
+L1_CACHE_TTL = float(os.getenv("L1_CACHE_TTL", 60))
+INVALIDATION_CHANNEL = "cache:invalidate"
+# Overwritten L1 keys, published by the writer as [worker id, key type, keys]
+OVERWRITE_CHANNEL = "cache:invalidate:keys"
+
+# Link graph scores (app.ranking): a hash of every node, and a key that
+# exists while they are younger than their TTL
+GRAPH_SCORES_KEY = "ranking:graph_scores"
+GRAPH_SCORES_FRESH_KEY = "ranking:graph_scores:fresh"
+GRAPH_SCORES_CHUNK_SIZE = 10000
+
+# Topics that failed to resolve are remembered under the "neg:" namespace with
+# short TTLs: a missing page may be created later, and an upstream error should
+# be retried soon. "missing" and "error" entries expire independently.
+NEGATIVE_MISSING = "missing"
+NEGATIVE_ERROR = "error"
+NEGATIVE_TTLS = {
+    NEGATIVE_MISSING: int(os.getenv("NEGATIVE_CACHE_MISSING_TTL", 600)),
+    NEGATIVE_ERROR: int(os.getenv("NEGATIVE_CACHE_ERROR_TTL", 30))
+}
+
+
+class LocalCache:
+    """Bounded, TTL-aware in-process LRU that sits in front of Redis."""
+
+    def __init__(self, maxsize: int = L1_CACHE_MAXSIZE, ttl: float = L1_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        if value is None:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_values(self, value):
+        with self._lock:
+            for key in [k for k, (_, v) in self._data.items() if v == value]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "size": len(self._data),
+                "maxsize": self.maxsize
+            }
+
+
+def encode_value(value):
+    """Return (encoded_bytes, raw_size) for a JSON-serialisable cache value."""
+    payload = orjson.dumps(value)
+    raw_size = len(payload)
+    flag = CODEC_PLAIN
+    if raw_size >= COMPRESS_THRESHOLD:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < raw_size:
+            payload, flag = compressed, CODEC_ZLIB
+    return CODEC_MAGIC + bytes([CODEC_VERSION, flag]) + payload, raw_size
+
+
+def decode_value(raw, legacy_json: bool):
+    """
+    Decode a value written by encode_value. Legacy entries are plain UTF-8
+    strings, JSON-encoded when `legacy_json` is set (links, learning paths).
+    """
+    if raw is None:
+        return None
+    if raw[:1] != CODEC_MAGIC:
+        text = raw.decode("utf-8")
+        return json.loads(text) if legacy_json else text
+    if raw[1] != CODEC_VERSION:
+        raise ValueError(f"unsupported cache codec version {raw[1]}")
+    payload = raw[3:]
+    if raw[2] == CODEC_ZLIB:
+        payload = zlib.decompress(payload)
+    return orjson.loads(payload)
+
+
+def _count_bytes(pipe, key_type: str, raw_size: int, stored_size: int):
+    pipe.hincrby(BYTES_STATS_KEY, f"{key_type}:writes", 1)
+    pipe.hincrby(BYTES_STATS_KEY, f"{key_type}:raw", raw_size)
+    pipe.hincrby(BYTES_STATS_KEY, f"{key_type}:stored", stored_size)
+
+
+def get_cache_byte_stats():
+    """Cumulative bytes written per key type, before and after encoding, across all workers."""
+    try:
+        raw = redis_client.hgetall(BYTES_STATS_KEY)
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Failed to read cache byte stats: {e}")
+        return {}
+
+    stats = {}
+    for field, count in raw.items():
+        key_type, _, measure = field.rpartition(":")
+        stats.setdefault(key_type, {})[measure] = int(count)
+    for counts in stats.values():
+        if counts.get("raw"):
+            counts["compression_ratio"] = round(counts.get("stored", 0) / counts["raw"], 4)
+    return stats
+
+
+# L1 tiers, keyed by the same strings as the Redis keys they shadow
+local_caches = {
+    "canonical": LocalCache(),
+    "summary": LocalCache(),
+    "learning_path": LocalCache(),
+    "graph": LocalCache(),
+    "fresh": LocalCache(),
+    # Kept apart from the positive tiers, and never held longer than an error entry
+    "negative": LocalCache(ttl=min(L1_CACHE_TTL, NEGATIVE_TTLS[NEGATIVE_ERROR]))
+}
+# Per-worker hit/miss counts for the Redis tier behind each L1 tier
+redis_stats = {key_type: {"hits": 0, "misses": 0} for key_type in [*local_caches, "graph_scores"]}
+# Per-worker lookups answered by a negative entry, by reason
+negative_hits = dict.fromkeys(NEGATIVE_TTLS, 0)
+_redis_stats_lock = threading.Lock()
+_invalidation_thread = None
+
+
+def _record_redis_lookup(key_type: str, hit: bool):
+    with _redis_stats_lock:
+        redis_stats[key_type]["hits" if hit else "misses"] += 1
+    record_cache_lookup("redis", key_type, hit)
+
+def _get_local(key_type: str, key: str):
+    value = local_caches[key_type].get(key)
+    record_cache_lookup("l1", key_type, value is not None)
+    return value
+
+
+def _evict_local(topic: str):
+    local_caches["canonical"].delete(f"canonical:{normalize_topic(topic)}")
+    local_caches["canonical"].delete_values(topic)
+    for level in ("basic", "intermediate", "advanced"):
+        local_caches["summary"].delete(f"summary:{topic}:{level}")
+    local_caches["learning_path"].delete(f"learning_path:{topic}")
+    local_caches["fresh"].delete(f"fresh:{topic}")
+    local_caches["negative"].delete(_negative_key(topic))
+
+
+def _handle_invalidation(message):
+    topic = message.get("data")
+    if topic:
+        _evict_local(topic)
+
+
+def _worker_id():
+    # Evaluated per call, so a forked process never reuses its parent's id
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _publish_overwrite(pipe, key_type: str, keys: list):
+    """Queue on `pipe` a message telling the other workers to drop `keys` from their L1 tier."""
+    pipe.publish(OVERWRITE_CHANNEL, json.dumps([_worker_id(), key_type, keys]))
+
+
+def _handle_overwrite(message):
+    try:
+        origin, key_type, keys = json.loads(message.get("data"))
+    except (TypeError, ValueError) as e:
+        logger.error(f"Malformed cache overwrite message: {e}")
+        return
+    # The writer's own L1 already holds the new value
+    if origin == _worker_id() or key_type not in local_caches:
+        return
+    for key in keys:
+        local_caches[key_type].delete(key)
+
+
+def _handle_listener_error(error, pubsub, thread):
+    # Invalidations may have been missed while disconnected, so drop
+    # everything local; the next get_message() call reconnects.
+    logger.error(f"Cache invalidation listener error: {error}")
+    for local_cache in local_caches.values():
+        local_cache.clear()
+    time.sleep(1)
+
+
+def start_invalidation_listener():
+    """Subscribe this worker to cache invalidations published by any worker."""
+    global _invalidation_thread
+    if _invalidation_thread is not None:
+        return
+    try:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{INVALIDATION_CHANNEL: _handle_invalidation, OVERWRITE_CHANNEL: _handle_overwrite})
+        _invalidation_thread = pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True, exception_handler=_handle_listener_error
+        )
+        logger.info("Cache invalidation listener started.")
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Could not start cache invalidation listener: {e}")
+
+
+def get_cache_stats():
+    """
+    Hit ratios for this worker's L1 tiers and the Redis lookups behind them,
+    under "worker", plus byte counts across all workers. The
+    cache_lookups_total metric on /metrics has the lookups summed over workers.
+    """
+    with _redis_stats_lock:
+        redis_tier = {}
+        for key_type, counts in redis_stats.items():
+            lookups = counts["hits"] + counts["misses"]
+            redis_tier[key_type] = {
+                **counts,
+                "hit_ratio": round(counts["hits"] / lookups, 4) if lookups else None
+            }
+        negative = dict(negative_hits)
+    return {
+        "worker": {
+            "pid": os.getpid(),
+            "l1": {key_type: local_cache.stats() for key_type, local_cache in local_caches.items()},
+            "redis": redis_tier,
+            "negative_hits": negative
+        },
+        "bytes": get_cache_byte_stats()
+    }
+
+def _get_tiered(key_type: str, key: str, fetch=None):
+    value = _get_local(key_type, key)
+    if value is not None:
+        return value
+    value = fetch() if fetch else get_from_cache(key)
+    _record_redis_lookup(key_type, value is not None)
+    local_caches[key_type].set(key, value)
+    return value
 
 def get_from_cache(key: str):
     try:
@@ -23,74 +324,377 @@ def store_in_cache(key: str, value, expiration: int = 86400):
 
 def invalidate_cache(topic: str):
     keys = [
-        f"article:{topic}", f"links:{topic}",
-        f"summary:{topic}:basic", f"summary:{topic}:intermediate", f"summary:{topic}:advanced",
-        f"learning_path:{topic}", f"canonical:{topic.lower()}"
+        f"article:{topic}", f"links:{topic}", f"summary:{topic}",
+        f"learning_path:{topic}", f"canonical:{normalize_topic(topic)}", _negative_key(topic),
+        f"fresh:{topic}",
+        # Per-level string keys written before summaries moved to a hash
+        f"summary:{topic}:basic", f"summary:{topic}:intermediate", f"summary:{topic}:advanced"
     ]
-    for key in keys:
-        try:
-            redis_client.delete(key)
-        except redis.exceptions.RedisError as e:
-            logger.error(f"Redis DELETE failed for key '{key}': {e}")
+    _evict_local(topic)
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.delete(*keys)
+        pipe.publish(INVALIDATION_CHANNEL, topic)
+        pipe.execute()
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis invalidation failed for topic '{topic}': {e}")
     logger.info(f"Cache invalidated for topic '{topic}'")
 
 def clear_cache():
+    for local_cache in local_caches.values():
+        local_cache.clear()
     try:
         redis_client.flushdb()
         logger.warning("Entire cache cleared.")
     except redis.exceptions.RedisError as e:
         logger.error(f"Redis FLUSHDB failed: {e}")
 
+def _store_encoded(key_type: str, key: str, value, expiration: int):
+    encoded, raw_size = encode_value(value)
+    pipe = binary_client.pipeline(transaction=False)
+    pipe.set(key, encoded, ex=expiration)
+    _count_bytes(pipe, key_type, raw_size, len(encoded))
+    if key_type in local_caches:
+        _publish_overwrite(pipe, key_type, [key])
+    pipe.execute()
+    logger.info(f"Redis SET successful for key: {key}")
+
+def _get_decoded(key: str, legacy_json: bool):
+    try:
+        return decode_value(binary_client.get(key), legacy_json)
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis GET failed for key '{key}': {e}")
+    except (ValueError, zlib.error) as e:
+        logger.error(f"Corrupted cache entry for {key}: {e}")
+    return None
+
 def store_article_in_cache(topic: str, content: str, expiration: int = 86400):
-    store_in_cache(f"article:{topic}", content, expiration)
+    try:
+        _store_encoded("article", f"article:{topic}", content, expiration)
+    except (TypeError, redis.exceptions.RedisError) as e:
+        logger.error(f"Failed to store article for topic '{topic}': {e}")
 
 def get_article_from_cache(topic: str):
-    return get_from_cache(f"article:{topic}")
+    return _get_decoded(f"article:{topic}", legacy_json=False)
 
 def store_links_in_cache(topic: str, links, expiration: int = 86400):
     try:
-        store_in_cache(f"links:{topic}", json.dumps(links), expiration)
+        _store_encoded("links", f"links:{topic}", links, expiration)
     except (TypeError, redis.exceptions.RedisError) as e:
         logger.error(f"Failed to store links for topic '{topic}': {e}")
 
 def get_links_from_cache(topic: str):
-    links = get_from_cache(f"links:{topic}")
-    try:
-        return json.loads(links) if links else None
-    except json.JSONDecodeError:
-        logger.error(f"Corrupted cache entry for links:{topic}")
-        return None
+    return _get_decoded(f"links:{topic}", legacy_json=True)
 
 def store_summaries_in_cache(topic: str, summaries_dict: dict, expiration: int = 86400):
-    for level, summary in summaries_dict.items():
-        store_in_cache(f"summary:{topic}:{level}", summary, expiration)
+    """Store all levels in one `summary:{topic}` hash (HSET + EXPIRE in one round trip)."""
+    summaries = {level: summary for level, summary in summaries_dict.items() if summary}
+    if not summaries:
+        return
+    for level, summary in summaries.items():
+        local_caches["summary"].set(f"summary:{topic}:{level}", summary)
+    try:
+        pipe = binary_client.pipeline(transaction=False)
+        encoded_fields = {}
+        for level, summary in summaries.items():
+            encoded, raw_size = encode_value(summary)
+            encoded_fields[level] = encoded
+            _count_bytes(pipe, "summary", raw_size, len(encoded))
+        pipe.hset(f"summary:{topic}", mapping=encoded_fields)
+        pipe.expire(f"summary:{topic}", expiration)
+        _publish_overwrite(pipe, "summary", [f"summary:{topic}:{level}" for level in summaries])
+        pipe.execute()
+        logger.info(f"Redis HSET successful for key: summary:{topic}")
+    except (TypeError, redis.exceptions.RedisError) as e:
+        logger.error(f"Redis HSET failed for key 'summary:{topic}': {e}")
+
+def _hget_decoded(key: str, field: str):
+    try:
+        return decode_value(binary_client.hget(key, field), legacy_json=False)
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis HGET failed for key '{key}' field '{field}': {e}")
+    except (ValueError, zlib.error) as e:
+        logger.error(f"Corrupted cache entry for {key}[{field}]: {e}")
+    return None
 
 def get_summary_from_cache(topic: str, level: str):
-    return get_from_cache(f"summary:{topic}:{level}")
+    return _get_tiered("summary", f"summary:{topic}:{level}", lambda: _hget_decoded(f"summary:{topic}", level))
 
 def store_learning_path_in_cache(topic: str, ranked_links, expiration: int = 86400):
     try:
-        store_in_cache(f"learning_path:{topic}", json.dumps(ranked_links), expiration)
+        _store_encoded("learning_path", f"learning_path:{topic}", ranked_links, expiration)
+        local_caches["learning_path"].set(f"learning_path:{topic}", ranked_links)
     except (TypeError, redis.exceptions.RedisError) as e:
         logger.error(f"Failed to store learning path for topic '{topic}': {e}")
 
-def get_learning_path_from_cache(topic: str):
-    cached_path = get_from_cache(f"learning_path:{topic}")
+def _decode_freshness(flat_or_mapping) -> dict:
+    return {field: float(generated_at) for field, generated_at in flat_or_mapping.items()}
+
+def store_freshness_in_cache(topic: str, timestamps: dict, expiration: int = 86400):
+    """
+    Merge {field: generated_at epoch seconds} into the `fresh:{topic}` hash,
+    where field is "article", "learning_path" or "summary:<level>".
+    """
+    key = f"fresh:{topic}"
+    cached = local_caches["fresh"].get(key)
+    if cached is not None:
+        local_caches["fresh"].set(key, {**cached, **timestamps})
     try:
-        return json.loads(cached_path) if cached_path else None
-    except json.JSONDecodeError:
-        logger.error(f"Corrupted cache entry for learning_path:{topic}")
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hset(key, mapping={field: repr(generated_at) for field, generated_at in timestamps.items()})
+        pipe.expire(key, expiration)
+        _publish_overwrite(pipe, "fresh", [key])
+        pipe.execute()
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis HSET failed for key '{key}': {e}")
+
+def get_freshness_from_cache(topic: str):
+    def fetch():
+        try:
+            return _decode_freshness(redis_client.hgetall(f"fresh:{topic}")) or None
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis HGETALL failed for key 'fresh:{topic}': {e}")
+        except ValueError as e:
+            logger.error(f"Corrupted cache entry for fresh:{topic}: {e}")
         return None
+    return _get_tiered("fresh", f"fresh:{topic}", fetch)
 
-def get_canonical_topic_from_cache(user_input: str):
+def get_learning_path_from_cache(topic: str):
+    return _get_tiered(
+        "learning_path",
+        f"learning_path:{topic}",
+        lambda: _get_decoded(f"learning_path:{topic}", legacy_json=True)
+    )
+
+def store_graph_scores_in_cache(scores: dict, expiration: int = 3600):
+    """
+    Replace the per-node link graph scores, kept in one hash of
+    node -> "in_degree pagerank". The hash is built under a temporary key and
+    renamed into place, so readers never see a partial set. It does not
+    expire: after `expiration` seconds the scores are only marked stale.
+    """
+    building = f"{GRAPH_SCORES_KEY}:building"
+    nodes = list(scores["pagerank"])
     try:
-        return redis_client.get(f"canonical:{user_input.lower()}")
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.delete(building)
+        for start in range(0, len(nodes), GRAPH_SCORES_CHUNK_SIZE):
+            pipe.hset(building, mapping={
+                node: f"{scores['in_degree'].get(node, 0)} {scores['pagerank'][node]!r}"
+                for node in nodes[start:start + GRAPH_SCORES_CHUNK_SIZE]
+            })
+        if nodes:
+            pipe.rename(building, GRAPH_SCORES_KEY)
+        else:
+            pipe.delete(GRAPH_SCORES_KEY)
+        pipe.set(GRAPH_SCORES_FRESH_KEY, repr(time.time()), ex=expiration)
+        pipe.execute()
+        logger.info(f"Stored link graph scores for {len(nodes)} nodes")
     except redis.exceptions.RedisError as e:
-        logger.error(f"Redis GET failed for canonical topic '{user_input}': {e}")
-        return None
+        logger.error(f"Failed to store link graph scores: {e}")
+
+def get_graph_scores_from_cache(nodes: list):
+    """
+    ({node: (in_degree, pagerank)} for those of `nodes` that have scores,
+    whether the scores are younger than their expiration) in one round trip.
+    """
+    if not nodes:
+        return {}, True
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hmget(GRAPH_SCORES_KEY, nodes)
+        pipe.exists(GRAPH_SCORES_FRESH_KEY)
+        values, fresh = pipe.execute()
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis HMGET failed for key '{GRAPH_SCORES_KEY}': {e}")
+        return {}, True
+
+    scores = {}
+    for node, value in zip(nodes, values):
+        if value:
+            in_degree, pagerank = value.split(" ")
+            scores[node] = (int(in_degree), float(pagerank))
+    _record_redis_lookup("graph_scores", bool(fresh))
+    return scores, bool(fresh)
+
+def store_graph_in_cache(topic: str, depth: int, fanout: int, graph: dict, expiration: int = 3600):
+    key = f"graph:{topic}:{depth}:{fanout}"
+    try:
+        _store_encoded("graph", key, graph, expiration)
+        local_caches["graph"].set(key, graph)
+    except (TypeError, redis.exceptions.RedisError) as e:
+        logger.error(f"Failed to store graph for topic '{topic}': {e}")
+
+def get_graph_from_cache(topic: str, depth: int, fanout: int):
+    key = f"graph:{topic}:{depth}:{fanout}"
+    return _get_tiered("graph", key, lambda: _get_decoded(key, legacy_json=False))
+
+def get_canonical_topic_from_cache(user_input: str):
+    return _get_tiered("canonical", f"canonical:{normalize_topic(user_input)}")
 
 def store_canonical_topic_in_cache(user_input: str, resolved_title: str):
+    local_caches["canonical"].set(f"canonical:{normalize_topic(user_input)}", resolved_title)
     try:
-        redis_client.set(f"canonical:{user_input.lower()}", resolved_title)
+        redis_client.set(f"canonical:{normalize_topic(user_input)}", resolved_title)
     except redis.exceptions.RedisError as e:
         logger.error(f"Redis SET failed for canonical topic '{user_input}': {e}")
+
+def _negative_key(user_input: str) -> str:
+    return f"neg:canonical:{normalize_topic(user_input)}"
+
+def store_negative_topic_in_cache(user_input: str, reason: str):
+    """Remember that `user_input` did not resolve; `reason` is NEGATIVE_MISSING or NEGATIVE_ERROR."""
+    key = _negative_key(user_input)
+    local_caches["negative"].set(key, reason)
+    try:
+        redis_client.set(key, reason, ex=NEGATIVE_TTLS[reason])
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis SET failed for negative entry '{user_input}': {e}")
+
+def store_negative_topics_in_cache(reasons: dict):
+    """Bulk store_negative_topic_in_cache for {user_input: reason}, in one pipeline."""
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for user_input, reason in reasons.items():
+            local_caches["negative"].set(_negative_key(user_input), reason)
+            pipe.set(_negative_key(user_input), reason, ex=NEGATIVE_TTLS[reason])
+        pipe.execute()
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis pipelined SET failed for {len(reasons)} negative entries: {e}")
+
+def get_negative_topic_from_cache(user_input: str):
+    """The reason `user_input` recently failed to resolve, or None."""
+    reason = _get_tiered("negative", _negative_key(user_input))
+    if reason in negative_hits:
+        with _redis_stats_lock:
+            negative_hits[reason] += 1
+    return reason
+
+def get_negative_topics_from_cache(user_inputs):
+    """Bulk get_negative_topic_from_cache with a single MGET: {user_input: reason} for the hits."""
+    found = {}
+    remote = []
+    for user_input in user_inputs:
+        reason = _get_local("negative", _negative_key(user_input))
+        if reason is not None:
+            found[user_input] = reason
+        else:
+            remote.append(user_input)
+
+    if remote:
+        try:
+            values = redis_client.mget([_negative_key(u) for u in remote])
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis MGET failed for {len(remote)} negative entries: {e}")
+            values = [None] * len(remote)
+        for user_input, reason in zip(remote, values):
+            _record_redis_lookup("negative", reason is not None)
+            if reason:
+                local_caches["negative"].set(_negative_key(user_input), reason)
+                found[user_input] = reason
+
+    with _redis_stats_lock:
+        for reason in found.values():
+            if reason in negative_hits:
+                negative_hits[reason] += 1
+    return found
+
+def get_canonical_topics_from_cache(user_inputs):
+    """Look up many canonical mappings with a single MGET. Misses are omitted."""
+    found = {}
+    remote = []
+    for user_input in user_inputs:
+        value = _get_local("canonical", f"canonical:{normalize_topic(user_input)}")
+        if value is not None:
+            found[user_input] = value
+        else:
+            remote.append(user_input)
+    if not remote:
+        return found
+
+    try:
+        values = redis_client.mget([f"canonical:{normalize_topic(u)}" for u in remote])
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis MGET failed for {len(remote)} canonical topics: {e}")
+        return found
+
+    for user_input, value in zip(remote, values):
+        _record_redis_lookup("canonical", value is not None)
+        if value:
+            local_caches["canonical"].set(f"canonical:{normalize_topic(user_input)}", value)
+            found[user_input] = value
+    return found
+
+def store_canonical_topics_in_cache(mapping: dict):
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for user_input, resolved_title in mapping.items():
+            local_caches["canonical"].set(f"canonical:{normalize_topic(user_input)}", resolved_title)
+            pipe.set(f"canonical:{normalize_topic(user_input)}", resolved_title)
+        pipe.execute()
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis pipelined SET failed for {len(mapping)} canonical topics: {e}")
+
+# Resolves the canonical title and reads everything cached for it server-side,
+# so a warm request costs one round trip. Per-topic keys are derived inside the
+# script, which is fine for a single Redis instance but not for Redis Cluster.
+_TOPIC_BUNDLE_SCRIPT = binary_client.register_script("""
+local canonical = redis.call("GET", KEYS[1])
+if not canonical then
+    return {false}
+end
+return {
+    canonical,
+    redis.call("HGETALL", "summary:" .. canonical),
+    redis.call("GET", "learning_path:" .. canonical),
+    redis.call("HGETALL", "fresh:" .. canonical)
+}
+""")
+
+def get_topic_bundle_from_cache(user_input: str, level: str, with_learning_path: bool = True):
+    """
+    Fetch the canonical title for `user_input` together with its cached summary at
+    `level` and its learning path, from L1 if everything the caller needs is there
+    (the learning path only `with_learning_path`), otherwise in a single Redis
+    round trip. Returns None if the canonical mapping is not cached.
+    """
+    canonical = _get_local("canonical", f"canonical:{normalize_topic(user_input)}")
+    if canonical:
+        summary = _get_local("summary", f"summary:{canonical}:{level}")
+        learning_path = _get_local("learning_path", f"learning_path:{canonical}") if with_learning_path else None
+        if summary and (learning_path or not with_learning_path):
+            return {"topic": canonical, "summary": summary, "learning_path": learning_path}
+
+    try:
+        result = _TOPIC_BUNDLE_SCRIPT(keys=[f"canonical:{normalize_topic(user_input)}"])
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis bundle fetch failed for '{user_input}': {e}")
+        return None
+
+    _record_redis_lookup("canonical", bool(result[0]))
+    if not result[0]:
+        return None
+    canonical = result[0].decode("utf-8")
+    local_caches["canonical"].set(f"canonical:{normalize_topic(user_input)}", canonical)
+
+    try:
+        flat_summaries = result[1] or []
+        summaries = {
+            cached_level.decode("utf-8"): decode_value(summary, legacy_json=False)
+            for cached_level, summary in zip(flat_summaries[::2], flat_summaries[1::2])
+        }
+        learning_path = decode_value(result[2], legacy_json=True)
+        flat_freshness = [value.decode("utf-8") for value in result[3] or []]
+        freshness = _decode_freshness(dict(zip(flat_freshness[::2], flat_freshness[1::2])))
+    except (ValueError, zlib.error) as e:
+        logger.error(f"Corrupted cache entry in bundle for '{canonical}': {e}")
+        return {"topic": canonical, "summary": None, "learning_path": None}
+
+    for cached_level, summary in summaries.items():
+        local_caches["summary"].set(f"summary:{canonical}:{cached_level}", summary)
+    local_caches["learning_path"].set(f"learning_path:{canonical}", learning_path)
+    local_caches["fresh"].set(f"fresh:{canonical}", freshness or None)
+    _record_redis_lookup("summary", level in summaries)
+    _record_redis_lookup("learning_path", learning_path is not None)
+
+    return {"topic": canonical, "summary": summaries.get(level), "learning_path": learning_path}
@@ -1,6 +1,8 @@
 import json
 import logging
 
+import anthropic
+
 from app.database import (
     get_article_from_db,
     store_article_in_db,
@@ -11,6 +13,7 @@ from app.database import (
     get_learning_path_from_db,
     store_learning_path_in_db,
     get_canonical_topic_from_db,
+    get_canonical_topics_from_db,
     store_canonical_topic_in_db
 )
 from app.cache import (
@@ -23,16 +26,33 @@ from app.cache import (
     get_learning_path_from_cache,
     store_learning_path_in_cache,
     get_canonical_topic_from_cache,
-    store_canonical_topic_in_cache
+    get_canonical_topics_from_cache,
+    store_canonical_topic_in_cache,
+    store_canonical_topics_in_cache,
+    get_negative_topic_from_cache,
+    get_negative_topics_from_cache,
+    NEGATIVE_MISSING
 )
-from app.llm import summarize_text, rank_learning_path
-from app.wikipedia import get_wiki_html
-from app.utils import slice_links_by_level, deduplicate_learning_path
+from app.freshness import content_age, is_expired, mark_fresh, revalidate
+from app.llm import summarize_level, stream_level_summary, rank_learning_path
+from app.ranking import prefilter_links, rank_links_locally
+from app.singleflight import single_flight, single_flight_stream
+from app.suggest import match_title
+from app.wikipedia import get_wiki_html, resolve_canonical_titles
+from app.utils import normalize_topic, slice_links_by_level, deduplicate_learning_path
 
 
 logger = logging.getLogger(__name__)
 
-def get_canonical_topic(user_input):
+# The find_* helpers only read the cache and DB. The get_* functions fall back
+# to generation when they miss; the asyncio serving mode reuses the find_* and
+# save_* helpers around its own non-blocking generation steps. Content past its
+# hard age (see app.freshness) is treated as missing so it gets regenerated.
+
+def _expired(canonical_topic, artifact, level=None):
+    return is_expired(artifact, content_age(canonical_topic, artifact, level))
+
+def find_canonical_topic(user_input):
     canonical = get_canonical_topic_from_cache(user_input)
     if canonical:
         return canonical
@@ -40,122 +60,300 @@ def get_canonical_topic(user_input):
     canonical = get_canonical_topic_from_db(user_input)
     if canonical:
         store_canonical_topic_in_cache(user_input, canonical)
+    return canonical
+
+def fuzzy_canonical_topic(user_input):
+    """
+    Known title for a misspelling that Wikipedia has no page for, or None. Only
+    used once Wikipedia has reported the input missing, so a real title is never
+    swapped for a similar one; not stored, since the match is a guess.
+    """
+    if get_negative_topic_from_cache(user_input) != NEGATIVE_MISSING:
+        return None
+    canonical = match_title(user_input)
+    if canonical:
+        logger.info(f"Fuzzy-matched missing topic '{user_input}' to known topic '{canonical}'")
+    return canonical
+
+def find_article_text(canonical_topic):
+    text = get_article_from_cache(canonical_topic) or get_article_from_db(canonical_topic)
+    return None if text and _expired(canonical_topic, "article") else text
+
+def find_topic_for_queue(user_input):
+    """
+    Queue-mode counterpart of get_canonical_topic that never calls Wikipedia:
+    the known canonical title, or `user_input` unchanged if it still has to be
+    looked up (the job does that). None if it recently failed to resolve and
+    has no fuzzy match, which the sync path answers with 404.
+    """
+    canonical = find_canonical_topic(user_input)
+    if canonical:
         return canonical
+    if get_negative_topic_from_cache(user_input):
+        return fuzzy_canonical_topic(user_input)
+    return user_input
 
-    canonical = get_wiki_html(user_input)
-    if not canonical:
-        return None
+def find_article_links(canonical_topic):
+    return get_links_from_cache(canonical_topic) or get_links_from_db(canonical_topic)
 
-    return get_canonical_topic_from_cache(user_input) or get_canonical_topic_from_db(user_input)
+def find_summary(canonical_topic, level):
+    summary = get_summary_from_cache(canonical_topic, level) or get_summary_from_db(canonical_topic, level)
+    return None if summary and _expired(canonical_topic, "summary", level) else summary
 
-def get_article_text(topic):
-    canonical_topic = get_canonical_topic(topic)
-    if not canonical_topic:
-        return None
+def find_learning_path(canonical_topic):
+    learning_path = get_learning_path_from_cache(canonical_topic) or get_learning_path_from_db(canonical_topic)
+    return None if learning_path and _expired(canonical_topic, "learning_path") else learning_path
+
+def save_summaries(canonical_topic, summaries):
+    store_summaries_in_cache(canonical_topic, summaries)
+    store_summaries_in_db(canonical_topic, summaries)
+    mark_fresh(canonical_topic, "summary", list(summaries))
+    logger.info(f"Generated and stored {list(summaries)} summaries for topic '{canonical_topic}'")
 
-    cached_text = get_article_from_cache(canonical_topic)
-    if cached_text:
-        return cached_text
+def summary_flight_key(canonical_topic, level):
+    # Levels are generated independently, so each gets its own lease
+    return f"{normalize_topic(canonical_topic)}:{level}"
 
-    db_text = get_article_from_db(canonical_topic)
-    if db_text:
-        return db_text
+def save_learning_path(canonical_topic, ranked):
+    unique_ranked = deduplicate_learning_path(ranked, canonical_topic)
+
+    store_learning_path_in_cache(canonical_topic, unique_ranked)
+    store_learning_path_in_db(canonical_topic, unique_ranked)
+    mark_fresh(canonical_topic, "learning_path")
+    logger.info(f"Generated and stored learning path for topic '{canonical_topic}'")
+
+    return unique_ranked
+
+def local_learning_path(canonical_topic, links=None):
+    """
+    Learning path from the local graph ranker. It is served while the LLM path
+    is pending or unavailable, and never stored, so the LLM result replaces it.
+    """
+    if links is None:
+        links = find_article_links(canonical_topic)
+    return rank_links_locally(canonical_topic, links) if links else []
 
-    soup = get_wiki_html(canonical_topic)
-    if not soup:
+def is_degraded(canonical_topic, summary, learning_path):
+    """Whether a response is missing the summary or serves a local path in place of the LLM one."""
+    return summary is None or learning_path != find_learning_path(canonical_topic)
+
+def get_canonical_topic(user_input):
+    canonical = find_canonical_topic(user_input)
+    if canonical:
+        return canonical
+    # Recently missing or failing upstream: don't ask Wikipedia again yet
+    if not get_negative_topic_from_cache(user_input):
+        single_flight(
+            "wiki",
+            normalize_topic(user_input),
+            lambda: get_wiki_html(user_input),
+            lambda: find_canonical_topic(user_input)
+        )
+        canonical = find_canonical_topic(user_input)
+        if canonical:
+            return canonical
+    return fuzzy_canonical_topic(user_input)
+
+def get_canonical_topics(user_inputs):
+    """
+    Bulk version of get_canonical_topic for link lists: one MGET, one DB query,
+    then one multi-title Wikipedia query per 50 remaining titles that aren't
+    negative-cached. Unlike the single-topic path it does not ingest the
+    articles themselves.
+    """
+    pending = list(dict.fromkeys(u for u in user_inputs if u))
+    resolved = get_canonical_topics_from_cache(pending)
+
+    missing = [u for u in pending if u not in resolved]
+    from_db = get_canonical_topics_from_db(missing)
+    if from_db:
+        store_canonical_topics_in_cache(from_db)
+        resolved.update(from_db)
+
+    missing = [u for u in missing if u not in resolved]
+    # Recently missing or failing upstream: don't ask Wikipedia again yet
+    negative = get_negative_topics_from_cache(missing)
+    missing = [u for u in missing if u not in negative]
+    if missing:
+        resolved.update(resolve_canonical_titles(missing))
+
+    return resolved
+
+def get_article_text(topic):
+    canonical_topic = get_canonical_topic(topic)
+    if not canonical_topic:
         return None
 
-    return get_article_from_cache(canonical_topic) or get_article_from_db(canonical_topic)
+    text = find_article_text(canonical_topic)
+    if text:
+        # Stale articles are served while a refresh runs; expired ones are
+        # not found and are re-fetched below
+        revalidate(canonical_topic, [("article", None)])
+        return text
+
+    single_flight(
+        "wiki",
+        normalize_topic(canonical_topic),
+        lambda: get_wiki_html(canonical_topic),
+        lambda: find_article_text(canonical_topic)
+    )
+    return find_article_text(canonical_topic)
 
 def get_article_summary(topic, level="basic"):
     canonical_topic = get_canonical_topic(topic)
     if not canonical_topic:
         return None
 
-    cached_summary = get_summary_from_cache(canonical_topic, level)
-    if cached_summary:
-        return cached_summary
+    summary = find_summary(canonical_topic, level)
+    if summary:
+        return summary
 
-    db_summary = get_summary_from_db(canonical_topic, level)
-    if db_summary:
-        return db_summary
+    return single_flight(
+        "summary",
+        summary_flight_key(canonical_topic, level),
+        lambda: _generate_summary(canonical_topic, level),
+        lambda: find_summary(canonical_topic, level)
+    )
 
+def _generate_summary(canonical_topic, level):
+    # Only the requested level is generated; the others are filled in the
+    # first time someone asks for them.
     article_text = get_article_text(canonical_topic)
     if not article_text:
         logger.warning(f"No article text found for topic '{canonical_topic}'")
         return None
 
-    summaries = summarize_text(article_text)
-    if not summaries:
-        logger.error(f"Summarization failed for topic '{canonical_topic}'")
+    try:
+        summary = summarize_level(article_text, level)
+    except anthropic.APIError as e:
+        logger.error(f"Anthropic API error summarizing '{canonical_topic}': {e}")
+        return None
+    if not summary:
+        logger.error(f"Summarization failed for topic '{canonical_topic}' at level '{level}'")
         return None
 
-    store_summaries_in_cache(canonical_topic, summaries)
-    store_summaries_in_db(canonical_topic, summaries)
-    logger.info(f"Generated and stored summaries for topic '{canonical_topic}'")
+    save_summaries(canonical_topic, {level: summary})
+    return summary
+
+def stream_article_summary(canonical_topic, level="basic"):
+    """
+    Generator that yields the `level` summary in pieces as the model writes it
+    and returns the complete summary (or None). A stored summary is yielded
+    whole; concurrent streams for one topic share a single generation.
+    """
+    summary = find_summary(canonical_topic, level)
+    if summary:
+        yield summary
+        return summary
+
+    return (yield from single_flight_stream(
+        "summary",
+        summary_flight_key(canonical_topic, level),
+        lambda: _stream_summary(canonical_topic, level),
+        lambda: find_summary(canonical_topic, level)
+    ))
+
+def _stream_summary(canonical_topic, level):
+    article_text = get_article_text(canonical_topic)
+    if not article_text:
+        logger.warning(f"No article text found for topic '{canonical_topic}'")
+        return None
+
+    summary = yield from stream_level_summary(article_text, level)
+    if not summary:
+        logger.error(f"Summarization failed for topic '{canonical_topic}' at level '{level}'")
+        return None
 
-    return summaries.get(level)
+    save_summaries(canonical_topic, {level: summary})
+    return summary
 
 def get_article_links(topic):
     canonical_topic = get_canonical_topic(topic)
     if not canonical_topic:
         return []
 
-    cached_links = get_links_from_cache(canonical_topic)
-    if cached_links:
-        return cached_links
-
-    db_links = get_links_from_db(canonical_topic)
-    if db_links:
-        return db_links
-
-    soup = get_wiki_html(canonical_topic)
-    if not soup:
-        return []
+    links = find_article_links(canonical_topic)
+    if links:
+        # Links are ingested with the article and share its age
+        revalidate(canonical_topic, [("article", None)])
+        return links
 
-    return get_links_from_cache(canonical_topic) or get_links_from_db(canonical_topic)
+    single_flight(
+        "wiki",
+        normalize_topic(canonical_topic),
+        lambda: get_wiki_html(canonical_topic),
+        lambda: find_article_links(canonical_topic)
+    )
+    return find_article_links(canonical_topic) or []
 
 def get_learning_path(topic: str, level: str) -> list:
     canonical_topic = get_canonical_topic(topic)
     if not canonical_topic:
         return []
 
-    cached_path = get_learning_path_from_cache(canonical_topic)
-    if cached_path:
-        return cached_path
+    learning_path = find_learning_path(canonical_topic)
+    if learning_path:
+        return learning_path
 
-    db_path = get_learning_path_from_db(canonical_topic)
-    if db_path:
-        return db_path
+    return single_flight(
+        "learning_path",
+        normalize_topic(canonical_topic),
+        lambda: _generate_learning_path(canonical_topic),
+        lambda: find_learning_path(canonical_topic)
+    ) or local_learning_path(canonical_topic)
 
+def _generate_learning_path(canonical_topic, fallback=True):
     links = get_article_links(canonical_topic)
-    summary = get_article_summary(canonical_topic)
-    ranked = rank_learning_path(canonical_topic, links, summary)
-
-    unique_ranked = deduplicate_learning_path(ranked, canonical_topic)
-
-    store_learning_path_in_cache(canonical_topic, unique_ranked)
-    store_learning_path_in_db(canonical_topic, unique_ranked)
-    logger.info(f"Generated and stored learning path for topic '{canonical_topic}'")
-
-    return unique_ranked
-
-
+    try:
+        summary = get_article_summary(canonical_topic)
+        candidates = prefilter_links(canonical_topic, links, find_article_text(canonical_topic), summary)
+        ranked = rank_learning_path(canonical_topic, candidates, summary)
+    except anthropic.APIError as e:
+        logger.error(f"Anthropic API error ranking '{canonical_topic}': {e}")
+        ranked = None
+
+    if not ranked:
+        if not fallback:
+            return None
+        logger.warning(f"LLM ranking unavailable for '{canonical_topic}'; using local ranking")
+        return local_learning_path(canonical_topic, links)
+    return save_learning_path(canonical_topic, ranked)
 
 def regenerate_learning_path(topic):
     canonical_topic = get_canonical_topic(topic)
     if not canonical_topic:
         return []
 
-    links = get_article_links(canonical_topic)
-    summary = get_article_summary(canonical_topic)
-    ranked = rank_learning_path(canonical_topic, links, summary)
-
-    unique_ranked = deduplicate_learning_path(ranked, canonical_topic)
-
-    store_learning_path_in_cache(canonical_topic, unique_ranked)
-    store_learning_path_in_db(canonical_topic, unique_ranked)
-    logger.info(f"Regenerated and stored learning path for topic '{canonical_topic}'")
-
-    return unique_ranked
-
+    # Followers must not return the path being replaced, so they only read the
+    # cache once the leader has released its lease.
+    ranked = single_flight(
+        "learning_path",
+        normalize_topic(canonical_topic),
+        lambda: _generate_learning_path(canonical_topic),
+        lambda: None
+    )
+    return ranked or get_learning_path_from_cache(canonical_topic) or []
+
+# Background refreshes of content past its soft age (app.freshness). Their
+# lookups return None: the stale copy is still stored, and a refresh that only
+# waited on someone else's generation has not produced anything itself.
+
+def refresh_article(canonical_topic):
+    return get_wiki_html(canonical_topic)
+
+def refresh_summary(canonical_topic, level):
+    return single_flight(
+        "summary",
+        summary_flight_key(canonical_topic, level),
+        lambda: _generate_summary(canonical_topic, level),
+        lambda: None
+    )
+
+def refresh_learning_path(canonical_topic):
+    # No local fallback: an unranked path must not reset the learning path's age
+    return single_flight(
+        "learning_path",
+        normalize_topic(canonical_topic),
+        lambda: _generate_learning_path(canonical_topic, fallback=False),
+        lambda: None
+    )
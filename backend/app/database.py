@@ -1,11 +1,31 @@
 import json
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timezone
+from sqlalchemy import and_, event, or_, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
 from app import db
-from app.models import Article, Links, Summary, LearningPath, CanonicalTopic, User
+from app.metrics import db_latency
+from app.models import Article, LinkEdge, Summary, LearningPath, CanonicalTopic, User
+from app.utils import normalize_topic
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT statement, kept under SQLite's bound-parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+
+# Statement timing for /metrics, following SQLAlchemy's query profiling recipe
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+    db_latency.labels(statement.split(None, 1)[0].upper()).observe(elapsed)
+
 
 
 
@@ -53,40 +73,179 @@ def is_admin_user(user):
 
 
 
-def store_article_in_db(canonical_topic, content):
-    article = Article.query.filter_by(topic=canonical_topic).first()
-
-    if article:
-        logger.info(f"Updating existing article: {canonical_topic}")
-        article.full_text = content
-    else:
-        logger.info(f"Storing new article: {canonical_topic}")
-        article = Article(topic=canonical_topic, full_text=content)
-        db.session.add(article)
+# Dialects with INSERT ... ON CONFLICT; other databases use _select_then_insert
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
 
+def _upsert(model, rows, conflict_columns, update_columns):
+    """
+    INSERT ... ON CONFLICT (conflict_columns) DO UPDATE SET update_columns for
+    many rows, in chunks. Runs in the current transaction; callers commit.
+    """
+    insert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+        if insert is None:
+            _select_then_insert(model, chunk, conflict_columns, update_columns)
+            continue
+        stmt = insert(model).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+        db.session.execute(stmt)
+
+def _select_then_insert(model, rows, conflict_columns, update_columns):
+    """
+    Portable _upsert for one chunk: load the rows that already exist with one
+    SELECT, update those and add the rest. Unlike ON CONFLICT it is not atomic,
+    so a concurrent insert of the same key fails the transaction instead.
+    """
+    def key(values):
+        return tuple(values[column] for column in conflict_columns)
+
+    existing = {
+        tuple(getattr(instance, column) for column in conflict_columns): instance
+        for instance in model.query.filter(or_(*(
+            and_(*(getattr(model, column) == value for column, value in zip(conflict_columns, key(row))))
+            for row in rows
+        )))
+    }
+    for row in rows:
+        instance = existing.get(key(row))
+        if instance is None:
+            db.session.add(model(**row))
+        else:
+            for column in update_columns:
+                setattr(instance, column, row[column])
+
+def _upsert_articles(articles):
+    now = datetime.utcnow()
+    rows = [
+        {"topic": topic, "full_text": content, "revid": revid, "retrieved_at": now}
+        for topic, content, revid in articles
+    ]
+    _upsert(Article, rows, ["topic"], ["full_text", "revid", "retrieved_at"])
+
+def _replace_links(links_by_topic):
+    """Replace each topic's outgoing edges; positions follow the list order."""
+    topics = list(links_by_topic)
+    for start in range(0, len(topics), UPSERT_CHUNK_SIZE):
+        chunk = topics[start:start + UPSERT_CHUNK_SIZE]
+        db.session.query(LinkEdge).filter(LinkEdge.source.in_(chunk)).delete(synchronize_session=False)
+
+    rows = [
+        {"source": topic, "target": target, "position": position}
+        for topic, links in links_by_topic.items()
+        for position, target in enumerate(dict.fromkeys(links))
+    ]
+    # A concurrent ingestion of the same page may have inserted the same edges
+    _upsert(LinkEdge, rows, ["source", "target"], ["position"])
+
+def _upsert_canonical_topics(mapping):
+    # Keyed by normalized input, so spelling variants share one row
+    normalized = {normalize_topic(user_input): canonical_title for user_input, canonical_title in mapping.items()}
+    rows = [
+        {"user_input": user_input, "canonical_title": canonical_title}
+        for user_input, canonical_title in normalized.items()
+    ]
+    _upsert(CanonicalTopic, rows, ["user_input"], ["canonical_title"])
+
+def store_article_in_db(canonical_topic, content, revid=None):
     try:
+        _upsert_articles([(canonical_topic, content, revid)])
         db.session.commit()
         logger.info(f"Article stored: {canonical_topic}")
     except Exception as e:
         db.session.rollback()
         logger.error(f"Failed to store article '{canonical_topic}': {e}")
 
+def store_ingested_pages_in_db(pages):
+    """
+    Store the ingestion results for many pages in one transaction: the
+    canonical mapping for each requested topic, the article intro and revision,
+    and the links. `pages` is a list of (topic, page) pairs, where page is the
+    {"title", "revid", "intro", "links"} dict built by app.wikipedia.
+    """
+    if not pages:
+        return
+    mapping = {topic: page["title"] for topic, page in pages}
+    articles = {page["title"]: (page["title"], page["intro"], page["revid"]) for _, page in pages if page["intro"]}
+    links = {page["title"]: page["links"] for _, page in pages if page["links"]}
+
+    try:
+        _upsert_canonical_topics(mapping)
+        if articles:
+            _upsert_articles(list(articles.values()))
+        if links:
+            _replace_links(links)
+        db.session.commit()
+        logger.info(f"Stored {len(pages)} ingested page(s) in db")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to store {len(pages)} ingested page(s): {e}")
+
+def store_ingested_page_in_db(topic, page):
+    store_ingested_pages_in_db([(topic, page)])
+
 def get_article_from_db(topic):
     article = Article.query.filter_by(topic=topic).first()
     return article.full_text if article else None
 
-def store_links_in_db(canonical_topic, links):
-    existing_entry = Links.query.filter_by(topic=canonical_topic).first()
-
-    if existing_entry:
-        logger.info(f"Updating links for {canonical_topic}")
-        existing_entry.linked_topic = json.dumps(links)
-    else:
-        logger.info(f"Storing new links for {canonical_topic}")
-        new_entry = Links(topic=canonical_topic, linked_topic=json.dumps(links))
-        db.session.add(new_entry)
+def touch_article_in_db(topic):
+    """Mark the stored article as verified current without rewriting it."""
+    try:
+        Article.query.filter_by(topic=topic).update({"retrieved_at": datetime.utcnow()})
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to update retrieval time for '{topic}': {e}")
+
+def _epoch(value):
+    # Timestamps are stored as naive UTC (datetime.utcnow)
+    return value.replace(tzinfo=timezone.utc).timestamp() if value else None
+
+def get_freshness_from_db(topic):
+    """
+    When each stored artifact for `topic` was produced, as epoch seconds:
+    {"article", "summary:<level>", "learning_path"}; absent artifacts are omitted.
+    """
+    timestamps = {"article": _epoch(db.session.query(Article.retrieved_at).filter_by(topic=topic).scalar())}
+
+    summary = db.session.query(
+        Summary.basic_summary.isnot(None), Summary.basic_generated_at,
+        Summary.intermediate_summary.isnot(None), Summary.intermediate_generated_at,
+        Summary.advanced_summary.isnot(None), Summary.advanced_generated_at,
+        Summary.generated_at
+    ).filter_by(topic=topic).first()
+    if summary:
+        for level, (present, generated_at) in zip(
+            ("basic", "intermediate", "advanced"), zip(summary[0:6:2], summary[1:6:2])
+        ):
+            # Rows written before per-level timestamps only have generated_at
+            if present:
+                timestamps[f"summary:{level}"] = _epoch(generated_at or summary[6])
+
+    timestamps["learning_path"] = _epoch(
+        db.session.query(LearningPath.last_updated).filter_by(topic=topic).scalar()
+    )
+    return {field: generated_at for field, generated_at in timestamps.items() if generated_at}
+
+def get_article_topics_from_db(topics):
+    """The subset of `topics` that have a stored article."""
+    topics = list(topics)
+    found = set()
+    for start in range(0, len(topics), UPSERT_CHUNK_SIZE):
+        rows = db.session.query(Article.topic).filter(Article.topic.in_(topics[start:start + UPSERT_CHUNK_SIZE]))
+        found.update(topic for (topic,) in rows)
+    return found
+
+def get_article_revision_from_db(topic):
+    article = Article.query.filter_by(topic=topic).first()
+    return article.revid if article else None
 
+def store_links_in_db(canonical_topic, links):
     try:
+        _replace_links({canonical_topic: links})
         db.session.commit()
         logger.info(f"Links stored for {canonical_topic}")
     except Exception as e:
@@ -94,31 +253,50 @@ def store_links_in_db(canonical_topic, links):
         logger.error(f"Failed to store links for '{canonical_topic}': {e}")
 
 def get_links_from_db(topic):
-    entry = Links.query.filter_by(topic=topic).first()
-    return json.loads(entry.linked_topic) if entry and entry.linked_topic else []
+    rows = (
+        db.session.query(LinkEdge.target)
+        .filter(LinkEdge.source == topic)
+        .order_by(LinkEdge.position)
+        .all()
+    )
+    return [target for (target,) in rows]
+
+def get_links_for_topics_from_db(topics):
+    """Bulk get_links_from_db: {topic: [target, ...]} for the topics that have links."""
+    topics = list(topics)
+    links = {}
+    for start in range(0, len(topics), UPSERT_CHUNK_SIZE):
+        rows = (
+            db.session.query(LinkEdge.source, LinkEdge.target)
+            .filter(LinkEdge.source.in_(topics[start:start + UPSERT_CHUNK_SIZE]))
+            .order_by(LinkEdge.source, LinkEdge.position)
+            .all()
+        )
+        for source, target in rows:
+            links.setdefault(source, []).append(target)
+    return links
+
+
+def get_link_graph_from_db():
+    """Return {topic: [linked_topic, ...]} for every ingested article."""
+    graph = {}
+    rows = db.session.query(LinkEdge.source, LinkEdge.target).order_by(LinkEdge.source, LinkEdge.position)
+    for source, target in rows.yield_per(10000):
+        graph.setdefault(source, []).append(target)
+    return graph
 
 
 def store_summaries_in_db(canonical_topic, summaries_dict):
-    existing = Summary.query.filter_by(topic=canonical_topic).first()
-
-    if existing:
-        logger.info(f"Updating summaries for '{canonical_topic}'")
-        existing.basic_summary = summaries_dict.get("basic")
-        existing.intermediate_summary = summaries_dict.get("intermediate")
-        existing.advanced_summary = summaries_dict.get("advanced")
-        existing.generated_at = datetime.utcnow()
-    else:
-        logger.info(f"Storing new summaries for '{canonical_topic}'")
-        new_entry = Summary(
-            topic=canonical_topic,
-            basic_summary=summaries_dict.get("basic"),
-            intermediate_summary=summaries_dict.get("intermediate"),
-            advanced_summary=summaries_dict.get("advanced"),
-            generated_at=datetime.utcnow()
-        )
-        db.session.add(new_entry)
+    """Store the levels present in `summaries_dict`, leaving the other levels untouched."""
+    now = datetime.utcnow()
+    row = {"topic": canonical_topic, "generated_at": now}
+    for level in ("basic", "intermediate", "advanced"):
+        if summaries_dict.get(level):
+            row[f"{level}_summary"] = summaries_dict[level]
+            row[f"{level}_generated_at"] = now
 
     try:
+        _upsert(Summary, [row], ["topic"], [column for column in row if column != "topic"])
         db.session.commit()
         logger.info(f"Summaries stored for '{canonical_topic}'")
     except Exception as e:
@@ -136,29 +314,28 @@ def get_summary_from_db(topic, level):
     }.get(level)
 
 def store_learning_path_in_db(canonical_topic, ranked_links):
-    existing_path = LearningPath.query.filter_by(topic=canonical_topic).first()
-    json_data = json.dumps(ranked_links)
-
-    if existing_path:
-        logger.info(f"Updating learning path for '{canonical_topic}'")
-        existing_path.ranked_links = json_data
-        existing_path.last_updated = datetime.utcnow()
-    else:
-        logger.info(f"Storing new learning path for '{canonical_topic}'")
-        new_learning_path = LearningPath(
-            topic=canonical_topic,
-            ranked_links=json_data,
-            last_updated=datetime.utcnow()
-        )
-        db.session.add(new_learning_path)
-
+    row = {"topic": canonical_topic, "ranked_links": json.dumps(ranked_links), "last_updated": datetime.utcnow()}
     try:
+        _upsert(LearningPath, [row], ["topic"], ["ranked_links", "last_updated"])
         db.session.commit()
         logger.info(f"Learning path stored for '{canonical_topic}'")
     except Exception as e:
         db.session.rollback()
         logger.error(f"Failed to store learning path for '{canonical_topic}': {e}")
 
+def get_learning_paths_from_db(topics):
+    """Bulk get_learning_path_from_db: {topic: ranked links} for the topics that have one."""
+    topics = list(topics)
+    learning_paths = {}
+    for start in range(0, len(topics), UPSERT_CHUNK_SIZE):
+        rows = (
+            db.session.query(LearningPath.topic, LearningPath.ranked_links)
+            .filter(LearningPath.topic.in_(topics[start:start + UPSERT_CHUNK_SIZE]))
+            .all()
+        )
+        learning_paths.update((topic, json.loads(ranked_links)) for topic, ranked_links in rows if ranked_links)
+    return learning_paths
+
 def get_learning_path_from_db(topic):
     learning_path = LearningPath.query.filter_by(topic=topic).first()
     if not learning_path:
@@ -167,14 +344,8 @@ def get_learning_path_from_db(topic):
     return json.loads(learning_path.ranked_links) if learning_path.ranked_links else []
 
 def store_canonical_topic_in_db(user_input, canonical_title):
-    existing = CanonicalTopic.query.filter_by(user_input=user_input).first()
-    if existing:
-        existing.canonical_title = canonical_title
-    else:
-        new_entry = CanonicalTopic(user_input=user_input, canonical_title=canonical_title)
-        db.session.add(new_entry)
-
     try:
+        _upsert_canonical_topics({user_input: canonical_title})
         db.session.commit()
         logger.info(f"Canonical topic stored in db: '{user_input}' -> '{canonical_title}'")
     except Exception as e:
@@ -182,9 +353,102 @@ def store_canonical_topic_in_db(user_input, canonical_title):
         logger.error(f"Failed to store canonical topic mapping for '{user_input}': {e}")
 
 def get_canonical_topic_from_db(user_input):
-    entry = CanonicalTopic.query.filter_by(user_input=user_input).first()
+    entry = CanonicalTopic.query.filter_by(user_input=normalize_topic(user_input)).first()
     return entry.canonical_title if entry else None
 
+def store_canonical_topics_in_db(mapping):
+    """Store many user_input -> canonical_title mappings in one commit."""
+    if not mapping:
+        return
+
+    try:
+        _upsert_canonical_topics(mapping)
+        db.session.commit()
+        logger.info(f"Stored {len(mapping)} canonical topic mappings in db")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to store {len(mapping)} canonical topic mappings: {e}")
+
+def iter_known_titles_from_db():
+    """Every distinct ingested article and resolved canonical title, streamed."""
+    rows = db.session.query(Article.topic).union(db.session.query(CanonicalTopic.canonical_title))
+    for (title,) in rows.yield_per(10000):
+        yield title
+
+def get_canonical_topics_from_db(user_inputs):
+    keys = {user_input: normalize_topic(user_input) for user_input in user_inputs}
+    if not keys:
+        return {}
+    entries = CanonicalTopic.query.filter(CanonicalTopic.user_input.in_(set(keys.values()))).all()
+    found = {entry.user_input: entry.canonical_title for entry in entries}
+    return {user_input: found[key] for user_input, key in keys.items() if key in found}
+
+# Full-text search (tables and indexes from migration 0003). Both queries yield
+# (topic, score) with lower scores ranking higher, ordered by (score, topic) so
+# pages can continue after the last row with a keyset condition.
+_SQLITE_SEARCH = """
+    SELECT topic, score FROM (
+        SELECT topic, bm25(article_search, 10.0, 1.0, 2.0) AS score
+        FROM article_search WHERE article_search MATCH :query
+    )
+    {after}
+    ORDER BY score, topic
+    LIMIT :limit
+"""
+
+_POSTGRESQL_SEARCH = """
+    WITH q AS (SELECT to_tsquery('english', :query) AS query),
+    matches AS (
+        SELECT topic FROM articles, q WHERE search_vector @@ q.query
+        UNION
+        SELECT topic FROM summaries, q WHERE search_vector @@ q.query
+    ),
+    ranked AS (
+        SELECT a.topic, -ts_rank(a.search_vector || coalesce(s.search_vector, ''::tsvector), q.query)::float8 AS score
+        FROM matches m
+        JOIN articles a ON a.topic = m.topic
+        LEFT JOIN summaries s ON s.topic = a.topic, q
+    )
+    SELECT topic, score FROM ranked
+    {after}
+    ORDER BY score, topic
+    LIMIT :limit
+"""
+
+_SEARCH_AFTER = "WHERE score > :after_score OR (score = :after_score AND topic > :after_topic)"
+
+def search_articles_in_db(terms, limit, after=None):
+    """
+    Ranked full-text search over stored articles and their summaries. `terms`
+    are plain words; the last one also matches as a prefix. `after` is the
+    (score, topic) of the previous page's last row. Returns [(topic, score)],
+    which is empty on databases without a search index, so /search falls back
+    to Wikipedia there.
+    """
+    if not terms:
+        return []
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        sql = _SQLITE_SEARCH
+        query = " ".join(f'"{term}"' for term in terms) + "*"
+    elif dialect == "postgresql":
+        sql = _POSTGRESQL_SEARCH
+        query = " & ".join(terms) + ":*"
+    else:
+        logger.warning(f"Full-text search is not implemented for the '{dialect}' dialect")
+        return []
+
+    params = {"query": query, "limit": limit}
+    if after:
+        params["after_score"], params["after_topic"] = after
+    try:
+        rows = db.session.execute(text(sql.format(after=_SEARCH_AFTER if after else "")), params)
+        return [(topic, score) for topic, score in rows]
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Full-text search failed for {terms}: {e}")
+        return []
+
 def initialize_database():
     db.create_all()
     logger.info("Database tables initialized.")
@@ -192,7 +456,7 @@ def initialize_database():
 def clear_database():
     logger.warning("Clearing all database records...")
     db.session.query(Article).delete()
-    db.session.query(Links).delete()
+    db.session.query(LinkEdge).delete()
     db.session.query(Summary).delete()
     db.session.query(LearningPath).delete()
     db.session.query(CanonicalTopic).delete()
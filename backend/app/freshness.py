@@ -0,0 +1,163 @@
+import os
+import math
+import time
+import random
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.cache import get_freshness_from_cache, store_freshness_in_cache
+from app.database import get_freshness_from_db
+from app.jobs import QUEUE_ENABLED, enqueue_job
+from app.singleflight import acquire_lease
+from app.utils import normalize_topic
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+# Past the soft age content is still served, and a background refresh is
+# started; past the hard age it is treated as missing and regenerated inline.
+FRESHNESS_POLICIES = {
+    "article": {
+        "soft": int(os.getenv("FRESHNESS_ARTICLE_SOFT_AGE", 7 * DAY)),
+        "hard": int(os.getenv("FRESHNESS_ARTICLE_HARD_AGE", 90 * DAY))
+    },
+    "summary": {
+        "soft": int(os.getenv("FRESHNESS_SUMMARY_SOFT_AGE", 30 * DAY)),
+        "hard": int(os.getenv("FRESHNESS_SUMMARY_HARD_AGE", 180 * DAY))
+    },
+    "learning_path": {
+        "soft": int(os.getenv("FRESHNESS_LEARNING_PATH_SOFT_AGE", 30 * DAY)),
+        "hard": int(os.getenv("FRESHNESS_LEARNING_PATH_HARD_AGE", 180 * DAY))
+    }
+}
+# Scale of early refreshes, as a fraction of the soft age: a request at
+# soft - n * window refreshes with probability e^-n
+EARLY_REFRESH_WINDOW = float(os.getenv("FRESHNESS_EARLY_REFRESH_WINDOW", 0.1))
+# Minimum interval between refreshes of one artifact. The lease is not released
+# when a refresh finishes: workers may see the old timestamp for up to
+# L1_CACHE_TTL, and a failing refresh should not be retried on every request.
+REFRESH_LEASE_TTL = int(os.getenv("FRESHNESS_REFRESH_INTERVAL", 600))
+REFRESH_WORKERS = int(os.getenv("FRESHNESS_REFRESH_WORKERS", 2))
+
+_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS)
+
+
+def _field(artifact: str, level: str = None) -> str:
+    return f"{artifact}:{level}" if artifact == "summary" else artifact
+
+
+def mark_fresh(canonical_topic: str, artifact: str, levels=None):
+    """Record that `artifact` (each of `levels` for summaries) was just produced."""
+    now = time.time()
+    fields = [_field(artifact, level) for level in levels] if levels else [_field(artifact)]
+    store_freshness_in_cache(canonical_topic, dict.fromkeys(fields, now))
+
+
+def content_age(canonical_topic: str, artifact: str, level: str = None):
+    """Seconds since `artifact` was produced, or None if unknown."""
+    field = _field(artifact, level)
+    timestamps = get_freshness_from_cache(canonical_topic)
+    if not timestamps or field not in timestamps:
+        timestamps = get_freshness_from_db(canonical_topic)
+        if timestamps:
+            store_freshness_in_cache(canonical_topic, timestamps)
+    generated_at = (timestamps or {}).get(field)
+    return max(0, int(time.time() - generated_at)) if generated_at else None
+
+
+def is_expired(artifact: str, age) -> bool:
+    return age is not None and age >= FRESHNESS_POLICIES[artifact]["hard"]
+
+
+def has_expired(ages: dict) -> bool:
+    return any(is_expired(artifact, age) for artifact, age in ages.items())
+
+
+def age_header(ages: dict) -> dict:
+    """HTTP Age header for a response built from artifacts of these ages: the oldest."""
+    known = [age for age in ages.values() if age is not None]
+    return {"Age": str(max(known))} if known else {}
+
+
+def should_refresh(artifact: str, age) -> bool:
+    """
+    Probabilistic early refresh (XFetch): the chance of refreshing grows as
+    exp(-(soft - age) / window) while approaching the soft age and is 1 past
+    it, so entries produced together (e.g. by `flask cache warm`) are not all
+    refreshed by the same request burst.
+    """
+    if age is None:
+        return False
+    soft = FRESHNESS_POLICIES[artifact]["soft"]
+    window = soft * EARLY_REFRESH_WINDOW
+    return age - window * math.log(1.0 - random.random()) >= soft
+
+
+def refresh_artifact(canonical_topic: str, artifact: str, level: str = None):
+    """Regenerate one artifact now. Runs on the refresh pool or a job worker."""
+    from app.content_retrieval import refresh_article, refresh_summary, refresh_learning_path
+
+    if artifact == "article":
+        refreshed = refresh_article(canonical_topic)
+    elif artifact == "summary":
+        refreshed = refresh_summary(canonical_topic, level)
+    else:
+        refreshed = refresh_learning_path(canonical_topic)
+    if not refreshed:
+        raise RuntimeError(f"Refreshing {_field(artifact, level)} for '{canonical_topic}' failed")
+    logger.info(f"Refreshed {_field(artifact, level)} for '{canonical_topic}'")
+    return refreshed
+
+
+def _run_refresh(flask_app, refresh, *args):
+    with flask_app.app_context():
+        try:
+            refresh(*args)
+        except Exception as e:
+            logger.error(f"Background refresh failed: {e}")
+
+
+def schedule_refresh(canonical_topic: str, artifact: str, level: str = None) -> bool:
+    """Start a background refresh unless the same artifact was refreshed recently."""
+    if not acquire_lease("refresh", f"{normalize_topic(canonical_topic)}:{_field(artifact, level)}", REFRESH_LEASE_TTL):
+        return False
+
+    if QUEUE_ENABLED:
+        enqueue_job(f"refresh_{artifact}", canonical_topic, level or "basic")
+    else:
+        _executor.submit(_run_refresh, current_app._get_current_object(), refresh_artifact, canonical_topic, artifact, level)
+    logger.info(f"Scheduled background refresh of {_field(artifact, level)} for '{canonical_topic}'")
+    return True
+
+
+def schedule_graph_scores_refresh() -> bool:
+    """Start recomputing the link graph scores unless that was done recently."""
+    from app.ranking import refresh_graph_scores
+
+    if not acquire_lease("refresh", "graph_scores", REFRESH_LEASE_TTL):
+        return False
+
+    if QUEUE_ENABLED:
+        enqueue_job("refresh_graph_scores", "*")
+    else:
+        _executor.submit(_run_refresh, current_app._get_current_object(), refresh_graph_scores)
+    logger.info("Scheduled background refresh of the link graph scores")
+    return True
+
+
+def revalidate(canonical_topic: str, artifacts) -> dict:
+    """
+    Ages of the (artifact, level) pairs being served for `canonical_topic`,
+    as {artifact: seconds or None}, scheduling a refresh for any that is due.
+    Expired artifacts are left to the caller, which regenerates them inline.
+    """
+    ages = {}
+    for artifact, level in artifacts:
+        age = content_age(canonical_topic, artifact, level)
+        if not is_expired(artifact, age) and should_refresh(artifact, age):
+            schedule_refresh(canonical_topic, artifact, level)
+        ages[artifact] = age
+    return ages
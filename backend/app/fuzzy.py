@@ -0,0 +1,110 @@
+import os
+import re
+import math
+import threading
+from array import array
+from collections import Counter
+
+from app.utils import normalize_topic
+
+# Jaccard similarity of trigram sets needed to accept a match ("Blak hole" vs
+# "Black hole" is ~0.62, "Light" vs "Flight" ~0.44)
+FUZZY_MATCH_THRESHOLD = float(os.getenv("FUZZY_MATCH_THRESHOLD", 0.6))
+FUZZY_INDEX_MAX_TITLES = int(os.getenv("FUZZY_INDEX_MAX_TITLES", 2_000_000))
+# Candidates ranked by shared rare trigrams that are re-scored exactly
+CANDIDATES = 50
+
+_WORD_RE = re.compile(r"\w+")
+_DIGITS_RE = re.compile(r"\d+")
+_ROMAN_RE = re.compile(r"m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})")
+
+
+def trigrams(key: str) -> set:
+    """pg_trgm-style trigrams: each word padded with two leading spaces and one trailing."""
+    grams = set()
+    for word in _WORD_RE.findall(key):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def numerals(key: str) -> frozenset:
+    """
+    Numbers and roman numerals in a normalized key. Titles that differ only in
+    these ("World War I"/"II", "Windows 10"/"11") are different articles.
+    """
+    found = set()
+    for word in _WORD_RE.findall(key):
+        found.update(_DIGITS_RE.findall(word))
+        if _ROMAN_RE.fullmatch(word):
+            found.add(word)
+    return frozenset(found)
+
+
+def similarity(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class TrigramIndex:
+    """Inverted index from trigram to title ids, for typo-tolerant title lookup."""
+
+    def __init__(self, max_titles: int = FUZZY_INDEX_MAX_TITLES):
+        self.max_titles = max_titles
+        self._titles = []
+        self._known = set()
+        self._postings = {}
+        self._lock = threading.Lock()
+
+    def add(self, titles):
+        with self._lock:
+            for title in titles:
+                if title in self._known or len(self._titles) >= self.max_titles:
+                    continue
+                title_id = len(self._titles)
+                self._titles.append(title)
+                self._known.add(title)
+                for gram in trigrams(normalize_topic(title)):
+                    self._postings.setdefault(gram, array("I")).append(title_id)
+
+    def match(self, text: str, threshold: float = FUZZY_MATCH_THRESHOLD):
+        """
+        The indexed title most similar to `text`, or None if none reaches
+        `threshold` or the best score is shared by several titles. Titles whose
+        numerals differ from the input's never match.
+        """
+        key = normalize_topic(text)
+        query = trigrams(key)
+        if not query:
+            return None
+        # A title scoring >= threshold shares at least threshold * |query|
+        # trigrams, so it contains one of the rarest |query| - that + 1 of them;
+        # only those posting lists need scanning.
+        prefix_size = len(query) - math.ceil(threshold * len(query)) + 1
+        postings = sorted((self._postings.get(gram, ()) for gram in query), key=len)[:prefix_size]
+
+        counts = Counter()
+        for ids in postings:
+            counts.update(ids)
+        if not counts:
+            return None
+        query_numerals = numerals(key)
+        scored = []
+        for title_id, _ in counts.most_common(CANDIDATES):
+            title_key = normalize_topic(self._titles[title_id])
+            if numerals(title_key) == query_numerals:
+                scored.append((similarity(query, trigrams(title_key)), self._titles[title_id]))
+        if not scored:
+            return None
+        scored.sort(reverse=True)
+        best_score, best_title = scored[0]
+        if best_score < threshold:
+            return None
+        if len(scored) > 1 and scored[1][0] == best_score and normalize_topic(scored[1][1]) != normalize_topic(best_title):
+            return None
+        return best_title
+
+    def __len__(self):
+        return len(self._titles)
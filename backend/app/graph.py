@@ -0,0 +1,150 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.cache import get_graph_from_cache, store_graph_in_cache, get_learning_path_from_cache
+from app.content_retrieval import get_canonical_topics, get_article_links
+from app.database import get_article_topics_from_db, get_learning_paths_from_db, get_links_for_topics_from_db
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = int(os.getenv("GRAPH_MAX_DEPTH", 3))
+MAX_FANOUT = int(os.getenv("GRAPH_MAX_FANOUT", 20))
+# Articles a single /graph request may fetch from Wikipedia; the rest stay leaves
+FETCH_BUDGET = int(os.getenv("GRAPH_FETCH_BUDGET", 10))
+FETCH_WORKERS = int(os.getenv("GRAPH_FETCH_WORKERS", 5))
+GRAPH_TTL = int(os.getenv("GRAPH_CACHE_TTL", 3600))
+
+
+def _title(link: str) -> str:
+    return link.replace("_", " ")
+
+
+def _stored_neighbours(canonical_topics):
+    """
+    {canonical_topic: neighbours} from stored data, preferring the curated
+    learning path over the links in page order; None for articles that have
+    not been ingested yet. Learning paths not in the cache, links and the
+    remaining articles are each read with one query for all of the topics.
+    """
+    neighbours = {}
+    for canonical_topic in canonical_topics:
+        learning_path = get_learning_path_from_cache(canonical_topic)
+        if learning_path:
+            neighbours[canonical_topic] = learning_path
+
+    remaining = [topic for topic in canonical_topics if topic not in neighbours]
+    if remaining:
+        neighbours.update(get_learning_paths_from_db(remaining))
+        remaining = [topic for topic in remaining if not neighbours.get(topic)]
+    if remaining:
+        neighbours.update(get_links_for_topics_from_db(remaining))
+        remaining = [topic for topic in remaining if not neighbours.get(topic)]
+    if remaining:
+        ingested = get_article_topics_from_db(remaining)
+        for topic in remaining:
+            neighbours[topic] = [] if topic in ingested else None
+    return neighbours
+
+
+def _fetch_links(flask_app, canonical_topics):
+    def fetch(canonical_topic):
+        with flask_app.app_context():
+            get_article_links(canonical_topic)
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        list(executor.map(fetch, canonical_topics))
+    return _stored_neighbours(canonical_topics)
+
+
+def _expand_frontier(flask_app, frontier, fanout, budget):
+    """
+    Return ({title: [neighbour titles]}, remaining budget) for the frontier
+    titles that could be expanded from stored data or within the fetch budget.
+    """
+    canonical = get_canonical_topics(frontier)
+    stored_neighbours = _stored_neighbours(list(dict.fromkeys(canonical.values())))
+    neighbours, missing = {}, []
+    for title in frontier:
+        canonical_topic = canonical.get(title)
+        if not canonical_topic:
+            continue
+        stored = stored_neighbours[canonical_topic]
+        if stored is not None:
+            neighbours[title] = stored
+        else:
+            missing.append((title, canonical_topic))
+
+    to_fetch = missing[:budget]
+    if to_fetch:
+        fetched = _fetch_links(flask_app, [canonical_topic for _, canonical_topic in to_fetch])
+        for title, canonical_topic in to_fetch:
+            if fetched[canonical_topic] is not None:
+                neighbours[title] = fetched[canonical_topic]
+    if len(missing) > budget:
+        logger.info(f"Graph fetch budget exhausted; {len(missing) - budget} node(s) left unexpanded")
+
+    trimmed = {}
+    for title, links in neighbours.items():
+        candidates = (_title(link) for link in links)
+        trimmed[title] = list(dict.fromkeys(c for c in candidates if c != title))[:fanout]
+    return trimmed, budget - len(to_fetch)
+
+
+def expand_graph(canonical_topic, depth, fanout, fetch_budget=FETCH_BUDGET):
+    """
+    Breadth-first expansion of the link graph from `canonical_topic`.
+
+    Returns a compact structure: `nodes` is the title table (a node's id is its
+    index), `adjacency[i]` lists the ids node i links to, and `unexpanded`
+    lists ids above the depth limit that could not be ingested or were over the
+    fetch budget.
+    """
+    flask_app = current_app._get_current_object()
+    ids = {canonical_topic: 0}
+    nodes = [canonical_topic]
+    adjacency = [[]]
+    unexpanded = []
+    frontier = [canonical_topic]
+    budget = fetch_budget
+
+    for _ in range(depth):
+        if not frontier:
+            break
+        neighbours, budget = _expand_frontier(flask_app, frontier, fanout, budget)
+        next_frontier = []
+        for title in frontier:
+            if title not in neighbours:
+                unexpanded.append(ids[title])
+                continue
+            for neighbour in neighbours[title]:
+                if neighbour not in ids:
+                    ids[neighbour] = len(nodes)
+                    nodes.append(neighbour)
+                    adjacency.append([])
+                    next_frontier.append(neighbour)
+                adjacency[ids[title]].append(ids[neighbour])
+        frontier = next_frontier
+
+    return {
+        "topic": canonical_topic,
+        "depth": depth,
+        "fanout": fanout,
+        "nodes": nodes,
+        "adjacency": adjacency,
+        "unexpanded": unexpanded
+    }
+
+
+def get_topic_graph(canonical_topic, depth, fanout):
+    graph = get_graph_from_cache(canonical_topic, depth, fanout)
+    if graph:
+        return graph
+
+    graph = expand_graph(canonical_topic, depth, fanout)
+    # Partial graphs are retried on the next request instead of being cached
+    if not graph["unexpanded"]:
+        store_graph_in_cache(canonical_topic, depth, fanout, graph, GRAPH_TTL)
+    return graph
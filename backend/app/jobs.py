@@ -0,0 +1,257 @@
+import json
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+
+import click
+import redis
+from flask.cli import AppGroup
+
+from app.cache import redis_client
+from app.utils import normalize_topic
+
+logger = logging.getLogger(__name__)
+
+# When enabled, cold generation requests return 202 with a job id instead of
+# running summarize_level / rank_learning_path inside the HTTP request.
+QUEUE_ENABLED = os.getenv("GENERATION_QUEUE_ENABLED", "false").lower() in ("1", "true", "yes")
+QUEUE_KEY = "jobs:queue"
+JOB_TTL = int(os.getenv("JOB_TTL", 86400))
+# A job still "running" after this long is assumed lost and can be re-enqueued
+JOB_TIMEOUT = int(os.getenv("JOB_TIMEOUT", 300))
+WORKER_POLL_TIMEOUT = 5
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _active_key(kind: str, topic: str, level: str) -> str:
+    return f"job:active:{kind}:{normalize_topic(topic)}:{level}"
+
+
+def enqueue_job(kind: str, topic: str, level: str = "basic"):
+    """
+    Queue a generation job and return its record. If an identical job is
+    already queued or running, that job is returned instead of a new one.
+    Returns None if Redis is unavailable.
+    """
+    job_id = uuid.uuid4().hex
+    try:
+        if not redis_client.set(_active_key(kind, topic, level), job_id, nx=True, ex=JOB_TIMEOUT):
+            existing = get_job(redis_client.get(_active_key(kind, topic, level)) or "")
+            if existing and existing["status"] in (JOB_QUEUED, JOB_RUNNING):
+                return existing
+            redis_client.set(_active_key(kind, topic, level), job_id, ex=JOB_TIMEOUT)
+
+        now = time.time()
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "topic": topic,
+            "level": level,
+            "status": JOB_QUEUED,
+            "created_at": now,
+            "updated_at": now
+        }
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hset(_job_key(job_id), mapping=job)
+        pipe.expire(_job_key(job_id), JOB_TTL)
+        pipe.lpush(QUEUE_KEY, job_id)
+        pipe.execute()
+        logger.info(f"Enqueued {kind} job {job_id} for '{topic}'")
+        return job
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Failed to enqueue {kind} job for '{topic}': {e}")
+        return None
+
+
+def get_job(job_id: str):
+    if not job_id:
+        return None
+    try:
+        job = redis_client.hgetall(_job_key(job_id))
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Failed to read job {job_id}: {e}")
+        return None
+    if not job:
+        return None
+    if "result" in job:
+        job["result"] = json.loads(job["result"])
+    for field in ("created_at", "updated_at"):
+        job[field] = float(job[field])
+    return job
+
+
+def job_accepted_payload(job: dict, provisional_links=None) -> dict:
+    """
+    Body of the 202 response that tells the client where to poll, plus any
+    locally ranked links it can show until the job's result is ready.
+    """
+    payload = {"job_id": job["id"], "status": job["status"], "status_url": f"/jobs/{job['id']}"}
+    if provisional_links:
+        payload["provisional_links"] = provisional_links
+    return payload
+
+
+def _update_job(job_id: str, **fields):
+    fields["updated_at"] = time.time()
+    try:
+        redis_client.hset(_job_key(job_id), mapping=fields)
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Failed to update job {job_id}: {e}")
+
+
+def _run_summary_job(topic, level):
+    from app.content_retrieval import get_canonical_topic, get_article_summary
+
+    canonical_topic = get_canonical_topic(topic)
+    if not canonical_topic:
+        raise LookupError(f"Could not resolve topic '{topic}'")
+
+    summary = get_article_summary(canonical_topic, level)
+    if not summary:
+        raise RuntimeError(f"Failed to retrieve summary for '{canonical_topic}'")
+    return {"topic": canonical_topic, "level": level, "summary": summary}
+
+
+def _run_learning_path_job(topic, level):
+    from app.content_retrieval import get_canonical_topic, get_article_summary, get_learning_path, is_degraded
+
+    canonical_topic = get_canonical_topic(topic)
+    if not canonical_topic:
+        raise LookupError(f"Could not resolve topic '{topic}'")
+
+    summary = get_article_summary(canonical_topic, level)
+    learning_path = get_learning_path(canonical_topic, level)
+    if not learning_path:
+        raise RuntimeError(f"Failed to retrieve learning path for '{canonical_topic}'")
+    return {
+        "topic": canonical_topic,
+        "level": level,
+        "summary": summary,
+        "links": learning_path,
+        "degraded": is_degraded(canonical_topic, summary, learning_path)
+    }
+
+
+def _run_rerank_job(topic, level):
+    from app.content_retrieval import get_canonical_topic, get_article_summary, regenerate_learning_path, is_degraded
+
+    canonical_topic = get_canonical_topic(topic)
+    if not canonical_topic:
+        raise LookupError(f"Could not resolve topic '{topic}'")
+
+    ranked_links = regenerate_learning_path(canonical_topic)
+    if not ranked_links:
+        raise RuntimeError("Failed to generate learning path")
+    summary = get_article_summary(canonical_topic, level="basic")
+    return {
+        "topic": canonical_topic,
+        "summary": summary,
+        "links": ranked_links,
+        "degraded": is_degraded(canonical_topic, summary, ranked_links)
+    }
+
+
+def _run_refresh_job(artifact):
+    def run(topic, level):
+        from app.freshness import refresh_artifact
+
+        refresh_artifact(topic, artifact, level)
+        return {"topic": topic, "level": level, "refreshed": artifact}
+    return run
+
+
+def _run_graph_scores_job(topic, level):
+    from app.ranking import refresh_graph_scores
+
+    nodes = refresh_graph_scores()
+    if nodes is None:
+        raise RuntimeError("Link graph scores are already being recomputed")
+    return {"refreshed": "graph_scores", "nodes": nodes}
+
+
+JOB_HANDLERS = {
+    "summary": _run_summary_job,
+    "learning_path": _run_learning_path_job,
+    "rerank": _run_rerank_job,
+    # Background refreshes of stale content scheduled by app.freshness
+    "refresh_article": _run_refresh_job("article"),
+    "refresh_summary": _run_refresh_job("summary"),
+    "refresh_learning_path": _run_refresh_job("learning_path"),
+    "refresh_graph_scores": _run_graph_scores_job
+}
+
+
+def run_job(job_id: str):
+    job = get_job(job_id)
+    if not job:
+        logger.warning(f"Job {job_id} expired before it could run")
+        return
+
+    _update_job(job_id, status=JOB_RUNNING)
+    try:
+        result = JOB_HANDLERS[job["kind"]](job["topic"], job["level"])
+        _update_job(job_id, status=JOB_DONE, result=json.dumps(result))
+        logger.info(f"Job {job_id} ({job['kind']} '{job['topic']}') finished")
+    except Exception as e:
+        logger.error(f"Job {job_id} ({job['kind']} '{job['topic']}') failed: {e}")
+        _update_job(job_id, status=JOB_FAILED, error=str(e))
+    finally:
+        try:
+            redis_client.delete(_active_key(job["kind"], job["topic"], job["level"]))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Failed to clear active marker for job {job_id}: {e}")
+
+
+def run_worker(app, stop=None):
+    """Process jobs from the queue inside `app`'s context until `stop` (an Event) is set."""
+    logger.info(f"Job worker {os.getpid()} started")
+    while stop is None or not stop.is_set():
+        try:
+            item = redis_client.brpop(QUEUE_KEY, timeout=WORKER_POLL_TIMEOUT)
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Job worker {os.getpid()} lost Redis: {e}")
+            time.sleep(WORKER_POLL_TIMEOUT)
+            continue
+        if not item:
+            continue
+        with app.app_context():
+            run_job(item[1])
+
+
+def _worker_process(stop=None):
+    # Each process builds its own app, so it gets its own DB and Redis
+    # connections and starts its own background threads
+    from app import create_app
+    run_worker(create_app(), stop)
+
+
+jobs_cli = AppGroup("jobs", help="Background generation jobs.")
+
+
+@jobs_cli.command("worker")
+@click.option("--processes", "-p", default=2, show_default=True, help="Number of worker processes.")
+def worker_command(processes):
+    """Run a pool of job worker processes."""
+    # Spawned, not forked: a forked child would inherit the parent's started
+    # flags for the invalidation listener and suggest index, but not the threads
+    spawn = multiprocessing.get_context("spawn")
+    workers = [spawn.Process(target=_worker_process, daemon=True) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    click.echo(f"Started {processes} job worker(s); Ctrl+C to stop.")
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
@@ -7,18 +7,46 @@ from datetime import datetime
 from typing import Optional
 
 import anthropic
+from app.metrics import timed, llm_latency, record_token_usage
 from app.utils import extract_json_from_text
 
 logger = logging.getLogger(__name__)
 
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+# Per-request timeout; on timeout callers fall back to local ranking
+ANTHROPIC_TIMEOUT = float(os.getenv("ANTHROPIC_TIMEOUT", 30))
+client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=ANTHROPIC_TIMEOUT)
+# Used by the asyncio serving mode (app/async_routes.py)
+async_client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY, timeout=ANTHROPIC_TIMEOUT)
+# Optional app.rate_limit.TokenBucket pacing the sync calls (set by `flask cache warm`)
+rate_limiter = None
+
+def _wait_for_rate_limit():
+    if rate_limiter is not None:
+        rate_limiter.acquire()
 
 def rank_learning_path(topic: str, links: list, summary: str):
     if not links:
         logger.warning(f"No links provided for topic '{topic}'. Returning empty learning path.")
-        return {"ranked": []}
+        return []
 
+    _wait_for_rate_limit()
+    with timed(llm_latency, "rank_learning_path"):
+        response = client.messages.create(**build_ranking_request(topic, links, summary))
+    record_token_usage("rank_learning_path", response)
+    return parse_ranking_response(topic, response)
+
+async def rank_learning_path_async(topic: str, links: list, summary: str):
+    if not links:
+        logger.warning(f"No links provided for topic '{topic}'. Returning empty learning path.")
+        return []
+
+    with timed(llm_latency, "rank_learning_path"):
+        response = await async_client.messages.create(**build_ranking_request(topic, links, summary))
+    record_token_usage("rank_learning_path", response)
+    return parse_ranking_response(topic, response)
+
+def build_ranking_request(topic: str, links: list, summary: str) -> dict:
     links_text = json.dumps(links)
 
     system_prompt = (
@@ -65,7 +93,7 @@ Ensure no additional text is included.
 All article links must be a subset of the original list of links.
 """
 
-    response = client.messages.create(
+    return dict(
         model="claude-3-haiku-20240307",
         max_tokens=1024,
         temperature= 0,
@@ -73,6 +101,7 @@ All article links must be a subset of the original list of links.
         messages=[{"role": "user", "content": user_prompt}]
     )
 
+def parse_ranking_response(topic: str, response):
     logger.debug(f"LLM raw response: {response.content[0].text}")
 
     try:
@@ -94,87 +123,104 @@ All article links must be a subset of the original list of links.
         logger.error(f"Error parsing ranked links JSON: {e}")
         return None
 
-def summarize_text(text):
+# Per-level prompts for summarize_level: one reading level per call, answered
+# as plain text, with an output budget sized to the requested length.
+SUMMARY_LEVELS = {
+    "basic": {
+        "audience": "young learners in grades 1-3",
+        "guidelines": (
+            "- Use simple words and short sentences.\n"
+            "- Focus on core concepts and main ideas.\n"
+            "- Use relatable examples or comparisons if needed.\n"
+            "- Aim for a length of 3-5 sentences."
+        ),
+        "max_tokens": 300
+    },
+    "intermediate": {
+        "audience": "high school students in grades 7-12",
+        "guidelines": (
+            "- Maintain key ideas and important details.\n"
+            "- Simplify technical terms, but introduce some field-specific vocabulary.\n"
+            "- Use a conversational yet informative tone.\n"
+            "- Aim for a length of 5-8 sentences."
+        ),
+        "max_tokens": 600
+    },
+    "advanced": {
+        "audience": "readers at the master's degree level",
+        "guidelines": (
+            "- Preserve complex terminology and provide precise explanations where needed.\n"
+            "- Focus on deeper insights, nuanced interpretations, and contextual significance.\n"
+            "- Use formal, structured language aligned with academic standards.\n"
+            "- Aim for a length of 8-12 sentences."
+        ),
+        "max_tokens": 1000
+    }
+}
+
+def summarize_level(text, level):
+    _wait_for_rate_limit()
+    with timed(llm_latency, "summarize_level"):
+        response = client.messages.create(**build_level_summary_request(text, level))
+    record_token_usage("summarize_level", response)
+    return parse_level_summary_response(level, response)
+
+async def summarize_level_async(text, level):
+    with timed(llm_latency, "summarize_level"):
+        response = await async_client.messages.create(**build_level_summary_request(text, level))
+    record_token_usage("summarize_level", response)
+    return parse_level_summary_response(level, response)
+
+def stream_level_summary(text, level):
+    """
+    Generator that yields the `level` summary as the model writes it and
+    returns the complete summary (or None) once the response has finished.
+    """
+    _wait_for_rate_limit()
+    with timed(llm_latency, "stream_level_summary"):
+        with client.messages.stream(**build_level_summary_request(text, level)) as stream:
+            yield from stream.text_stream
+            response = stream.get_final_message()
+    record_token_usage("stream_level_summary", response)
+    return parse_level_summary_response(level, response)
+
+def build_level_summary_request(text, level) -> dict:
+    spec = SUMMARY_LEVELS[level]
+
     system_prompt = (
-        "You are an AI assistant specialized in summarizing complex Wikipedia articles at different reading levels. "
-        "Your task is to create three summaries of varying complexity for the given article. "
-        "If the article is too short or lacks detail, enrich it using your background knowledge to provide a more informative summary. "
-        "Remember:"
-        "- Do not include markdown syntax. "
-        "- Do not wrap the entire JSON in triple backticks. "
-        "- Ensure the output can be safely parsed using json.loads()."
+        "You are an AI assistant specialized in summarizing Wikipedia articles for a specific reading level. "
+        "If the article is too short or lacks detail, enrich it using your background knowledge. "
+        "Respond with the summary text only: no title, no preamble and no markdown."
     )
 
     user_prompt = f"""
-Here is the Wikipedia article you need to summarize:
-
 <article>
 {text}
 </article>
 
-Please analyze this article and create three summaries of the topic at different levels of complexity:
-
-1. Basic (for young learners in grades 1-3)
-2. Intermediate (for high school students in grades 7-12)
-3. Advanced (for readers at the master's degree level)
-
-Break down the article, identify key concepts, and plan your approach for each summary level. Include the following:
+Summarize this article for {spec["audience"]}.
 
-1. Key Concepts: The main topics and ideas from the article.
-2. Complexity Assessment: Rate each concept as basic, intermediate, or advanced.
-3. Vocabulary: Identify key terms that may need simplification or explanation at different levels.
-4. Structure: Outline the article's structure to maintain a logical flow in summaries.
-5. Audience Considerations: Note specific ways to adapt content for each audience level.
-
-This will help ensure a thorough interpretation of the data and appropriate adaptation for each audience.
-
-Guidelines for each summary level:
-
-Basic:
-- Use simple words and short sentences.
-- Focus on core concepts and main ideas.
-- Provide clear, engaging explanations.
-- Use relatable examples or comparisons if needed.
-- Aim for a length of 3-5 sentences.
-
-Intermediate:
-- Maintain key ideas and important details.
-- Simplify technical terms, but introduce some field-specific vocabulary.
-- Use a conversational yet informative tone.
-- Assume some background knowledge, but explain advanced concepts.
-- Aim for a length of 5-8 sentences.
-
-Advanced:
-- Preserve complex terminology and provide precise explanations where needed.
-- Focus on deeper insights, nuanced interpretations, and contextual significance.
-- Use formal, structured language aligned with academic standards.
-- Assume foundational knowledge in the subject.
-- Aim for a length of 8-12 sentences.
-
-Present your summaries in a JSON object with "basic", "intermediate", and "advanced" keys.
+Guidelines:
+{spec["guidelines"]}
 """
 
-    response = client.messages.create(
+    return dict(
         model="claude-3-haiku-20240307",
-        max_tokens=4096,
+        max_tokens=spec["max_tokens"],
         temperature=0.7,
         system=system_prompt,
         messages=[{"role": "user", "content": user_prompt}]
     )
 
+def parse_level_summary_response(level, response):
     try:
-        content_text = response.content[0].text if isinstance(response.content, list) else response.content
-        json_text = extract_json_from_text(content_text)
-
-        if isinstance(json_text, dict):
-            summaries_dict = json_text
-        else:
-            summaries_dict = json.loads(json_text)
-
-        logger.info(f"Successfully parsed summaries for levels: {list(summaries_dict.keys())}")
-        return summaries_dict
+        summary = response.content[0].text.strip()
+    except (AttributeError, IndexError, TypeError) as e:
+        logger.error(f"Unexpected LLM response structure for '{level}' summary: {e}")
+        return None
 
-    except (json.JSONDecodeError, ValueError, AttributeError, TypeError) as e:
-        logger.error(f"Error parsing response JSON: {e}")
-        logger.debug(f"Unexpected LLM response structure: {response.content}")
+    if not summary:
+        logger.error(f"LLM returned an empty '{level}' summary")
         return None
+    logger.info(f"Successfully generated '{level}' summary")
+    return summary
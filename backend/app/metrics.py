@@ -0,0 +1,101 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+# Under gunicorn (see gunicorn.conf.py) PROMETHEUS_MULTIPROC_DIR is set before
+# the workers import this module, so every worker writes its samples to files
+# there and /metrics in any one worker reports the sum over all of them.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+PREFIX = "knowledge_explorer"
+# Redis, DB, parsing and sanitizing take micro- to milliseconds; Wikipedia and
+# the LLM take up to their timeouts
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+cache_lookups = Counter(
+    f"{PREFIX}_cache_lookups_total",
+    "Cache lookups by tier (l1 or redis), key type and result (hit or miss).",
+    ["tier", "key_type", "result"]
+)
+redis_latency = Histogram(
+    f"{PREFIX}_redis_command_duration_seconds",
+    "Redis round trips by command; a pipeline counts as one PIPELINE call.",
+    ["command"],
+    buckets=FAST_BUCKETS
+)
+db_latency = Histogram(
+    f"{PREFIX}_db_query_duration_seconds",
+    "SQL statement execution time by statement type.",
+    ["statement"],
+    buckets=FAST_BUCKETS
+)
+wikipedia_latency = Histogram(
+    f"{PREFIX}_wikipedia_request_duration_seconds",
+    "MediaWiki API requests by action, including retries.",
+    ["action"],
+    buckets=SLOW_BUCKETS
+)
+html_parse_latency = Histogram(
+    f"{PREFIX}_html_parse_duration_seconds",
+    "Parsing a page's HTML and walking it for intro paragraphs and links.",
+    buckets=FAST_BUCKETS
+)
+sanitize_latency = Histogram(
+    f"{PREFIX}_sanitize_duration_seconds",
+    "Turning the intro HTML into plain text and decoding the link targets.",
+    buckets=FAST_BUCKETS
+)
+llm_latency = Histogram(
+    f"{PREFIX}_llm_call_duration_seconds",
+    "Anthropic API calls by call site; streamed calls run until the last token.",
+    ["call"],
+    buckets=SLOW_BUCKETS
+)
+llm_tokens = Counter(
+    f"{PREFIX}_llm_tokens_total",
+    "Tokens reported by Anthropic responses, by call site and direction (input or output).",
+    ["call", "direction"]
+)
+
+
+@contextmanager
+def timed(histogram, *labels):
+    """Observe the wall-clock time of the `with` block, even if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histogram.labels(*labels) if labels else histogram).observe(time.perf_counter() - started)
+
+
+def record_cache_lookup(tier: str, key_type: str, hit: bool):
+    cache_lookups.labels(tier, key_type, "hit" if hit else "miss").inc()
+
+
+def record_token_usage(call: str, response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    llm_tokens.labels(call, "input").inc(usage.input_tokens or 0)
+    llm_tokens.labels(call, "output").inc(usage.output_tokens or 0)
+
+
+def render_metrics():
+    """(body, content type) of the Prometheus text exposition for this deployment."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -34,21 +34,29 @@ class Article(db.Model):
     topic = db.Column(db.String(255), unique=True, nullable=False)
     full_text = db.Column(db.Text, nullable=False)
     internal_links = db.Column(db.Text)
+    revid = db.Column(db.BigInteger)  # Wikipedia revision the stored text was parsed from
     retrieved_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self):
         return f"<Article topic='{self.topic}'>"
 
-class Links(db.Model):
-    """Stores individual internal Wikipedia links related to a topic."""
-    __tablename__ = "links"
+class LinkEdge(db.Model):
+    """One internal Wikipedia link from an article, with its order on the page."""
+    __tablename__ = "link_edges"
+    __table_args__ = (
+        db.UniqueConstraint("source", "target", name="uq_link_edges_source_target"),
+        db.Index("ix_link_edges_source_position", "source", "position"),
+        db.Index("ix_link_edges_target", "target"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    topic = db.Column(db.String(255), db.ForeignKey("articles.topic"), nullable=False)
-    linked_topic = db.Column(db.Text, nullable=False)
+    # No foreign key: links are kept for pages whose intro was not stored
+    source = db.Column(db.String(255), nullable=False)
+    target = db.Column(db.String(255), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
 
     def __repr__(self):
-        return f"<Link topic='{self.topic}' linked_to='{self.linked_topic}'>"
+        return f"<LinkEdge '{self.source}' -> '{self.target}'>"
 
 class Summary(db.Model):
     """Stores summaries of a topic at basic, intermediate, and advanced levels."""
@@ -59,7 +67,11 @@ class Summary(db.Model):
     basic_summary = db.Column(db.Text)
     intermediate_summary = db.Column(db.Text)
     advanced_summary = db.Column(db.Text)
-    generated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Levels are generated independently, so a row may hold only some of them
+    basic_generated_at = db.Column(db.DateTime)
+    intermediate_generated_at = db.Column(db.DateTime)
+    advanced_generated_at = db.Column(db.DateTime)
+    generated_at = db.Column(db.DateTime, default=datetime.utcnow)  # last write to any level
 
     def __repr__(self):
         return f"<Summary topic='{self.topic}'>"
@@ -69,7 +81,7 @@ class LearningPath(db.Model):
     __tablename__ = "learning_paths"
 
     id = db.Column(db.Integer, primary_key=True)
-    topic = db.Column(db.String(255), db.ForeignKey("articles.topic"), nullable=False)
+    topic = db.Column(db.String(255), db.ForeignKey("articles.topic"), unique=True, index=True, nullable=False)
     ranked_links = db.Column(db.Text)
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -81,7 +93,7 @@ class CanonicalTopic(db.Model):
     __tablename__ = "canonical_topics"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_input = db.Column(db.String(255), unique=True, nullable=False)
+    user_input = db.Column(db.String(255), unique=True, nullable=False)  # app.utils.normalize_topic form
     canonical_title = db.Column(db.String(255), nullable=False)
 
     def __repr__(self):
@@ -0,0 +1,216 @@
+import os
+import re
+import json
+import math
+import time
+import logging
+from collections import Counter, defaultdict
+
+from app.cache import get_canonical_topics_from_cache, get_graph_scores_from_cache, store_graph_scores_in_cache
+from app.database import get_canonical_topics_from_db, get_link_graph_from_db
+from app.freshness import schedule_graph_scores_refresh
+from app.singleflight import acquire_lease, release_lease
+
+logger = logging.getLogger(__name__)
+
+# Hub articles have hundreds of links; only the best PREFILTER_TOP_N go to the LLM
+PREFILTER_TOP_N = int(os.getenv("RANKING_PREFILTER_TOP_N", 60))
+
+OVERLAP_WEIGHT = 1.0
+POSITION_WEIGHT = 0.5
+MENTION_WEIGHT = 1.0
+
+# Local ranker: used as a provisional learning path and when the LLM fails
+LOCAL_PATH_SIZE = 20
+# Scores older than this are still used, and recomputed in the background
+GRAPH_SCORES_TTL = int(os.getenv("RANKING_GRAPH_SCORES_TTL", 3600))
+GRAPH_SCORES_LEASE_TTL = int(os.getenv("RANKING_GRAPH_SCORES_LEASE_TTL", 600))
+PAGERANK_DAMPING = 0.85
+PAGERANK_ITERATIONS = 20
+LOCAL_POSITION_WEIGHT = 1.0
+LOCAL_IN_DEGREE_WEIGHT = 1.0
+LOCAL_PAGERANK_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "with"
+])
+
+
+def tokenize(text: str) -> list:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def estimate_tokens(links: list) -> int:
+    # Roughly four characters per token for the JSON list in the prompt
+    return len(json.dumps(links)) // 4
+
+
+def score_links(links: list, context: str) -> dict:
+    """
+    Score each link title against `context` (the article intro and summary):
+
+    - overlap: TF-IDF weighted share of the title's words found in the context,
+      with IDF taken over the candidate titles so generic words count less
+    - position: earlier links in the article score higher
+    - mentions: how often the full title appears in the context
+    """
+    context_lower = context.lower()
+    context_counts = Counter(tokenize(context))
+    title_tokens = {link: set(tokenize(link.replace("_", " "))) for link in links}
+
+    document_frequency = Counter()
+    for tokens in title_tokens.values():
+        document_frequency.update(tokens)
+    total = len(links)
+
+    scores = {}
+    for index, link in enumerate(links):
+        tokens = title_tokens[link]
+        overlap = 0.0
+        if tokens:
+            weights = {t: math.log((1 + total) / (1 + document_frequency[t])) + 1 for t in tokens}
+            matched = sum(weights[t] * (1 + math.log(context_counts[t])) for t in tokens if context_counts[t])
+            overlap = matched / sum(weights.values())
+
+        position = 1 - index / total
+        mentions = context_lower.count(link.replace("_", " ").lower())
+
+        scores[link] = (
+            OVERLAP_WEIGHT * overlap
+            + POSITION_WEIGHT * position
+            + MENTION_WEIGHT * math.log1p(mentions)
+        )
+    return scores
+
+
+def prefilter_links(topic: str, links: list, intro: str, summary: str, top_n: int = PREFILTER_TOP_N) -> list:
+    """
+    Keep the `top_n` links most relevant to the article, in their original
+    order, so the ranking prompt only carries plausible candidates.
+    """
+    if not links or len(links) <= top_n:
+        return links
+
+    scores = score_links(links, " ".join(filter(None, [intro, summary])))
+    kept = set(sorted(links, key=lambda link: scores[link], reverse=True)[:top_n])
+    filtered = [link for link in links if link in kept]
+
+    before, after = estimate_tokens(links), estimate_tokens(filtered)
+    logger.info(
+        f"Prefiltered links for '{topic}': kept {len(filtered)}/{len(links)}, "
+        f"~{before} -> ~{after} prompt tokens (saved ~{before - after})"
+    )
+    return filtered
+
+
+def _node(title: str) -> str:
+    # Stored links use URL underscores; article topics use spaces
+    return title.replace("_", " ")
+
+
+def compute_graph_scores(graph: dict) -> dict:
+    """
+    In-degree and PageRank for every node of the stored link graph
+    ({topic: [linked_topic, ...]}), returned as {"in_degree": {}, "pagerank": {}}.
+    """
+    out_links = {_node(topic): {_node(link) for link in links} for topic, links in graph.items()}
+    in_links = defaultdict(list)
+    for source, targets in out_links.items():
+        for target in targets:
+            in_links[target].append(source)
+
+    nodes = set(out_links) | set(in_links)
+    if not nodes:
+        return {"in_degree": {}, "pagerank": {}}
+
+    count = len(nodes)
+    rank = dict.fromkeys(nodes, 1 / count)
+    for _ in range(PAGERANK_ITERATIONS):
+        # Rank held by nodes without outgoing links is spread evenly
+        dangling = sum(rank[node] for node in nodes if not out_links.get(node))
+        base = (1 - PAGERANK_DAMPING + PAGERANK_DAMPING * dangling) / count
+        rank = {
+            node: base + PAGERANK_DAMPING * sum(rank[source] / len(out_links[source]) for source in in_links.get(node, ()))
+            for node in nodes
+        }
+
+    return {
+        "in_degree": {node: len(sources) for node, sources in in_links.items()},
+        "pagerank": rank
+    }
+
+
+def refresh_graph_scores():
+    """
+    Recompute the scores of the whole link graph and store them. Runs from
+    `flask cache warm`, a job worker or the refresh pool, never inline in a
+    request. Returns the number of nodes scored, or None if another worker
+    is already recomputing them.
+    """
+    token = acquire_lease("graph_scores", "*", GRAPH_SCORES_LEASE_TTL)
+    if not token:
+        logger.info("Link graph scores are already being recomputed")
+        return None
+    try:
+        started = time.perf_counter()
+        scores = compute_graph_scores(get_link_graph_from_db())
+        logger.info(
+            f"Computed link graph scores for {len(scores['pagerank'])} nodes "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        store_graph_scores_in_cache(scores, GRAPH_SCORES_TTL)
+        return len(scores["pagerank"])
+    finally:
+        release_lease("graph_scores", "*", token)
+
+
+def rank_links_locally(topic: str, links: list, limit: int = LOCAL_PATH_SIZE) -> list:
+    """
+    Deterministic learning path from the stored link graph: earlier links in
+    the article, links many ingested articles point to, and links with high
+    PageRank come first. Only the candidates' precomputed scores are read;
+    until the first computation finishes the article order decides. Titles are
+    returned in canonical form, like the LLM path's.
+    """
+    candidates = [link for link in links or [] if _node(link) != topic]
+    if not candidates:
+        return []
+
+    scores, fresh = get_graph_scores_from_cache(list({_node(link) for link in candidates}))
+    if not fresh:
+        schedule_graph_scores_refresh()
+    in_degree = [scores.get(_node(link), (0, 0.0))[0] for link in candidates]
+    pagerank = [scores.get(_node(link), (0, 0.0))[1] for link in candidates]
+    max_in_degree = max(in_degree)
+    max_pagerank = max(pagerank)
+    total = len(candidates)
+
+    def score(index):
+        return (
+            LOCAL_POSITION_WEIGHT * (1 - index / total)
+            + LOCAL_IN_DEGREE_WEIGHT * (math.log1p(in_degree[index]) / math.log1p(max_in_degree) if max_in_degree else 0)
+            + LOCAL_PAGERANK_WEIGHT * (pagerank[index] / max_pagerank if max_pagerank else 0)
+        )
+
+    order = sorted(range(total), key=score, reverse=True)
+    canonical = _canonical_titles(candidates)
+    path = []
+    for index in order:
+        title = canonical[candidates[index]]
+        if title != topic and title not in path:
+            path.append(title)
+            if len(path) == limit:
+                break
+    return path
+
+
+def _canonical_titles(links: list) -> dict:
+    """
+    {link: canonical title} from the stored mappings, without asking Wikipedia;
+    links never resolved yet just get spaces for underscores.
+    """
+    found = get_canonical_topics_from_cache(links)
+    found.update(get_canonical_topics_from_db([link for link in links if link not in found]))
+    return {link: found.get(link, _node(link)) for link in links}
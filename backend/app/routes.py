@@ -2,15 +2,30 @@ import json
 import time
 
 import logging
-from flask import Blueprint, request, jsonify
+import anthropic
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from app.content_retrieval import (
     get_article_text,
     get_article_summary,
+    stream_article_summary,
     get_article_links,
     get_learning_path,
     get_canonical_topic,
-    regenerate_learning_path
+    regenerate_learning_path,
+    find_topic_for_queue,
+    find_summary,
+    find_learning_path,
+    local_learning_path,
+    is_degraded
 )
+from app.cache import get_cache_stats, get_topic_bundle_from_cache
+from app.freshness import revalidate, has_expired, age_header
+from app.graph import MAX_DEPTH, MAX_FANOUT, get_topic_graph
+from app.search import SEARCH_PAGE_SIZE, SEARCH_MAX_PAGE_SIZE, search_topics
+from app.suggest import SUGGEST_LIMIT, SUGGEST_MAX_LIMIT, suggest_titles
+from app.jobs import QUEUE_ENABLED, enqueue_job, get_job, job_accepted_payload
+from app.metrics import render_metrics
+from app.singleflight import get_single_flight_stats
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +33,27 @@ main = Blueprint("main", __name__)
 
 VALID_LEVELS = ["basic", "intermediate", "advanced"]
 
-'''
 @main.route("/search", methods=["GET"])
 def search():
-    query = request.args.get("q")
-    ...
-'''
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Missing query parameter 'q'."}), 400
+    limit = request.args.get("limit", SEARCH_PAGE_SIZE, type=int)
+    if not 1 <= limit <= SEARCH_MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {SEARCH_MAX_PAGE_SIZE}."}), 400
+
+    try:
+        return jsonify(search_topics(query, limit, request.args.get("cursor")))
+    except ValueError:
+        return jsonify({"error": "Invalid cursor."}), 400
+
+@main.route("/suggest", methods=["GET"])
+def suggest():
+    query = request.args.get("q", "")
+    limit = request.args.get("limit", SUGGEST_LIMIT, type=int)
+    if not 1 <= limit <= SUGGEST_MAX_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {SUGGEST_MAX_LIMIT}."}), 400
+    return jsonify({"query": query, "suggestions": suggest_titles(query, limit)})
 
 @main.route("/summary/<topic>", methods=["GET"])
 def get_summary_route(topic):
@@ -31,6 +61,22 @@ def get_summary_route(topic):
     if level not in VALID_LEVELS:
         return jsonify({"error": "Invalid level."}), 400
 
+    bundle = get_topic_bundle_from_cache(topic, level, with_learning_path=False)
+    if bundle and bundle["summary"]:
+        ages = revalidate(bundle["topic"], [("summary", level)])
+        if not has_expired(ages):
+            return _with_age({"topic": bundle["topic"], "level": level, "summary": bundle["summary"]}, ages)
+
+    if QUEUE_ENABLED:
+        canonical_topic = find_topic_for_queue(topic)
+        if not canonical_topic:
+            return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+        summary = find_summary(canonical_topic, level)
+        if summary:
+            ages = revalidate(canonical_topic, [("summary", level)])
+            return _with_age({"topic": canonical_topic, "level": level, "summary": summary}, ages)
+        return _accepted(enqueue_job("summary", canonical_topic, level))
+
     canonical_topic = get_canonical_topic(topic)
     if not canonical_topic:
         return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
@@ -38,16 +84,92 @@ def get_summary_route(topic):
     summary = get_article_summary(canonical_topic, level)
 
     if summary:
-        return jsonify({"topic": canonical_topic, "level": level, "summary": summary})
+        ages = revalidate(canonical_topic, [("summary", level)])
+        return _with_age({"topic": canonical_topic, "level": level, "summary": summary}, ages)
     logger.error(f"Failed to retrieve summary for '{canonical_topic}' at level '{level}'")
     return jsonify({"error": f"Failed to retrieve summary for '{canonical_topic}'"}), 500
 
+@main.route("/summary/<topic>/stream", methods=["GET"])
+def stream_summary_route(topic):
+    """
+    Server-sent events version of /summary: "delta" events carry the summary
+    text as it is generated, then a final "done" (or "error") event carries
+    the complete response.
+    """
+    level = request.args.get("level", "basic").lower()
+    if level not in VALID_LEVELS:
+        return jsonify({"error": "Invalid level."}), 400
+
+    canonical_topic = get_canonical_topic(topic)
+    if not canonical_topic:
+        return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+
+    def events():
+        try:
+            summary = yield from _sse_deltas(stream_article_summary(canonical_topic, level))
+        except anthropic.APIError as e:
+            logger.error(f"Anthropic API error streaming summary for '{canonical_topic}': {e}")
+            summary = None
+
+        if summary:
+            yield _sse_event("done", {"topic": canonical_topic, "level": level, "summary": summary})
+        else:
+            logger.error(f"Failed to stream summary for '{canonical_topic}' at level '{level}'")
+            yield _sse_event("error", {"error": f"Failed to retrieve summary for '{canonical_topic}'"})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _sse_deltas(pieces):
+    """Re-yield text pieces as SSE "delta" events, passing the return value through."""
+    while True:
+        try:
+            piece = next(pieces)
+        except StopIteration as done:
+            return done.value
+        yield _sse_event("delta", {"text": piece})
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @main.route("/learning-path/<topic>", methods=["GET"])
 def retrieve_learning_path(topic):
     level = request.args.get("level", "basic").lower()
     if level not in VALID_LEVELS:
         return jsonify({"error": "Invalid level."}), 400
 
+    bundle = get_topic_bundle_from_cache(topic, level)
+    if bundle and bundle["summary"] and bundle["learning_path"]:
+        ages = revalidate(bundle["topic"], [("summary", level), ("learning_path", None)])
+        if not has_expired(ages):
+            return _with_age({
+                "topic": bundle["topic"],
+                "level": level,
+                "summary": bundle["summary"],
+                "links": bundle["learning_path"]
+            }, ages)
+
+    if QUEUE_ENABLED:
+        canonical_topic = find_topic_for_queue(topic)
+        if not canonical_topic:
+            return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+        summary = find_summary(canonical_topic, level)
+        learning_path = find_learning_path(canonical_topic)
+        if summary and learning_path:
+            ages = revalidate(canonical_topic, [("summary", level), ("learning_path", None)])
+            return _with_age({
+                "topic": canonical_topic,
+                "level": level,
+                "summary": summary,
+                "links": learning_path
+            }, ages)
+        job = enqueue_job("learning_path", canonical_topic, level)
+        # Paint a locally ranked path right away; the job's LLM path replaces it
+        return _accepted(job, local_learning_path(canonical_topic))
+
     canonical_topic = get_canonical_topic(topic)
     if not canonical_topic:
         return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
@@ -56,18 +178,26 @@ def retrieve_learning_path(topic):
     learning_path = get_learning_path(canonical_topic, level)
 
     if learning_path:
-        return jsonify({
+        ages = revalidate(canonical_topic, [("summary", level), ("learning_path", None)])
+        return _with_age({
             "topic": canonical_topic,
             "level": level,
             "summary": summary,
-            "links": learning_path
-        })
+            "links": learning_path,
+            "degraded": is_degraded(canonical_topic, summary, learning_path)
+        }, ages)
 
     logger.error(f"Failed to retrieve learning path for '{canonical_topic}'")
     return jsonify({"error": f"Failed to retrieve learning path for '{canonical_topic}'"}), 500
 
 @main.route("/rerank-learning-path/<topic>", methods=["POST"])
 def rerank_learning_path(topic):
+    if QUEUE_ENABLED:
+        canonical_topic = find_topic_for_queue(topic)
+        if not canonical_topic:
+            return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+        return _accepted(enqueue_job("rerank", canonical_topic))
+
     canonical_topic = get_canonical_topic(topic)
     if not canonical_topic:
         return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
@@ -83,6 +213,52 @@ def rerank_learning_path(topic):
     return jsonify({
         "topic": canonical_topic,
         "summary": summary,
-        "links": ranked_links
+        "links": ranked_links,
+        "degraded": is_degraded(canonical_topic, summary, ranked_links)
     })
 
+@main.route("/graph/<topic>", methods=["GET"])
+def get_graph_route(topic):
+    depth = request.args.get("depth", 2, type=int)
+    fanout = request.args.get("fanout", 5, type=int)
+    if not 1 <= depth <= MAX_DEPTH:
+        return jsonify({"error": f"depth must be between 1 and {MAX_DEPTH}."}), 400
+    if not 1 <= fanout <= MAX_FANOUT:
+        return jsonify({"error": f"fanout must be between 1 and {MAX_FANOUT}."}), 400
+
+    canonical_topic = get_canonical_topic(topic)
+    if not canonical_topic:
+        return jsonify({"error": f"Could not resolve topic '{topic}'"}), 404
+
+    return jsonify(get_topic_graph(canonical_topic, depth, fanout))
+
+@main.route("/jobs/<job_id>", methods=["GET"])
+def get_job_route(job_id):
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"error": f"Job '{job_id}' not found"}), 404
+    job["job_id"] = job.pop("id")
+    return jsonify(job)
+
+def _with_age(payload, ages):
+    """Response carrying each artifact's age in seconds, and the oldest as the Age header."""
+    payload["age"] = ages
+    return jsonify(payload), 200, age_header(ages)
+
+def _accepted(job, provisional_links=None):
+    if not job:
+        return jsonify({"error": "Could not queue request"}), 503
+    payload = job_accepted_payload(job, provisional_links)
+    return jsonify(payload), 202, {"Location": payload["status_url"]}
+
+@main.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    stats = get_cache_stats()
+    stats["single_flight"] = get_single_flight_stats()
+    return jsonify(stats)
+
+@main.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus metrics, summed over all workers when running under gunicorn."""
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
@@ -0,0 +1,68 @@
+import os
+import re
+import json
+import base64
+import binascii
+import logging
+
+from app.database import search_articles_in_db
+from app.wikipedia import search_wikipedia
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", 20))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", 50))
+MAX_QUERY_TERMS = 10
+
+_TERM_RE = re.compile(r"\w+")
+
+
+def search_terms(query: str) -> list:
+    # Plain words only: FTS5 and tsquery operators in the input are dropped
+    return _TERM_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+
+
+def encode_cursor(score: float, topic: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, topic]).encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """(score, topic) from a cursor returned by search_topics; ValueError if malformed."""
+    try:
+        score, topic = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(score, (int, float)) or not isinstance(topic, str):
+        raise ValueError("Invalid cursor")
+    return float(score), topic
+
+
+def search_topics(query: str, limit: int = SEARCH_PAGE_SIZE, cursor: str = None) -> dict:
+    """
+    Search the stored corpus first; only a first page with no local matches
+    falls back to Wikipedia's search. Wikipedia results are not paginated.
+    Raises ValueError for a malformed cursor.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    # One extra row tells us whether there is a next page
+    rows = search_articles_in_db(search_terms(query), limit + 1, after)
+
+    if rows or after:
+        next_cursor = None
+        if len(rows) > limit:
+            last_topic, last_score = rows[limit - 1]
+            next_cursor = encode_cursor(last_score, last_topic)
+        return {
+            "query": query,
+            "source": "local",
+            "results": [{"topic": topic} for topic, _ in rows[:limit]],
+            "next_cursor": next_cursor
+        }
+
+    logger.info(f"No local matches for '{query}'; falling back to Wikipedia search")
+    return {
+        "query": query,
+        "source": "wikipedia",
+        "results": [{"topic": title} for title in search_wikipedia(query, limit)],
+        "next_cursor": None
+    }
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+import redis
+
+from app.cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+LEASE_TTL = float(os.getenv("SINGLE_FLIGHT_LEASE_TTL", 120))
+WAIT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_WAIT_TIMEOUT", 60))
+POLL_INTERVAL = float(os.getenv("SINGLE_FLIGHT_POLL_INTERVAL", 0.25))
+STATS_KEY = "singleflight:stats"
+
+# Only delete the lease if we still own it, so a leader whose lease expired
+# mid-generation cannot release a lease that another worker now holds.
+_RELEASE_SCRIPT = redis_client.register_script("""
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+""")
+
+
+def _lease_key(stage: str, topic: str) -> str:
+    return f"lease:{stage}:{topic}"
+
+
+def _record(stage: str, outcome: str):
+    try:
+        redis_client.hincrby(STATS_KEY, f"{stage}:{outcome}", 1)
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Failed to record single-flight stat '{stage}:{outcome}': {e}")
+
+
+def acquire_lease(stage: str, topic: str, ttl: float = LEASE_TTL):
+    """Try to become the generating worker for (stage, topic).
+
+    Returns the lease token on success and None if another worker holds the
+    lease. If Redis is unavailable a local token is returned so generation can
+    still proceed without coordination.
+    """
+    token = uuid.uuid4().hex
+    try:
+        if redis_client.set(_lease_key(stage, topic), token, nx=True, px=int(ttl * 1000)):
+            return token
+        return None
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis lease acquire failed for '{stage}:{topic}': {e}")
+        return token
+
+
+def release_lease(stage: str, topic: str, token: str):
+    try:
+        _RELEASE_SCRIPT(keys=[_lease_key(stage, topic)], args=[token])
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis lease release failed for '{stage}:{topic}': {e}")
+
+
+def lease_held(stage: str, topic: str) -> bool:
+    try:
+        return bool(redis_client.exists(_lease_key(stage, topic)))
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis lease check failed for '{stage}:{topic}': {e}")
+        return False
+
+
+def single_flight(stage: str, topic: str, generate, lookup, wait_timeout: float = WAIT_TIMEOUT):
+    """
+    Run `generate` in at most one worker per (stage, topic) at a time.
+
+    The worker that wins the Redis lease calls `generate()` and returns its
+    result. Every other worker polls `lookup()` (which should only read the
+    cache/DB) until the leader publishes a result, the lease disappears, or
+    `wait_timeout` seconds pass. Followers that time out return None rather
+    than starting a duplicate generation.
+    """
+    token = acquire_lease(stage, topic)
+    if token:
+        _record(stage, "leader")
+        try:
+            return generate()
+        finally:
+            release_lease(stage, topic, token)
+
+    return _wait_for_leader(stage, topic, lookup, wait_timeout)
+
+
+def single_flight_stream(stage: str, topic: str, generate, lookup, wait_timeout: float = WAIT_TIMEOUT):
+    """
+    Generator version of single_flight for streamed generation. The leader
+    re-yields everything `generate()` yields and returns its return value;
+    followers wait as in single_flight and yield the stored result once.
+    """
+    token = acquire_lease(stage, topic)
+    if token:
+        _record(stage, "leader")
+        try:
+            return (yield from generate())
+        finally:
+            release_lease(stage, topic, token)
+
+    result = _wait_for_leader(stage, topic, lookup, wait_timeout)
+    if result:
+        yield result
+    return result
+
+
+def _wait_for_leader(stage: str, topic: str, lookup, wait_timeout: float):
+    _record(stage, "coalesced")
+    logger.info(f"Waiting on in-flight '{stage}' generation for '{topic}'")
+
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        result = lookup()
+        if result:
+            return result
+        if not lease_held(stage, topic):
+            # Leader finished (or gave up); one last read covers the gap
+            # between its store and its lease release.
+            return lookup()
+        time.sleep(POLL_INTERVAL)
+
+    _record(stage, "timeout")
+    logger.warning(f"Timed out after {wait_timeout}s waiting on '{stage}' generation for '{topic}'")
+    return lookup()
+
+
+async def single_flight_async(stage: str, topic: str, generate, lookup, wait_timeout: float = WAIT_TIMEOUT):
+    """
+    asyncio version of single_flight: `generate` and `lookup` are coroutine
+    functions, waiting uses asyncio.sleep, and the Redis calls run in threads.
+    Shares leases with the sync version, so both serving modes coalesce.
+    """
+    token = await asyncio.to_thread(acquire_lease, stage, topic)
+    if token:
+        await asyncio.to_thread(_record, stage, "leader")
+        try:
+            return await generate()
+        finally:
+            await asyncio.to_thread(release_lease, stage, topic, token)
+
+    await asyncio.to_thread(_record, stage, "coalesced")
+    logger.info(f"Waiting on in-flight '{stage}' generation for '{topic}'")
+
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        result = await lookup()
+        if result:
+            return result
+        if not await asyncio.to_thread(lease_held, stage, topic):
+            return await lookup()
+        await asyncio.sleep(POLL_INTERVAL)
+
+    await asyncio.to_thread(_record, stage, "timeout")
+    logger.warning(f"Timed out after {wait_timeout}s waiting on '{stage}' generation for '{topic}'")
+    return await lookup()
+
+
+def get_single_flight_stats():
+    """Return {stage: {"leader": n, "coalesced": n, "timeout": n}} across all workers."""
+    try:
+        raw = redis_client.hgetall(STATS_KEY)
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Failed to read single-flight stats: {e}")
+        return {}
+
+    stats = {}
+    for field, count in raw.items():
+        stage, _, outcome = field.rpartition(":")
+        stats.setdefault(stage, {})[outcome] = int(count)
+    return stats
@@ -0,0 +1,215 @@
+import os
+import json
+import heapq
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+
+import redis
+
+from app.cache import redis_client
+from app.database import iter_known_titles_from_db
+from app.fuzzy import TrigramIndex
+from app.utils import normalize_topic
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_LIMIT = int(os.getenv("SUGGEST_LIMIT", 10))
+SUGGEST_MAX_LIMIT = 25
+# Upper bound on the index size per worker; titles beyond it are not indexed
+SUGGEST_INDEX_MAX_BYTES = int(os.getenv("SUGGEST_INDEX_MAX_MB", 128)) * 1024 * 1024
+SUGGEST_CHANNEL = "suggest:titles"
+# New titles collect in a small sorted buffer that is merged in at this size
+MERGE_THRESHOLD = 1024
+
+# Entries are "key\x1ftitle"; the separator sorts below every printable
+# character, so entries order by key first and a key prefix is an entry prefix.
+_SEPARATOR = "\x1f"
+_POINTER_SIZE = 8
+
+
+def _key(text: str) -> str:
+    return normalize_topic(text.replace(_SEPARATOR, " "))
+
+
+def _entry_size(entry: str) -> int:
+    return sys.getsizeof(entry) + _POINTER_SIZE
+
+
+def _take_prefix(entries, prefix, limit):
+    matches = []
+    for i in range(bisect_left(entries, prefix), len(entries)):
+        if len(matches) == limit or not entries[i].startswith(prefix):
+            break
+        matches.append(entries[i])
+    return matches
+
+
+class PrefixIndex:
+    """
+    Sorted array of titles searched with bisect. Readers never lock: writers
+    build new lists and swap them in, so a lookup always sees a consistent
+    snapshot.
+    """
+
+    def __init__(self, max_bytes: int = SUGGEST_INDEX_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = []
+        self._recent = []
+        self._bytes = 0
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def _entry(self, title: str):
+        key = _key(title)
+        return f"{key}{_SEPARATOR}{title}" if key else None
+
+    def _contains(self, entry: str) -> bool:
+        for entries in (self._entries, self._recent):
+            i = bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                return True
+        return False
+
+    def _fits(self, entry: str) -> bool:
+        size = _entry_size(entry)
+        if self._bytes + size > self.max_bytes:
+            self._dropped += 1
+            return False
+        self._bytes += size
+        return True
+
+    def load(self, titles):
+        """Replace the index with distinct `titles` (any iterable, e.g. a DB cursor)."""
+        entries, size, dropped = [], 0, 0
+        for title in titles:
+            entry = self._entry(title)
+            if not entry:
+                continue
+            if size + _entry_size(entry) > self.max_bytes:
+                dropped += 1
+                continue
+            entries.append(entry)
+            size += _entry_size(entry)
+        entries.sort()
+
+        with self._lock:
+            # Keep titles added while the load was running
+            merged = []
+            for entry in heapq.merge(entries, self._entries, self._recent):
+                if merged and merged[-1] == entry:
+                    continue
+                merged.append(entry)
+            self._entries, self._recent = merged, []
+            self._bytes = sum(map(_entry_size, merged))
+            self._dropped = dropped
+        if dropped:
+            logger.warning(f"Suggest index is at its memory budget; {dropped} title(s) not indexed")
+
+    def add(self, titles):
+        with self._lock:
+            recent = list(self._recent)
+            for title in titles:
+                entry = self._entry(title)
+                if entry and not self._contains(entry) and entry not in recent and self._fits(entry):
+                    insort(recent, entry)
+            if len(recent) >= MERGE_THRESHOLD:
+                self._entries, self._recent = list(heapq.merge(self._entries, recent)), []
+            else:
+                self._recent = recent
+
+    def search(self, prefix: str, limit: int = SUGGEST_LIMIT) -> list:
+        key = _key(prefix)
+        if not key:
+            return []
+        entries, recent = self._entries, self._recent
+        matches = heapq.merge(_take_prefix(entries, key, limit), _take_prefix(recent, key, limit))
+        return [entry.split(_SEPARATOR, 1)[1] for entry in matches][:limit]
+
+    def stats(self) -> dict:
+        return {
+            "titles": len(self._entries) + len(self._recent),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "dropped": self._dropped
+        }
+
+
+# Both indexes hold every known title: the prefix index serves /suggest and
+# the trigram index resolves near-miss spellings in get_canonical_topic.
+index = PrefixIndex()
+fuzzy_index = TrigramIndex()
+_started = False
+
+
+def suggest_titles(prefix: str, limit: int = SUGGEST_LIMIT) -> list:
+    return index.search(prefix, limit)
+
+
+def match_title(text: str):
+    """Known title close enough to `text` to use without asking Wikipedia, or None."""
+    return fuzzy_index.match(text)
+
+
+def add_suggest_titles(titles):
+    """Index newly ingested titles here and in every other worker."""
+    titles = [title for title in titles if title]
+    if not titles:
+        return
+    index.add(titles)
+    fuzzy_index.add(titles)
+    try:
+        redis_client.publish(SUGGEST_CHANNEL, json.dumps(titles))
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Failed to publish {len(titles)} new suggest title(s): {e}")
+
+
+def _handle_new_titles(message):
+    try:
+        titles = json.loads(message["data"])
+        index.add(titles)
+        fuzzy_index.add(titles)
+    except (TypeError, ValueError) as e:
+        logger.error(f"Ignoring malformed suggest update: {e}")
+
+
+def _handle_listener_error(error, pubsub, thread):
+    # Titles published while disconnected are picked up on the next load
+    logger.error(f"Suggest listener error: {error}")
+    time.sleep(1)
+
+
+def _load_index(app):
+    started = time.perf_counter()
+    with app.app_context():
+        try:
+            titles = list(iter_known_titles_from_db())
+            index.load(titles)
+            fuzzy_index.add(titles)
+        except Exception as e:
+            logger.error(f"Failed to load suggest index: {e}")
+            return
+    stats = index.stats()
+    logger.info(
+        f"Suggest index loaded {stats['titles']} titles (~{stats['bytes'] // (1024 * 1024)} MB) "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+
+def start_suggest_index(app):
+    """Load the index in the background and follow titles ingested by other workers."""
+    global _started
+    if _started:
+        return
+    _started = True
+    try:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{SUGGEST_CHANNEL: _handle_new_titles})
+        pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True, exception_handler=_handle_listener_error
+        )
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Could not start suggest listener: {e}")
+    threading.Thread(target=_load_index, args=(app,), daemon=True).start()
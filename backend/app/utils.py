@@ -1,12 +1,21 @@
 import re
 import json
 import logging
-import markdownify
+import unicodedata
 from urllib.parse import unquote
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 
 logger = logging.getLogger(__name__)
 
+def normalize_topic(text: str) -> str:
+    """
+    Lookup key for user-typed topics: NFKC-normalized, underscores as spaces,
+    whitespace collapsed and casefolded, so "Black hole", "black_hole" and
+    "Black  Hole " share one cache and DB entry.
+    """
+    text = unicodedata.normalize("NFKC", text).replace("_", " ")
+    return " ".join(text.split()).casefold()
+
 def extract_json_from_text(response_text: str):
     """Extract and sanitize JSON from raw response text (can be dict or list)."""
     json_start = response_text.find("{")
@@ -40,46 +49,70 @@ def extract_json_from_text(response_text: str):
         logger.debug(f"Processed JSON Response: {raw_json_text}")
         return None
 
+# Elements whose text never belongs in the plain-text intro
+_SKIPPED_TAGS = frozenset(["style", "script", "link", "meta"])
+_SKIPPED_CLASSES = frozenset(["reference", "mw-ref", "mwe-math-mathml-a11y", "noprint"])
+# Elements that separate runs of text, so their boundaries become spaces
+_BREAKING_TAGS = frozenset(["p", "br", "div", "li", "ul", "ol", "dl", "dd", "dt", "table", "tr", "td"])
+
+_FOOTNOTE_RE = re.compile(r"\[\d+\]")
+_REPEATED_WORD_RE = re.compile(r"\b(\w+)\s+\1\b")
+_CAMEL_BOUNDARY_RE = re.compile(r"(?<=[a-z])(?=[A-Z])")
+_WHITESPACE_RE = re.compile(r"\s+")
+_REPEATED_CLOSE_PAREN_RE = re.compile(r"\)\)+")
+_STRIP_QUOTES = str.maketrans("", "", "\"'")
+
 def sanitize_wiki_intro(html_text: str) -> str:
     """
-    Convert HTML to markdown and clean Wikipedia intro text:
-    - Converts HTML to markdown
-    - Removes markdown links, bold/italic, footnotes, and citation anchors
-    - Fixes spacing
-    - Strips quotes and makes text plain
+    Convert Wikipedia intro HTML to clean plain text:
+    - Keeps link and bold/italic text, drops citation superscripts
+    - Removes footnote markers like [1]
+    - Strips quotes and fixes spacing
     """
-    if not html_text:
+    if not html_text or not html_text.strip():
         return ""
 
-    markdown_text = markdownify.markdownify(html_text, heading_style="ATX")
-
-    # Remove footnote references like [1], [2]
-    markdown_text = re.sub(r"\[\d+\]", "", markdown_text)
+    wrapper = lxml_html.fragment_fromstring(html_text, create_parent="div")
+    return sanitize_wiki_intro_elements([wrapper])
 
-    # Remove citation anchors like [](#cite_note-1)
-    markdown_text = re.sub(r"\[\]\(#cite_note-[^\)]+\)", "", markdown_text)
+def sanitize_wiki_intro_elements(elements) -> str:
+    """Same as sanitize_wiki_intro, for already-parsed lxml elements."""
+    parts = []
+    for element in elements:
+        _collect_text(element, parts)
+        parts.append(" ")
 
-    # Remove markdown links [text](url) -> text
-    markdown_text = re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"\1", markdown_text)
+    text = _FOOTNOTE_RE.sub("", "".join(parts))
     # Deduplicate word pairs like "Title Title (Link)"
-    markdown_text = re.sub(r'\b(\w+)\s+\1\b', r'\1', markdown_text)
-
-    # Remove bold (**text**) and italic (*text*) markdown
-    markdown_text = re.sub(r"\*\*(.*?)\*\*", r"\1", markdown_text)
-    markdown_text = re.sub(r"\*(.*?)\*", r"\1", markdown_text)
-
-    # Remove all single and double quotes
-    markdown_text = markdown_text.replace("\"", "").replace("'", "")
-
-    # Fix spacing
-    markdown_text = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', markdown_text)
-    markdown_text = re.sub(r"\s+", " ", markdown_text).strip()
+    text = _REPEATED_WORD_RE.sub(r"\1", text)
+    text = text.translate(_STRIP_QUOTES)
+    text = _CAMEL_BOUNDARY_RE.sub(" ", text)
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    text = _REPEATED_CLOSE_PAREN_RE.sub(")", text)
 
     logger.info("Wikipedia intro sanitized and converted from HTML.")
-            # Remove duplicate closing parentheses like '))' -> ')'
-    markdown_text = re.sub(r'\)\)+', ')', markdown_text)
-
-    return unquote(markdown_text)
+    return unquote(text)
+
+def _collect_text(element, parts):
+    """Append the visible text of `element` (and its tail) to `parts` in one walk."""
+    tag = element.tag
+    if isinstance(tag, str) and tag not in _SKIPPED_TAGS and not _SKIPPED_CLASSES.intersection(
+        element.get("class", "").split()
+    ):
+        breaking = tag in _BREAKING_TAGS
+        if breaking:
+            parts.append(" ")
+        if tag == "img":
+            parts.append(element.get("alt", ""))
+        elif element.text:
+            parts.append(element.text)
+        for child in element:
+            _collect_text(child, parts)
+        if breaking:
+            parts.append(" ")
+
+    if element.tail:
+        parts.append(element.tail)
 
 def sanitize_wiki_links(links):
     """Decode URL-encoded internal Wikipedia links."""
@@ -103,7 +136,7 @@ def deduplicate_learning_path(ranked_links: list, main_topic: str) -> list:
     Remove duplicates from the ranked links list based on their canonical topic.
     Explicitly exclude the main topic (or its canonical form) from the final list.
     """
-    from app.content_retrieval import get_canonical_topic
+    from app.content_retrieval import get_canonical_topic, get_canonical_topics
 
     unique_links = []
     seen = set()
@@ -112,8 +145,11 @@ def deduplicate_learning_path(ranked_links: list, main_topic: str) -> list:
     if canonical_main:
         seen.add(canonical_main)
 
+    ranked_links = ranked_links or []
+    canonical_links = get_canonical_topics(ranked_links)
+
     for link in ranked_links:
-        resolved = get_canonical_topic(link)
+        resolved = canonical_links.get(link)
         if not resolved or resolved in seen:
             continue
         seen.add(resolved)
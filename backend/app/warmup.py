@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+import app.llm as llm
+import app.wiki_client as wiki_client
+from app.cache import NEGATIVE_MISSING, get_negative_topic_from_cache
+from app.content_retrieval import (
+    get_canonical_topics,
+    get_article_text,
+    get_article_summary,
+    get_learning_path,
+    find_learning_path
+)
+from app.ranking import refresh_graph_scores
+from app.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+WIKI_RATE = float(os.getenv("WARM_WIKI_RATE", 5))
+ANTHROPIC_RATE = float(os.getenv("WARM_ANTHROPIC_RATE", 1))
+REPORT_INTERVAL = 30
+RESOLVE_BATCH_SIZE = 500
+
+
+def read_topics(lines):
+    """Non-empty, non-comment lines, de-duplicated in order."""
+    topics = (line.strip() for line in lines)
+    return list(dict.fromkeys(t for t in topics if t and not t.startswith("#")))
+
+
+def load_progress(path: str) -> set:
+    """Topics already warmed according to the progress file (JSON lines)."""
+    if not path or not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as progress_file:
+        for line in progress_file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial line from an interrupted run
+            if entry.get("status") in ("done", "missing"):
+                done.add(entry["topic"])
+    return done
+
+
+def warm_topic(canonical_topic: str, levels: list) -> str:
+    """Ingest one topic and generate its summaries and learning path."""
+    if not get_article_text(canonical_topic):
+        raise RuntimeError("article could not be ingested")
+
+    for level in levels:
+        if not get_article_summary(canonical_topic, level):
+            raise RuntimeError(f"{level} summary was not generated")
+
+    get_learning_path(canonical_topic, levels[0])
+    # A locally ranked fallback path is not stored, so it does not count
+    if not find_learning_path(canonical_topic):
+        raise RuntimeError("learning path was not generated")
+    return "done"
+
+
+class _Progress:
+    """Appends results to the progress file and logs throughput."""
+
+    def __init__(self, path: str, total: int):
+        self.path = path
+        self.total = total
+        self.counts = {"done": 0, "missing": 0, "failed": 0}
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self._lock = threading.Lock()
+
+    def record(self, topic: str, status: str, **details):
+        with self._lock:
+            self.counts[status] += 1
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as progress_file:
+                    progress_file.write(json.dumps({"topic": topic, "status": status, **details}) + "\n")
+            now = time.monotonic()
+            if now - self.last_report >= REPORT_INTERVAL:
+                self.last_report = now
+                self.report()
+
+    def report(self):
+        finished = sum(self.counts.values())
+        elapsed = time.monotonic() - self.started
+        rate = finished / elapsed * 60 if elapsed else 0.0
+        eta = (self.total - finished) / rate if rate else None
+        eta_text = f", ETA {eta:.0f} min" if eta is not None else ""
+        click.echo(
+            f"{finished}/{self.total} topics ({self.counts['done']} done, {self.counts['missing']} missing, "
+            f"{self.counts['failed']} failed) at {rate:.1f} topics/min{eta_text}"
+        )
+
+
+cache_cli = AppGroup("cache", help="Cache maintenance commands.")
+
+
+@cache_cli.command("warm")
+@click.argument("topics_file", type=click.File("r", encoding="utf-8"), default="-")
+@click.option("--levels", default="basic", show_default=True,
+              help="Comma-separated summary levels to generate.")
+@click.option("--workers", "-w", default=4, show_default=True, type=click.IntRange(min=1), help="Concurrent topics.")
+@click.option("--wiki-rate", default=WIKI_RATE, show_default=True, type=click.FloatRange(min=0, min_open=True),
+              help="Wikipedia requests per second.")
+@click.option("--anthropic-rate", default=ANTHROPIC_RATE, show_default=True, type=click.FloatRange(min=0, min_open=True),
+              help="Anthropic requests per second.")
+@click.option("--progress", "progress_path", default="logs/warm_progress.jsonl", show_default=True,
+              help="Progress file; topics already recorded as done are skipped on the next run.")
+def warm_command(topics_file, levels, workers, wiki_rate, anthropic_rate, progress_path):
+    """Precompute articles, summaries and learning paths for a topic list (file or stdin)."""
+    levels = [level.strip().lower() for level in levels.split(",") if level.strip()]
+    unknown = [level for level in levels if level not in llm.SUMMARY_LEVELS]
+    if not levels or unknown:
+        raise click.BadParameter(f"levels must be drawn from {', '.join(llm.SUMMARY_LEVELS)}")
+
+    topics = read_topics(topics_file)
+    already_done = load_progress(progress_path)
+    pending = [topic for topic in topics if topic not in already_done]
+    click.echo(f"{len(topics)} topics, {len(topics) - len(pending)} already warm, {len(pending)} to go.")
+    if not pending:
+        return
+
+    wiki_client.rate_limiter = TokenBucket(wiki_rate, burst=max(1, int(wiki_rate)))
+    llm.rate_limiter = TokenBucket(anthropic_rate, burst=max(1, int(anthropic_rate)))
+    progress = _Progress(progress_path, len(pending))
+    flask_app = current_app._get_current_object()
+
+    def run(canonical_topic):
+        with flask_app.app_context():
+            return warm_topic(canonical_topic, levels)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(pending), RESOLVE_BATCH_SIZE):
+                batch = pending[start:start + RESOLVE_BATCH_SIZE]
+                # One multi-title Wikipedia query per 50 names
+                resolved = get_canonical_topics(batch)
+                for topic in batch:
+                    if topic in resolved:
+                        continue
+                    # Titles whose lookup failed are retried by the next run
+                    if get_negative_topic_from_cache(topic) == NEGATIVE_MISSING:
+                        progress.record(topic, "missing")
+                    else:
+                        progress.record(topic, "failed", error="title lookup failed")
+
+                # Inputs that resolve to the same article are warmed once
+                inputs_by_canonical = {}
+                for topic in batch:
+                    if topic in resolved:
+                        inputs_by_canonical.setdefault(resolved[topic], []).append(topic)
+
+                futures = {executor.submit(run, canonical): canonical for canonical in inputs_by_canonical}
+                for future in as_completed(futures):
+                    canonical = futures[future]
+                    try:
+                        status, details = future.result(), {}
+                    except Exception as e:
+                        logger.error(f"Warming '{canonical}' failed: {e}")
+                        status, details = "failed", {"error": str(e)}
+                    for topic in inputs_by_canonical[canonical]:
+                        progress.record(topic, status, canonical=canonical, **details)
+    finally:
+        wiki_client.rate_limiter = None
+        llm.rate_limiter = None
+        progress.report()
+
+    # The local ranker reads these; warming changed the link graph
+    nodes = refresh_graph_scores()
+    if nodes is not None:
+        click.echo(f"Scored {nodes} link graph nodes.")
@@ -0,0 +1,144 @@
+import os
+import asyncio
+import logging
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.metrics import timed, wikipedia_latency
+
+logger = logging.getLogger(__name__)
+
+# Point WIKI_API_URL at a local stub server to exercise the client offline.
+WIKI_API_URL = os.getenv("WIKI_API_URL", "https://en.wikipedia.org/w/api.php")
+HEADERS = {
+    "User-Agent": "WikiTutorBot/1.0 (andy.n.brandt@gmail.com)",
+    "Accept-Encoding": "gzip"
+}
+
+CONNECT_TIMEOUT = float(os.getenv("WIKI_CONNECT_TIMEOUT", 3.05))
+READ_TIMEOUT = float(os.getenv("WIKI_READ_TIMEOUT", 15))
+MAX_RETRIES = int(os.getenv("WIKI_MAX_RETRIES", 3))
+BACKOFF_FACTOR = float(os.getenv("WIKI_BACKOFF_FACTOR", 0.5))
+POOL_SIZE = int(os.getenv("WIKI_POOL_SIZE", 10))
+# One event loop multiplexes many requests, so the async pool is larger
+ASYNC_POOL_SIZE = int(os.getenv("WIKI_ASYNC_POOL_SIZE", 100))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _build_session():
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    new_session = requests.Session()
+    new_session.headers.update(HEADERS)
+    new_session.mount("https://", adapter)
+    new_session.mount("http://", adapter)
+    return new_session
+
+
+session = _build_session()
+# Optional app.rate_limit.TokenBucket pacing wiki_get (set by `flask cache warm`)
+rate_limiter = None
+
+
+def wiki_get(params: dict) -> dict:
+    """
+    Call the MediaWiki API over the shared keep-alive session and return the
+    decoded JSON body. 429/5xx responses are retried with exponential backoff
+    (honouring Retry-After); the final failure raises requests.RequestException.
+    """
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    with timed(wikipedia_latency, params.get("action", "")):
+        response = session.get(
+            WIKI_API_URL,
+            params={"format": "json", **params},
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+        )
+    response.raise_for_status()
+    return response.json()
+
+
+_async_client = None
+
+
+def _get_async_client():
+    # Created lazily so it binds to the serving event loop, not the importer's
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=ASYNC_POOL_SIZE,
+                max_keepalive_connections=ASYNC_POOL_SIZE
+            )
+        )
+    return _async_client
+
+
+async def async_wiki_get(params: dict) -> dict:
+    """
+    Non-blocking counterpart of wiki_get for the asyncio serving mode, with the
+    same timeouts and 429/5xx retry policy. Raises httpx.HTTPError on failure.
+    """
+    client = _get_async_client()
+    with timed(wikipedia_latency, params.get("action", "")):
+        for attempt in range(MAX_RETRIES + 1):
+            delay = BACKOFF_FACTOR * (2 ** attempt)
+            try:
+                response = await client.get(WIKI_API_URL, params={"format": "json", **params})
+            except httpx.TransportError as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                logger.warning(f"Wikipedia request failed ({e}); retrying in {delay}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    response.raise_for_status()
+                    return response.json()
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = int(retry_after)
+                logger.warning(f"Wikipedia returned {response.status_code}; retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+
+def latest_revision_params(topic: str) -> dict:
+    return {
+        "action": "query",
+        "titles": topic,
+        "redirects": 1,
+        "prop": "revisions",
+        "rvprop": "ids"
+    }
+
+
+def get_latest_revision(topic: str):
+    """
+    Return (canonical_title, revid) for the current revision of `topic`, following
+    redirects, or (None, None) if the page does not exist.
+    """
+    return parse_latest_revision(wiki_get(latest_revision_params(topic)))
+
+
+async def get_latest_revision_async(topic: str):
+    return parse_latest_revision(await async_wiki_get(latest_revision_params(topic)))
+
+
+def parse_latest_revision(data: dict):
+    for page in data.get("query", {}).get("pages", {}).values():
+        if "missing" in page or "invalid" in page:
+            continue
+        revisions = page.get("revisions") or [{}]
+        return page.get("title"), revisions[0].get("revid")
+    return None, None
@@ -1,110 +1,319 @@
+import os
 import requests
 import logging
-from bs4 import BeautifulSoup
-from app.utils import sanitize_wiki_intro, sanitize_wiki_links
+from lxml import html as lxml_html
+from app.utils import sanitize_wiki_intro_elements, sanitize_wiki_links
+from app.wiki_client import wiki_get, get_latest_revision
+from app.metrics import timed, html_parse_latency, sanitize_latency
 from app.cache import (
     store_article_in_cache,
     store_links_in_cache,
-    store_canonical_topic_in_cache
+    store_canonical_topic_in_cache,
+    store_canonical_topics_in_cache,
+    store_negative_topic_in_cache,
+    store_negative_topics_in_cache,
+    NEGATIVE_MISSING,
+    NEGATIVE_ERROR
 )
 from app.database import (
-    store_article_in_db,
-    store_links_in_db,
-    store_canonical_topic_in_db
+    get_article_from_db,
+    get_article_revision_from_db,
+    get_canonical_topic_from_db,
+    get_links_from_db,
+    touch_article_in_db,
+    store_ingested_page_in_db,
+    store_canonical_topic_in_db,
+    store_canonical_topics_in_db
 )
+from app.freshness import mark_fresh
+from app.suggest import add_suggest_titles
 
 logger = logging.getLogger(__name__)
 
-WIKI_API_URL = "https://en.wikipedia.org/w/api.php"
-HEADERS = {
-    "User-Agent": "WikiTutorBot/1.0 (andy.n.brandt@gmail.com)",
-    "Accept-Encoding": "gzip"
-}
+# MediaWiki caps multi-title queries at 50 titles for regular clients
+TITLES_PER_QUERY = 50
+
+# "full" parses the whole page; "lead" asks the parse API for section 0 only,
+# which is all extract_intro_and_links keeps, and tops up the links from a
+# prop=links query when the lead alone yields fewer than WIKI_LEAD_MIN_LINKS.
+INGEST_MODE = os.getenv("WIKI_INGEST_MODE", "full").lower()
+LEAD_MIN_LINKS = int(os.getenv("WIKI_LEAD_MIN_LINKS", 25))
 
 def get_wiki_html(topic):
+    try:
+        # Only a stored article can be revalidated; without one, go straight to
+        # the parse request, which reports the revision itself
+        if stored_revision(topic):
+            canonical_title, revid = get_latest_revision(topic)
+            if not canonical_title:
+                logger.warning(f"Wikipedia page not found for '{topic}'")
+                store_negative_topic_in_cache(topic, NEGATIVE_MISSING)
+                return None
+
+            if reuse_stored_article(topic, canonical_title, revid):
+                return canonical_title
+
+        data = fetch_parsed_page(topic)
+        page = extract_parsed_page(topic, data)
+        if not page:
+            store_negative_topic_in_cache(topic, parse_failure_reason(data))
+            return None
+
+        if needs_link_top_up(page["links"]):
+            page["links"] = merge_links(page["links"], get_page_links(page["title"]))
+
+        return store_parsed_page(topic, page)
+
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"Wikipedia API error for '{topic}': {e}")
+        store_negative_topic_in_cache(topic, NEGATIVE_ERROR)
+        return None
+
+# The steps below are shared with the asyncio serving mode, which performs the
+# network calls with async_wiki_get and runs the rest in worker threads.
+
+def stored_revision(topic):
+    """Revision of the article stored for `topic` (a user input or canonical title), or None."""
+    return get_article_revision_from_db(get_canonical_topic_from_db(topic) or topic)
+
+def reuse_stored_article(topic, canonical_title, revid):
+    """
+    If the stored article is at `revid`, re-map `topic` and re-warm the cache from
+    the DB instead of downloading and re-parsing the page. Returns True if reused.
+    """
+    if not revid or revid != get_article_revision_from_db(canonical_title):
+        return False
 
+    logger.info(f"Article '{canonical_title}' unchanged at revision {revid}; skipping parse")
+    store_canonical_topic_in_cache(topic, canonical_title)
+    store_canonical_topic_in_db(topic, canonical_title)
+    store_article_in_cache(canonical_title, get_article_from_db(canonical_title))
+    links = get_links_from_db(canonical_title)
+    if links:
+        store_links_in_cache(canonical_title, links)
+    # Confirmed current, so its age restarts
+    touch_article_in_db(canonical_title)
+    mark_fresh(canonical_title, "article")
+    return True
+
+def parse_page_params(topic):
     params = {
         "action": "parse",
-        "format": "json",
         "page": topic,
-        "prop": "text",
+        "prop": "text|revid|properties",
         "redirects": 1
     }
-    try:
-        response = requests.get(WIKI_API_URL, params=params, headers=HEADERS)
-        response.raise_for_status()
-        data = response.json()
-        if "parse" not in data:
-            logger.warning(f"Wikipedia parse block missing for '{topic}'")
-            return None, None
-
-        html = BeautifulSoup(data["parse"]["text"]["*"], "lxml")
-        canonical_title = data["parse"].get("title", topic)
-
-        # Cache + DB store: canonical title
-        store_canonical_topic_in_cache(topic, canonical_title)
-        store_canonical_topic_in_db(topic, canonical_title)
-
-        # Extract and store intro
-        intro_text = extract_intro_from_soup(html)
-        if intro_text:
-            store_article_in_cache(canonical_title, intro_text)
-            store_article_in_db(canonical_title, intro_text)
-
-        # Extract and store links
-        links = extract_links_from_soup(html)
-        if links:
-            store_links_in_cache(canonical_title, links)
-            store_links_in_db(canonical_title, links)
-
-        return canonical_title
-
-    except requests.RequestException as e:
-        logger.error(f"Wikipedia API error for '{topic}': {e}")
+    if INGEST_MODE == "lead":
+        params["section"] = 0
+    return params
+
+def fetch_parsed_page(topic):
+    return wiki_get(parse_page_params(topic))
+
+def extract_parsed_page(topic, data):
+    """Turn a parse API response into {"title", "revid", "intro", "links"}, or None."""
+    if "parse" not in data:
+        logger.warning(f"Wikipedia parse block missing for '{topic}'")
         return None
 
-def extract_links_from_soup(soup):
-    content_div = soup.select_one("div.mw-parser-output")
-    if not content_div:
+    # Extract intro and links in one pass over the page
+    properties = {prop.get("name") for prop in data["parse"].get("properties", [])}
+    intro_text, links = extract_intro_and_links(
+        data["parse"]["text"]["*"],
+        lead_only=INGEST_MODE == "lead",
+        disambiguation="disambiguation" in properties
+    )
+    return {
+        "title": data["parse"].get("title", topic),
+        "revid": data["parse"].get("revid"),
+        "intro": intro_text,
+        "links": links
+    }
+
+def parse_failure_reason(data):
+    """Negative-cache reason for a parse response without a parse block."""
+    if data.get("error", {}).get("code") in ("missingtitle", "invalidtitle"):
+        return NEGATIVE_MISSING
+    return NEGATIVE_ERROR
+
+def store_parsed_page(topic, page):
+    canonical_title = page["title"]
+
+    # DB store: canonical title, intro and links in one transaction
+    store_ingested_page_in_db(topic, page)
+
+    # Cache store
+    store_canonical_topic_in_cache(topic, canonical_title)
+    if page["intro"]:
+        store_article_in_cache(canonical_title, page["intro"])
+    if page["links"]:
+        store_links_in_cache(canonical_title, page["links"])
+    mark_fresh(canonical_title, "article")
+
+    add_suggest_titles([canonical_title])
+    return canonical_title
+
+def needs_link_top_up(links):
+    return INGEST_MODE == "lead" and len(links) < LEAD_MIN_LINKS
+
+def page_links_params(topic):
+    return {
+        "action": "parse",
+        "page": topic,
+        "prop": "links",
+        "redirects": 1
+    }
+
+def get_page_links(topic):
+    """
+    Return the page's existing article-namespace links from `prop=links`, which
+    lists link targets without transferring any page HTML. Titles are returned
+    in the same underscore form as links extracted from hrefs.
+    """
+    try:
+        data = wiki_get(page_links_params(topic))
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"Wikipedia links query failed for '{topic}': {e}")
         return []
+    return parse_page_links(data)
+
+def parse_page_links(data):
+    return [
+        link["*"].replace(" ", "_")
+        for link in data.get("parse", {}).get("links", [])
+        if link.get("ns") == 0 and "exists" in link
+    ]
+
+def merge_links(primary, extra):
+    """Append links from `extra` not already in `primary`, keeping order."""
+    seen = set(primary)
+    merged = list(primary)
+    for link in extra:
+        if link not in seen:
+            seen.add(link)
+            merged.append(link)
+    return merged
+
+def resolve_canonical_titles(titles):
+    """
+    Resolve many titles to their canonical Wikipedia titles with one
+    `action=query&titles=A|B|...&redirects` request per 50 titles.
+    Returns {input_title: canonical_title}; titles that don't resolve are
+    omitted and negative-cached, as missing only when Wikipedia said so.
+    Resolved mappings are written to the cache and DB in one batch each.
+    """
+    pending = list(dict.fromkeys(t for t in titles if t and "|" not in t))
+    resolved = {}
+    # "|" separates titles in the query, and is not allowed in one
+    unresolved = dict.fromkeys((t for t in titles if t and "|" in t), NEGATIVE_MISSING)
 
-    # If the page has only one paragraph and several <ul> lists, likely a disambiguation-style page
-    if len(content_div.find_all("p", recursive=False)) <= 2:
-        link_set = {
-            a["href"].split("/wiki/")[-1].split("#")[0]
-            for ul in content_div.find_all("ul", recursive=False)
-            for li in ul.find_all("li")
-            for a in li.find_all("a", href=True)
-            if a["href"].startswith("/wiki/") and ":" not in a["href"]
+    for start in range(0, len(pending), TITLES_PER_QUERY):
+        chunk = pending[start:start + TITLES_PER_QUERY]
+        params = {
+            "action": "query",
+            "titles": "|".join(chunk),
+            "redirects": 1
         }
-        return sanitize_wiki_links(list(link_set))
-
-    # Normal page: extract links from paragraphs
-    seen_links = {
-        a["href"].split("/wiki/")[-1].split("#")[0]
-        for p in content_div.find_all("p", recursive=False)
-        for a in p.find_all("a", href=True)
-        if a["href"].startswith("/wiki/") and ":" not in a["href"]
+        try:
+            query = wiki_get(params).get("query", {})
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Wikipedia bulk title query failed for {len(chunk)} titles: {e}")
+            unresolved.update(dict.fromkeys(chunk, NEGATIVE_ERROR))
+            continue
+
+        normalized = {n["from"]: n["to"] for n in query.get("normalized", [])}
+        redirects = {r["from"]: r["to"] for r in query.get("redirects", [])}
+        existing = {
+            page["title"]
+            for page in query.get("pages", {}).values()
+            if "title" in page and "missing" not in page and "invalid" not in page
+        }
+
+        for title in chunk:
+            target = normalized.get(title, title)
+            target = redirects.get(target, target)
+            if target in existing:
+                resolved[title] = target
+            else:
+                unresolved[title] = NEGATIVE_MISSING
+
+    if unresolved:
+        store_negative_topics_in_cache(unresolved)
+    if resolved:
+        store_canonical_topics_in_cache(resolved)
+        store_canonical_topics_in_db(resolved)
+        add_suggest_titles(list(dict.fromkeys(resolved.values())))
+    logger.info(f"Resolved {len(resolved)}/{len(pending)} titles via bulk Wikipedia query")
+
+    return resolved
+
+def search_wikipedia(query, limit=10):
+    """Article titles matching `query` from Wikipedia's own search, best first."""
+    params = {
+        "action": "query",
+        "list": "search",
+        "srsearch": query,
+        "srlimit": limit,
+        "srnamespace": 0,
+        "srprop": ""
     }
+    try:
+        results = wiki_get(params).get("query", {}).get("search", [])
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"Wikipedia search failed for '{query}': {e}")
+        return []
+    return [result["title"] for result in results]
 
-    return sanitize_wiki_links(list(seen_links))
+def extract_intro_and_links(page_html, lead_only=False, disambiguation=False):
+    """
+    Extract the sanitized intro and the internal links from parsed page HTML in
+    a single walk over the top-level children of div.mw-parser-output.
 
-def extract_intro_from_soup(soup):
-    content_div = soup.select_one("div.mw-parser-output")
-    if not content_div:
-        return None
+    The intro is every non-empty top-level <p> before the first mw-heading2.
+    Links come from top-level <p> elements, or from top-level <ul> lists on
+    disambiguation pages. Without the page's disambiguation flag, a full page
+    with two or fewer paragraphs is taken to be one; a lead section (`lead_only`)
+    often is that short, so the paragraph count is not used there.
+    Returns (intro_text_or_None, links).
+    """
+    if not page_html or not page_html.strip():
+        return None, []
 
-    intro_text = []
-    for element in content_div.children:
-        if element.name == "div" and "mw-heading2" in element.get("class", []):
-            break
-        if element.name == "p" and element.text.strip():
-            intro_text.append(str(element))
+    with timed(html_parse_latency):
+        root = lxml_html.document_fromstring(page_html)
+        content_divs = root.xpath(
+            '(//div[contains(concat(" ", normalize-space(@class), " "), " mw-parser-output ")])[1]'
+        )
+        if not content_divs:
+            return None, []
 
-    if not intro_text:
-        return None
+        intro_parts = []
+        in_intro = True
+        paragraph_count = 0
+        # dicts rather than sets keep links in first-mention order for ranking
+        paragraph_links = {}
+        list_links = {}
 
-    raw_html = "\n".join(intro_text)
-    return sanitize_wiki_intro(raw_html)
+        for element in content_divs[0]:
+            tag = element.tag
+            if tag == "p":
+                paragraph_count += 1
+                paragraph_links.update(dict.fromkeys(_wiki_link_targets(element)))
+                if in_intro and element.text_content().strip():
+                    intro_parts.append(element)
+            elif tag == "ul":
+                list_links.update(dict.fromkeys(_wiki_link_targets(element)))
+            elif tag == "div" and in_intro and "mw-heading2" in element.get("class", "").split():
+                in_intro = False
 
+    with timed(sanitize_latency):
+        intro_text = sanitize_wiki_intro_elements(intro_parts) if intro_parts else None
+        list_page = disambiguation or (not lead_only and paragraph_count <= 2)
+        links = list_links if list_page else paragraph_links
+        return intro_text, sanitize_wiki_links(list(links))
 
+def _wiki_link_targets(element):
+    for anchor in element.iter("a"):
+        href = anchor.get("href")
+        if href is not None and href.startswith("/wiki/") and ":" not in href:
+            yield href.split("/wiki/")[-1].split("#")[0]
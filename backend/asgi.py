@@ -0,0 +1,4 @@
+from app import create_async_app
+
+# Serve with: hypercorn --bind 0.0.0.0:5000 asgi:app
+app = create_async_app()
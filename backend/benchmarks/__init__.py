@@ -0,0 +1,32 @@
+"""
+Benchmarks and reports over saved Wikipedia pages. Run them from backend/ as
+`python -m benchmarks.<name>`; each takes `--pages DIR` to use a directory of
+saved parse-API HTML instead of the extractor test corpus. They are not part
+of the test suite and print plain-text tables.
+"""
+import time
+from pathlib import Path
+
+CORPUS = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "extractor"
+
+
+def load_pages(directory=CORPUS):
+    """{page name: html} for every *.html file in `directory`."""
+    return {path.stem: path.read_text(encoding="utf-8") for path in sorted(Path(directory).glob("*.html"))}
+
+
+def best_time(fn, repeat=5, number=200):
+    """Best mean seconds per call of `fn()` over `repeat` runs of `number` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def print_table(header, rows):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header, *rows]:
+        print("  ".join(str(cell).rjust(width) if i else str(cell).ljust(width) for i, (cell, width) in enumerate(zip(row, widths))))
@@ -0,0 +1,99 @@
+"""
+Single-pass lxml extractor against the BeautifulSoup one it replaced.
+
+Times three pipelines per page:
+- "old": BeautifulSoup with the markdownify sanitizer, as ingestion used to run;
+- "old tree": BeautifulSoup with the current sanitizer, isolating the tree walk;
+- "new": extract_intro_and_links.
+Peak memory is reported two ways: the largest Python heap peak for one page
+(tracemalloc, which does not see libxml2's own allocations), and the growth in
+max RSS of a fresh interpreter that extracts every page, which does. RSS moves
+in pages, so it only shows a difference on full-size saved pages.
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.extractor
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+from app.utils import sanitize_wiki_intro
+from app.wikipedia import extract_intro_and_links
+from benchmarks import CORPUS, best_time, load_pages, print_table
+from benchmarks import reference
+
+PIPELINES = {
+    "old": reference.extract_intro_and_links,
+    "old tree": lambda page_html: reference.extract_intro_and_links(page_html, sanitize_wiki_intro),
+    "new": extract_intro_and_links
+}
+
+
+def python_peak_kb(extract, page_html):
+    tracemalloc.start()
+    extract(page_html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak // 1024
+
+
+def peak_rss_growth_kb(pipeline, pages_dir, rounds=20):
+    """Run `pipeline` over every page in a child interpreter and return its max RSS growth."""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.extractor", "--pages", str(pages_dir),
+         "--child", pipeline, "--rounds", str(rounds)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return int(output.split()[-1])
+
+
+def child(pipeline, pages, rounds):
+    extract = PIPELINES[pipeline]
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for _ in range(rounds):
+        for page_html in pages.values():
+            extract(page_html)
+    # ru_maxrss is in kilobytes on Linux
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", default=CORPUS, help="directory of saved parse-API HTML pages")
+    parser.add_argument("--child", choices=PIPELINES, help=argparse.SUPPRESS)
+    parser.add_argument("--rounds", type=int, default=20, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    pages = load_pages(args.pages)
+    if not pages:
+        parser.error(f"no .html pages in {args.pages}")
+
+    if args.child:
+        child(args.child, pages, args.rounds)
+        return
+
+    rows = []
+    totals = dict.fromkeys(PIPELINES, 0.0)
+    for name, page_html in pages.items():
+        times = {pipeline: best_time(lambda: extract(page_html), number=50) for pipeline, extract in PIPELINES.items()}
+        for pipeline, seconds in times.items():
+            totals[pipeline] += seconds
+        rows.append([name, *(f"{seconds * 1e6:.0f}" for seconds in times.values()),
+                     f"{times['old'] / times['new']:.1f}x"])
+    print_table(["page", *(f"{pipeline} us" for pipeline in PIPELINES), "speedup"], rows)
+
+    if totals["new"]:
+        print(f"\nspeedup over {len(rows)} pages: {totals['old'] / totals['new']:.1f}x end to end, "
+              f"{totals['old tree'] / totals['new']:.1f}x with the same sanitizer")
+    print("peak Python heap per page: " + ", ".join(
+        f"{pipeline} {max(python_peak_kb(extract, page_html) for page_html in pages.values())} KB"
+        for pipeline, extract in PIPELINES.items()
+    ))
+    print("peak RSS growth: " + ", ".join(
+        f"{pipeline} {peak_rss_growth_kb(pipeline, args.pages)} KB" for pipeline in PIPELINES
+    ))
+
+
+if __name__ == "__main__":
+    main()
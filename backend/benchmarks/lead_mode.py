@@ -0,0 +1,112 @@
+"""
+Lead-section ingestion (WIKI_INGEST_MODE=lead) against the full-page path.
+
+Offline, each saved page is cut down to the section 0 HTML the parse API
+returns with `section=0`, and the two are compared on bytes and extraction
+time. With `--live TITLE ...` the same comparison is made against the real
+API: bytes of the decoded responses and wall-clock latency per mode, counting
+the prop=links top-up request when lead mode needs one.
+
+    python -m benchmarks.lead_mode
+    python -m benchmarks.lead_mode --live "Black hole" "Photosynthesis"
+"""
+import argparse
+import time
+
+from lxml import html as lxml_html
+
+import app.wikipedia as wikipedia
+from app.wiki_client import session, WIKI_API_URL, CONNECT_TIMEOUT, READ_TIMEOUT
+from app.wikipedia import extract_intro_and_links
+from benchmarks import CORPUS, best_time, load_pages, print_table
+
+CONTENT_DIV = '(//div[contains(concat(" ", normalize-space(@class), " "), " mw-parser-output ")])[1]'
+
+
+def lead_section(page_html):
+    """The page cut at its first mw-heading2, as the parse API returns section 0."""
+    content_divs = lxml_html.document_fromstring(page_html).xpath(CONTENT_DIV)
+    if not content_divs:
+        return page_html
+    content_div = content_divs[0]
+    cut = False
+    for element in list(content_div):
+        cut = cut or (element.tag == "div" and "mw-heading2" in element.get("class", "").split())
+        if cut:
+            content_div.remove(element)
+    return lxml_html.tostring(content_div, encoding="unicode")
+
+
+def offline(pages):
+    rows = []
+    totals = [0, 0, 0.0, 0.0]
+    for name, full in pages.items():
+        lead = lead_section(full)
+        full_bytes, lead_bytes = len(full.encode()), len(lead.encode())
+        full_time = best_time(lambda: extract_intro_and_links(full))
+        lead_time = best_time(lambda: extract_intro_and_links(lead, lead_only=True))
+        _, full_links = extract_intro_and_links(full)
+        _, lead_links = extract_intro_and_links(lead, lead_only=True)
+        rows.append([
+            name, full_bytes, lead_bytes, f"{full_time * 1e6:.0f}", f"{lead_time * 1e6:.0f}",
+            len(full_links), len(lead_links), "yes" if len(lead_links) < wikipedia.LEAD_MIN_LINKS else "no"
+        ])
+        for i, value in enumerate((full_bytes, lead_bytes, full_time, lead_time)):
+            totals[i] += value
+
+    print_table(
+        ["page", "full B", "lead B", "full us", "lead us", "full links", "lead links", "top-up"],
+        rows
+    )
+    if totals[0]:
+        print(f"\nlead mode: {1 - totals[1] / totals[0]:.1%} fewer bytes, "
+              f"{1 - totals[3] / totals[2]:.1%} less extraction time over {len(rows)} pages")
+
+
+def _timed_get(params):
+    start = time.perf_counter()
+    response = session.get(
+        WIKI_API_URL,
+        params={"format": "json", **params},
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+    )
+    response.raise_for_status()
+    return response, time.perf_counter() - start
+
+
+def live(titles):
+    rows = []
+    for title in titles:
+        row = [title]
+        for mode in ("full", "lead"):
+            wikipedia.INGEST_MODE = mode
+            response, elapsed = _timed_get(wikipedia.parse_page_params(title))
+            size = len(response.content)
+            parse = response.json().get("parse", {})
+            _, links = extract_intro_and_links(
+                parse.get("text", {}).get("*", ""),
+                lead_only=mode == "lead",
+                disambiguation="disambiguation" in {prop.get("name") for prop in parse.get("properties", [])}
+            )
+            if wikipedia.needs_link_top_up(links):
+                top_up, top_up_elapsed = _timed_get(wikipedia.page_links_params(parse.get("title", title)))
+                size += len(top_up.content)
+                elapsed += top_up_elapsed
+            row += [size, f"{elapsed * 1000:.0f}"]
+        rows.append(row)
+    print_table(["title", "full B", "full ms", "lead B", "lead ms"], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", default=CORPUS, help="directory of saved parse-API HTML pages")
+    parser.add_argument("--live", nargs="+", metavar="TITLE", help="compare against the live API instead")
+    args = parser.parse_args()
+    if args.live:
+        live(args.live)
+    else:
+        offline(load_pages(args.pages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Token savings and result overlap of the ranking prefilter (prefilter_links).
+
+For each saved page the links and intro are extracted as at ingestion, and the
+rank_learning_path request is built with every link and with the prefiltered
+candidates; the intro stands in for the summary. Offline, prompt tokens are
+estimated at four characters per token, as prefilter_links logs them. With
+`--llm` both requests are sent (this needs ANTHROPIC_API_KEY): the report then
+uses the input tokens the API billed, the overlap of the filtered ranking with
+the unfiltered one, and how many returned titles were not in the list the
+model was given.
+
+The extractor corpus pages have fewer links than RANKING_PREFILTER_TOP_N, so
+pass a smaller `--top-n` there, or `--pages` with saved hub articles.
+
+    python -m benchmarks.prefilter --top-n 8
+    python -m benchmarks.prefilter --pages saved_pages/ --llm
+"""
+import argparse
+
+from app import llm
+from app.llm import build_ranking_request, parse_ranking_response
+from app.ranking import PREFILTER_TOP_N, prefilter_links
+from app.wikipedia import extract_intro_and_links
+from benchmarks import CORPUS, load_pages, print_table
+
+
+def estimated_tokens(request):
+    return len(request["system"] + request["messages"][0]["content"]) // 4
+
+
+def rank(request):
+    response = llm.client.messages.create(**request)
+    return parse_ranking_response("benchmark", response) or [], response.usage.input_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", default=CORPUS, help="directory of saved parse-API HTML pages")
+    parser.add_argument("--top-n", type=int, default=PREFILTER_TOP_N, help="candidates kept by the prefilter")
+    parser.add_argument("--llm", action="store_true", help="send both requests and compare the rankings")
+    args = parser.parse_args()
+
+    rows = []
+    before_total = after_total = 0
+    overlaps = []
+    for name, page_html in load_pages(args.pages).items():
+        intro, links = extract_intro_and_links(page_html)
+        if not links:
+            continue
+        topic = name.replace("_", " ")
+        candidates = prefilter_links(topic, links, intro, None, top_n=args.top_n)
+        full_request = build_ranking_request(topic, links, intro)
+        filtered_request = build_ranking_request(topic, candidates, intro)
+
+        row = [name, len(links), len(candidates)]
+        if args.llm:
+            full_ranked, before = rank(full_request)
+            filtered_ranked, after = rank(filtered_request)
+            overlap = len(set(full_ranked) & set(filtered_ranked)) / len(full_ranked) if full_ranked else 1.0
+            overlaps.append(overlap)
+            row += [before, after, f"{overlap:.0%}",
+                    sum(link not in links for link in full_ranked),
+                    sum(link not in candidates for link in filtered_ranked)]
+        else:
+            before, after = estimated_tokens(full_request), estimated_tokens(filtered_request)
+            row += [before, after]
+        before_total += before
+        after_total += after
+        rows.append(row)
+
+    header = ["page", "links", "kept", "tokens", "filtered tokens"]
+    if args.llm:
+        header += ["overlap", "unlisted", "filtered unlisted"]
+    print_table(header, rows)
+
+    if before_total:
+        kind = "billed" if args.llm else "estimated"
+        print(f"\n{kind} input tokens: {before_total} -> {after_total} "
+              f"({1 - after_total / before_total:.1%} saved, ~{(before_total - after_total) // len(rows)} per request)")
+    if overlaps:
+        print(f"mean overlap with the unfiltered ranking: {sum(overlaps) / len(overlaps):.0%}")
+
+
+if __name__ == "__main__":
+    main()
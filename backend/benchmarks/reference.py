@@ -0,0 +1,79 @@
+"""
+The extractor and intro sanitizer as they were before the single-pass lxml
+rewrite, kept as the baseline the benchmarks compare against. They need
+beautifulsoup4 and markdownify (benchmarks/requirements.txt), which the app
+itself no longer depends on.
+"""
+import re
+from urllib.parse import unquote
+
+import markdownify
+from bs4 import BeautifulSoup
+
+from app.utils import sanitize_wiki_links
+
+
+def sanitize_wiki_intro(html_text):
+    """HTML -> markdown with markdownify, then markdown stripped back out with regexes."""
+    if not html_text:
+        return ""
+
+    markdown_text = markdownify.markdownify(html_text, heading_style="ATX")
+    markdown_text = re.sub(r"\[\d+\]", "", markdown_text)
+    markdown_text = re.sub(r"\[\]\(#cite_note-[^\)]+\)", "", markdown_text)
+    markdown_text = re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"\1", markdown_text)
+    markdown_text = re.sub(r'\b(\w+)\s+\1\b', r'\1', markdown_text)
+    markdown_text = re.sub(r"\*\*(.*?)\*\*", r"\1", markdown_text)
+    markdown_text = re.sub(r"\*(.*?)\*", r"\1", markdown_text)
+    markdown_text = markdown_text.replace("\"", "").replace("'", "")
+    markdown_text = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', markdown_text)
+    markdown_text = re.sub(r"\s+", " ", markdown_text).strip()
+    markdown_text = re.sub(r'\)\)+', ')', markdown_text)
+    return unquote(markdown_text)
+
+
+def extract_links_from_soup(soup):
+    content_div = soup.select_one("div.mw-parser-output")
+    if not content_div:
+        return []
+
+    if len(content_div.find_all("p", recursive=False)) <= 2:
+        link_set = {
+            a["href"].split("/wiki/")[-1].split("#")[0]
+            for ul in content_div.find_all("ul", recursive=False)
+            for li in ul.find_all("li")
+            for a in li.find_all("a", href=True)
+            if a["href"].startswith("/wiki/") and ":" not in a["href"]
+        }
+        return sanitize_wiki_links(list(link_set))
+
+    seen_links = {
+        a["href"].split("/wiki/")[-1].split("#")[0]
+        for p in content_div.find_all("p", recursive=False)
+        for a in p.find_all("a", href=True)
+        if a["href"].startswith("/wiki/") and ":" not in a["href"]
+    }
+    return sanitize_wiki_links(list(seen_links))
+
+
+def extract_intro_from_soup(soup, sanitize=sanitize_wiki_intro):
+    content_div = soup.select_one("div.mw-parser-output")
+    if not content_div:
+        return None
+
+    intro_text = []
+    for element in content_div.children:
+        if element.name == "div" and "mw-heading2" in element.get("class", []):
+            break
+        if element.name == "p" and element.text.strip():
+            intro_text.append(str(element))
+
+    if not intro_text:
+        return None
+    return sanitize("\n".join(intro_text))
+
+
+def extract_intro_and_links(page_html, sanitize=sanitize_wiki_intro):
+    """The old ingestion path: one BeautifulSoup tree, walked once for the intro and once for links."""
+    soup = BeautifulSoup(page_html, "lxml")
+    return extract_intro_from_soup(soup, sanitize), extract_links_from_soup(soup)
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark of the intro sanitizer against the markdownify round-trip it
+replaced, on the intro HTML of each saved page (its top-level paragraphs
+before the first mw-heading2).
+
+Times the old markdownify sanitizer, sanitize_wiki_intro on the same HTML
+string, and sanitize_wiki_intro_elements on the already-parsed paragraphs,
+which is what ingestion calls. The "same" column says whether the new output
+matches the old one; reviewed differences are listed in
+tests/fixtures/extractor/expected.json.
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.sanitizer
+"""
+import argparse
+
+from lxml import html as lxml_html
+
+from app.utils import sanitize_wiki_intro, sanitize_wiki_intro_elements
+from benchmarks import CORPUS, best_time, load_pages, print_table
+from benchmarks import reference
+from benchmarks.lead_mode import CONTENT_DIV
+
+
+def intro_paragraphs(page_html):
+    content_divs = lxml_html.document_fromstring(page_html).xpath(CONTENT_DIV)
+    paragraphs = []
+    for element in content_divs[0] if content_divs else []:
+        if element.tag == "div" and "mw-heading2" in element.get("class", "").split():
+            break
+        if element.tag == "p" and element.text_content().strip():
+            paragraphs.append(element)
+    return paragraphs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", default=CORPUS, help="directory of saved parse-API HTML pages")
+    args = parser.parse_args()
+
+    rows = []
+    totals = [0.0, 0.0, 0.0]
+    for name, page_html in load_pages(args.pages).items():
+        paragraphs = intro_paragraphs(page_html)
+        if not paragraphs:
+            continue
+        intro_html = "\n".join(lxml_html.tostring(p, encoding="unicode", with_tail=False) for p in paragraphs)
+        times = (
+            best_time(lambda: reference.sanitize_wiki_intro(intro_html)),
+            best_time(lambda: sanitize_wiki_intro(intro_html)),
+            best_time(lambda: sanitize_wiki_intro_elements(paragraphs))
+        )
+        for i, seconds in enumerate(times):
+            totals[i] += seconds
+        same = reference.sanitize_wiki_intro(intro_html) == sanitize_wiki_intro_elements(paragraphs)
+        rows.append([name, len(intro_html), *(f"{seconds * 1e6:.0f}" for seconds in times), "yes" if same else "no"])
+
+    print_table(["page", "intro B", "markdownify us", "html us", "elements us", "same"], rows)
+    if totals[2]:
+        print(f"\nspeedup over {len(rows)} intros: {totals[0] / totals[1]:.1f}x from HTML, "
+              f"{totals[0] / totals[2]:.1f}x from parsed elements")
+
+
+if __name__ == "__main__":
+    main()
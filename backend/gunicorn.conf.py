@@ -0,0 +1,20 @@
+# Loaded automatically by gunicorn when started from this directory.
+import os
+import shutil
+
+# Each worker keeps its Prometheus samples in files under this directory so
+# /metrics can sum them across workers (see app/metrics.py). It has to be set
+# here, before the app (and prometheus_client) is imported, also with --preload.
+multiproc_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/knowledge-explorer-metrics")
+os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def on_starting(server):
+    # Files left by a previous run would be counted again
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
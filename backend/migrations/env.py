@@ -18,6 +18,15 @@ config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL"))
 from app.models import db
 target_metadata = db.metadata
 
+# Full-text search objects (migration 0003) are created with raw SQL and are not
+# declared in the models, so autogenerate must not try to drop them
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith("article_search"):
+        return False
+    if name and "search_vector" in name:
+        return False
+    return True
+
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -25,6 +34,7 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -40,7 +50,8 @@ def run_migrations_online():
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,89 @@
+"""baseline schema
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+Schema as it stood before migrations were tracked in the repository. A
+database created earlier with a locally generated migration already has
+these tables; mark it with `flask db stamp 0001_baseline` instead of
+upgrading through this revision.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=128), nullable=False),
+        sa.Column('is_admin', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username')
+    )
+    op.create_table(
+        'articles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('topic', sa.String(length=255), nullable=False),
+        sa.Column('full_text', sa.Text(), nullable=False),
+        sa.Column('internal_links', sa.Text(), nullable=True),
+        sa.Column('retrieved_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('topic')
+    )
+    op.create_table(
+        'canonical_topics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_input', sa.String(length=255), nullable=False),
+        sa.Column('canonical_title', sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_input')
+    )
+    op.create_table(
+        'links',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('topic', sa.String(length=255), nullable=False),
+        sa.Column('linked_topic', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['topic'], ['articles.topic']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'summaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('topic', sa.String(length=255), nullable=False),
+        sa.Column('basic_summary', sa.Text(), nullable=True),
+        sa.Column('intermediate_summary', sa.Text(), nullable=True),
+        sa.Column('advanced_summary', sa.Text(), nullable=True),
+        sa.Column('generated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['topic'], ['articles.topic']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('topic')
+    )
+    op.create_table(
+        'learning_paths',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('topic', sa.String(length=255), nullable=False),
+        sa.Column('ranked_links', sa.Text(), nullable=True),
+        sa.Column('last_updated', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['topic'], ['articles.topic']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+def downgrade():
+    op.drop_table('learning_paths')
+    op.drop_table('summaries')
+    op.drop_table('links')
+    op.drop_table('canonical_topics')
+    op.drop_table('articles')
+    op.drop_table('users')
@@ -0,0 +1,32 @@
+"""articles.revid
+
+Revision ID: 0001a_article_revid
+Revises: 0001_baseline
+Create Date: 2026-10-18 12:10:00.000000
+
+Adds the Wikipedia revision id stored with each article, used to skip
+re-parsing unchanged pages. Databases that already have the column (created
+from the models, or from an earlier copy of the baseline that included it)
+are left as they are.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001a_article_revid'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+def upgrade():
+    if 'revid' not in _columns('articles'):
+        op.add_column('articles', sa.Column('revid', sa.BigInteger(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('articles') as batch_op:
+        batch_op.drop_column('revid')
@@ -0,0 +1,42 @@
+"""per-level summary timestamps
+
+Revision ID: 0001b_summary_level_timestamps
+Revises: 0001a_article_revid
+Create Date: 2026-10-18 12:20:00.000000
+
+Adds `basic_generated_at`, `intermediate_generated_at` and
+`advanced_generated_at` to `summaries`, so each reading level ages on its own.
+Existing rows were written in one go, so every level that has a summary is
+backfilled from `generated_at`.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001b_summary_level_timestamps'
+down_revision = '0001a_article_revid'
+branch_labels = None
+depends_on = None
+
+LEVELS = ('basic', 'intermediate', 'advanced')
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+def upgrade():
+    existing = _columns('summaries')
+    for level in LEVELS:
+        if f'{level}_generated_at' not in existing:
+            op.add_column('summaries', sa.Column(f'{level}_generated_at', sa.DateTime(), nullable=True))
+    for level in LEVELS:
+        op.execute(
+            f"UPDATE summaries SET {level}_generated_at = generated_at "
+            f"WHERE {level}_summary IS NOT NULL AND {level}_generated_at IS NULL"
+        )
+
+def downgrade():
+    with op.batch_alter_table('summaries') as batch_op:
+        for level in LEVELS:
+            batch_op.drop_column(f'{level}_generated_at')
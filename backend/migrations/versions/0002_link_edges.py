@@ -0,0 +1,117 @@
+"""link edge table and unique learning path topics
+
+Revision ID: 0002_link_edges
+Revises: 0001b_summary_level_timestamps
+Create Date: 2026-10-18 12:30:00.000000
+
+Replaces the one-JSON-blob-per-topic `links` table with `link_edges`
+(source, target, position), converting the existing rows in bulk, and makes
+`learning_paths.topic` unique (keeping the newest row per topic).
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_link_edges'
+down_revision = '0001b_summary_level_timestamps'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+links = sa.table(
+    'links',
+    sa.column('id', sa.Integer),
+    sa.column('topic', sa.String),
+    sa.column('linked_topic', sa.Text)
+)
+
+def upgrade():
+    link_edges = op.create_table(
+        'link_edges',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(length=255), nullable=False),
+        sa.Column('target', sa.String(length=255), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('source', 'target', name='uq_link_edges_source_target')
+    )
+
+    # Newest row wins when a topic has several; rows arrive grouped by topic
+    conn = op.get_bind()
+    result = conn.execution_options(stream_results=True).execute(
+        sa.select(links.c.topic, links.c.linked_topic).order_by(links.c.topic, links.c.id.desc())
+    )
+    batch = []
+    previous_topic = None
+    for topic, linked_topic in result:
+        if topic == previous_topic:
+            continue
+        previous_topic = topic
+        try:
+            targets = json.loads(linked_topic) if linked_topic else []
+        except ValueError:
+            targets = []
+        for position, target in enumerate(dict.fromkeys(t for t in targets if t and len(t) <= 255)):
+            batch.append({'source': topic, 'target': target, 'position': position})
+        if len(batch) >= BATCH_SIZE:
+            op.bulk_insert(link_edges, batch)
+            batch = []
+    if batch:
+        op.bulk_insert(link_edges, batch)
+
+    op.create_index('ix_link_edges_source_position', 'link_edges', ['source', 'position'])
+    op.create_index('ix_link_edges_target', 'link_edges', ['target'])
+    op.drop_table('links')
+
+    op.execute(
+        'DELETE FROM learning_paths WHERE id NOT IN '
+        '(SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM learning_paths GROUP BY topic) AS newest)'
+    )
+    op.create_index('ix_learning_paths_topic', 'learning_paths', ['topic'], unique=True)
+
+def downgrade():
+    op.drop_index('ix_learning_paths_topic', table_name='learning_paths')
+
+    op.create_table(
+        'links',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('topic', sa.String(length=255), nullable=False),
+        sa.Column('linked_topic', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['topic'], ['articles.topic']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    edges = sa.table(
+        'link_edges',
+        sa.column('source', sa.String),
+        sa.column('target', sa.String),
+        sa.column('position', sa.Integer)
+    )
+    conn = op.get_bind()
+    result = conn.execution_options(stream_results=True).execute(
+        sa.select(edges.c.source, edges.c.target).order_by(edges.c.source, edges.c.position)
+    )
+    batch = []
+    current_source, targets = None, []
+    for source, target in result:
+        if source != current_source:
+            if current_source is not None:
+                batch.append({'topic': current_source, 'linked_topic': json.dumps(targets)})
+            current_source, targets = source, []
+        targets.append(target)
+        if len(batch) >= BATCH_SIZE:
+            op.bulk_insert(links, batch)
+            batch = []
+    if current_source is not None:
+        batch.append({'topic': current_source, 'linked_topic': json.dumps(targets)})
+    if batch:
+        op.bulk_insert(links, batch)
+
+    op.drop_index('ix_link_edges_target', table_name='link_edges')
+    op.drop_index('ix_link_edges_source_position', table_name='link_edges')
+    op.drop_table('link_edges')
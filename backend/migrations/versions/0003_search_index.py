@@ -0,0 +1,121 @@
+"""full-text search index over articles and summaries
+
+Revision ID: 0003_search_index
+Revises: 0002_link_edges
+Create Date: 2026-10-18 18:00:00.000000
+
+SQLite: an FTS5 table `article_search` (rowid = articles.id) kept in step
+with `articles` and `summaries` by triggers. PostgreSQL: generated
+`search_vector` tsvector columns on both tables with GIN indexes. Neither is
+declared in the models; migrations/env.py excludes them from autogenerate.
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_search_index'
+down_revision = '0002_link_edges'
+branch_labels = None
+depends_on = None
+
+
+def _summary_text(row):
+    return (
+        f"coalesce({row}.basic_summary, '') || ' ' || "
+        f"coalesce({row}.intermediate_summary, '') || ' ' || "
+        f"coalesce({row}.advanced_summary, '')"
+    )
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE article_search USING fts5("
+    "topic, full_text, summary, tokenize = 'porter unicode61 remove_diacritics 2')",
+    f"""
+    INSERT INTO article_search (rowid, topic, full_text, summary)
+    SELECT a.id, a.topic, a.full_text, {_summary_text('s')}
+    FROM articles a LEFT JOIN summaries s ON s.topic = a.topic
+    """,
+    f"""
+    CREATE TRIGGER article_search_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO article_search (rowid, topic, full_text, summary)
+        VALUES (new.id, new.topic, new.full_text,
+                (SELECT {_summary_text('s')} FROM summaries s WHERE s.topic = new.topic));
+    END
+    """,
+    """
+    CREATE TRIGGER article_search_au AFTER UPDATE OF topic, full_text ON articles BEGIN
+        UPDATE article_search SET topic = new.topic, full_text = new.full_text WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER article_search_ad AFTER DELETE ON articles BEGIN
+        DELETE FROM article_search WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER article_search_summary_ai AFTER INSERT ON summaries BEGIN
+        UPDATE article_search SET summary = {_summary_text('new')}
+        WHERE rowid = (SELECT id FROM articles WHERE topic = new.topic);
+    END
+    """,
+    f"""
+    CREATE TRIGGER article_search_summary_au AFTER UPDATE ON summaries BEGIN
+        UPDATE article_search SET summary = {_summary_text('new')}
+        WHERE rowid = (SELECT id FROM articles WHERE topic = new.topic);
+    END
+    """,
+    """
+    CREATE TRIGGER article_search_summary_ad AFTER DELETE ON summaries BEGIN
+        UPDATE article_search SET summary = NULL
+        WHERE rowid = (SELECT id FROM articles WHERE topic = old.topic);
+    END
+    """
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER article_search_summary_ad",
+    "DROP TRIGGER article_search_summary_au",
+    "DROP TRIGGER article_search_summary_ai",
+    "DROP TRIGGER article_search_ad",
+    "DROP TRIGGER article_search_au",
+    "DROP TRIGGER article_search_ai",
+    "DROP TABLE article_search"
+]
+
+# Title matches weigh most, then the article text, then the summaries
+POSTGRESQL_UPGRADE = [
+    """
+    ALTER TABLE articles ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(topic, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(full_text, '')), 'B')
+    ) STORED
+    """,
+    f"""
+    ALTER TABLE summaries ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', {_summary_text('summaries')}), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX ix_articles_search_vector ON articles USING gin (search_vector)",
+    "CREATE INDEX ix_summaries_search_vector ON summaries USING gin (search_vector)"
+]
+
+POSTGRESQL_DOWNGRADE = [
+    "DROP INDEX ix_summaries_search_vector",
+    "DROP INDEX ix_articles_search_vector",
+    "ALTER TABLE summaries DROP COLUMN search_vector",
+    "ALTER TABLE articles DROP COLUMN search_vector"
+]
+
+
+def _run(statements_by_dialect):
+    dialect = op.get_bind().dialect.name
+    if dialect not in statements_by_dialect:
+        raise NotImplementedError(f"Full-text search is not implemented for the '{dialect}' dialect")
+    for statement in statements_by_dialect[dialect]:
+        op.execute(statement)
+
+def upgrade():
+    _run({'sqlite': SQLITE_UPGRADE, 'postgresql': POSTGRESQL_UPGRADE})
+
+def downgrade():
+    _run({'sqlite': SQLITE_DOWNGRADE, 'postgresql': POSTGRESQL_DOWNGRADE})
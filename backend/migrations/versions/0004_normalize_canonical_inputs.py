@@ -0,0 +1,67 @@
+"""normalize canonical_topics.user_input
+
+Revision ID: 0004_normalize_canonical_inputs
+Revises: 0003_search_index
+Create Date: 2026-10-18 19:00:00.000000
+
+Rewrites every `canonical_topics.user_input` to the normalized lookup key
+(NFKC, underscores as spaces, collapsed whitespace, casefolded). When several
+spellings collapse to one key, the newest mapping is kept.
+"""
+
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_normalize_canonical_inputs'
+down_revision = '0003_search_index'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+canonical_topics = sa.table(
+    'canonical_topics',
+    sa.column('id', sa.Integer),
+    sa.column('user_input', sa.String)
+)
+
+# Copy of app.utils.normalize_topic at the time of this migration
+def _normalize(text):
+    text = unicodedata.normalize("NFKC", text).replace("_", " ")
+    return " ".join(text.split()).casefold()
+
+def upgrade():
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(canonical_topics.c.id, canonical_topics.c.user_input).order_by(canonical_topics.c.id.desc())
+    ).all()
+
+    seen, delete_ids, updates = set(), [], []
+    for row_id, user_input in rows:
+        key = _normalize(user_input)
+        if key in seen or not key or len(key) > 255:
+            delete_ids.append(row_id)
+            continue
+        seen.add(key)
+        if key != user_input:
+            updates.append({'row_id': row_id, 'key': key})
+
+    # Deletes first: a kept row can then take its normalized key without
+    # colliding with a not-yet-removed spelling of the same key
+    for start in range(0, len(delete_ids), BATCH_SIZE):
+        conn.execute(canonical_topics.delete().where(canonical_topics.c.id.in_(delete_ids[start:start + BATCH_SIZE])))
+    if updates:
+        conn.execute(
+            canonical_topics.update()
+            .where(canonical_topics.c.id == sa.bindparam('row_id'))
+            .values(user_input=sa.bindparam('key')),
+            updates
+        )
+
+def downgrade():
+    # Normalized inputs are valid inputs; the original spellings are not kept
+    pass
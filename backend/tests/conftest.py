@@ -0,0 +1,54 @@
+import os
+import tempfile
+
+import fakeredis
+import pytest
+import redis
+
+# Every Redis client the app creates talks to one in-memory server
+REDIS_SERVER = fakeredis.FakeServer()
+
+
+def _fake_from_url(cls, url, **kwargs):
+    pool = redis.ConnectionPool(connection_class=fakeredis.FakeRedisConnection, server=REDIS_SERVER, **kwargs)
+    return cls(connection_pool=pool)
+
+
+redis.Redis.from_url = classmethod(_fake_from_url)
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.setdefault("SINGLE_FLIGHT_WAIT_TIMEOUT", "2")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def app():
+    from flask_migrate import upgrade
+    from app import create_app
+
+    flask_app = create_app()
+    with flask_app.app_context():
+        upgrade(directory=os.path.join(BACKEND_DIR, "migrations"))
+    return flask_app
+
+
+@pytest.fixture(autouse=True)
+def app_context(app):
+    """Each test starts with an empty DB, an empty Redis and empty L1 caches."""
+    from app import db
+    from app.cache import local_caches, redis_client
+
+    with app.app_context():
+        yield
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+    redis_client.flushall()
+    for local_cache in local_caches.values():
+        local_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
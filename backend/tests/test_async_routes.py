@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.cache import NEGATIVE_MISSING, store_negative_topic_in_cache
+from app.content_retrieval import save_summaries
+from app.database import store_ingested_page_in_db
+
+ORIGIN = "http://localhost:3000"
+
+
+@pytest.fixture(scope="session")
+def async_app(app):
+    from app import create_async_app
+    return create_async_app()
+
+
+@pytest.fixture
+def stored_topic():
+    store_ingested_page_in_db("Black hole", {
+        "title": "Black hole",
+        "revid": 1,
+        "intro": "A black hole is a region of spacetime.",
+        "links": ["Spacetime", "Event_horizon"]
+    })
+    save_summaries("Black hole", {"basic": "Nothing gets out of a black hole."})
+
+
+def _request(async_app, method, path, **headers):
+    async def send():
+        transport = httpx.ASGITransport(app=async_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await client.request(method, path, headers={"Origin": ORIGIN, **headers})
+    return asyncio.run(send())
+
+
+def test_preflight_matches_the_flask_policy(async_app, client):
+    headers = {"Access-Control-Request-Method": "GET"}
+
+    response = _request(async_app, "OPTIONS", "/summary/Black hole", **headers)
+    flask_response = client.options("/summary/Black hole", headers={"Origin": ORIGIN, **headers})
+
+    assert response.status_code == 200
+    for header in ("Access-Control-Allow-Origin", "Access-Control-Allow-Credentials"):
+        assert response.headers[header] == flask_response.headers[header]
+    assert response.headers["Access-Control-Allow-Origin"] == ORIGIN
+
+
+def test_summary_is_served_with_cors_headers(async_app, stored_topic):
+    response = _request(async_app, "GET", "/summary/Black hole")
+
+    assert response.status_code == 200
+    assert response.json()["summary"] == "Nothing gets out of a black hole."
+    assert response.headers["Access-Control-Allow-Origin"] == ORIGIN
+    assert response.headers["Access-Control-Allow-Credentials"] == "true"
+
+
+def test_unresolvable_topic_is_a_404(async_app):
+    store_negative_topic_in_cache("Qwxzv", NEGATIVE_MISSING)
+
+    response = _request(async_app, "GET", "/summary/Qwxzv")
+
+    assert response.status_code == 404
+    assert response.headers["Access-Control-Allow-Origin"] == ORIGIN
+
+
+def test_invalid_level_is_rejected(async_app):
+    response = _request(async_app, "GET", "/learning-path/Black hole?level=expert")
+
+    assert response.status_code == 400
+
+
+def test_other_routes_fall_through_to_flask(async_app):
+    response = _request(async_app, "GET", "/cache/stats")
+
+    assert response.status_code == 200
+    assert "single_flight" in response.json()
+    assert response.headers["Access-Control-Allow-Origin"] == ORIGIN
@@ -0,0 +1,171 @@
+import json
+
+import pytest
+
+import app.cache as cache
+from app.cache import (
+    CODEC_MAGIC,
+    CODEC_PLAIN,
+    CODEC_VERSION,
+    CODEC_ZLIB,
+    COMPRESS_THRESHOLD,
+    OVERWRITE_CHANNEL,
+    binary_client,
+    decode_value,
+    encode_value,
+    get_article_from_cache,
+    get_cache_byte_stats,
+    get_links_from_cache,
+    get_learning_path_from_cache,
+    get_summary_from_cache,
+    get_topic_bundle_from_cache,
+    local_caches,
+    redis_client,
+    store_article_in_cache,
+    store_canonical_topic_in_cache,
+    store_learning_path_in_cache,
+    store_summaries_in_cache
+)
+
+
+@pytest.fixture
+def overwrites():
+    """Messages published on the overwrite channel, as another worker would receive them."""
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(OVERWRITE_CHANNEL)
+
+    def received():
+        messages = []
+        while (message := pubsub.get_message(timeout=0.1)) is not None:
+            messages.append(message)
+        return messages
+
+    yield received
+    pubsub.close()
+
+
+def _deliver_elsewhere(monkeypatch, messages):
+    monkeypatch.setattr(cache, "_worker_id", lambda: "other-host:1")
+    for message in messages:
+        cache._handle_overwrite(message)
+
+
+def test_summary_overwrite_evicts_other_workers_copies(monkeypatch, overwrites):
+    store_summaries_in_cache("Black hole", {"basic": "Old summary."})
+    overwrites()
+    store_summaries_in_cache("Black hole", {"basic": "New summary."})
+    # Another worker read the old summary before the overwrite
+    local_caches["summary"].set("summary:Black hole:basic", "Old summary.")
+
+    _deliver_elsewhere(monkeypatch, overwrites())
+
+    assert get_summary_from_cache("Black hole", "basic") == "New summary."
+
+
+def test_learning_path_overwrite_evicts_other_workers_copies(monkeypatch, overwrites):
+    store_learning_path_in_cache("Black hole", ["Gravity"])
+    overwrites()
+    store_learning_path_in_cache("Black hole", ["Event horizon"])
+    local_caches["learning_path"].set("learning_path:Black hole", ["Gravity"])
+
+    _deliver_elsewhere(monkeypatch, overwrites())
+
+    assert get_learning_path_from_cache("Black hole") == ["Event horizon"]
+
+
+def test_writer_keeps_its_own_copy(overwrites):
+    store_learning_path_in_cache("Black hole", ["Event horizon"])
+
+    for message in overwrites():
+        cache._handle_overwrite(message)
+
+    assert local_caches["learning_path"].get("learning_path:Black hole") == ["Event horizon"]
+
+
+def test_stats_are_labelled_with_the_worker(client):
+    stats = client.get("/cache/stats").get_json()
+
+    assert set(stats["worker"]) == {"pid", "l1", "redis", "negative_hits"}
+    assert "bytes" in stats
+
+
+def test_summary_bundle_is_served_from_l1_without_a_learning_path(monkeypatch):
+    store_canonical_topic_in_cache("black hole", "Black hole")
+    store_summaries_in_cache("Black hole", {"basic": "Nothing gets out."})
+    scripts = []
+    monkeypatch.setattr(cache, "_TOPIC_BUNDLE_SCRIPT", lambda keys: scripts.append(keys) or [None])
+
+    bundle = get_topic_bundle_from_cache("black hole", "basic", with_learning_path=False)
+
+    assert bundle == {"topic": "Black hole", "summary": "Nothing gets out.", "learning_path": None}
+    assert scripts == []
+    # A caller that needs the learning path still asks Redis for it
+    get_topic_bundle_from_cache("black hole", "basic")
+    assert len(scripts) == 1
+
+
+def test_small_values_are_stored_plain_behind_the_header():
+    encoded, raw_size = encode_value("A region of spacetime.")
+
+    assert encoded[:3] == CODEC_MAGIC + bytes([CODEC_VERSION, CODEC_PLAIN])
+    assert encoded[3:] == b'"A region of spacetime."'
+    assert raw_size == len(encoded) - 3
+
+
+def test_values_over_the_threshold_are_compressed():
+    links = [f"Link_{i % 10}" for i in range(COMPRESS_THRESHOLD)]
+
+    encoded, raw_size = encode_value(links)
+
+    assert encoded[:3] == CODEC_MAGIC + bytes([CODEC_VERSION, CODEC_ZLIB])
+    assert len(encoded) < raw_size
+    assert decode_value(encoded, legacy_json=True) == links
+
+
+def test_values_that_do_not_shrink_stay_plain(monkeypatch):
+    # zlib's own overhead makes a tiny value larger
+    monkeypatch.setattr(cache, "COMPRESS_THRESHOLD", 0)
+
+    encoded, _ = encode_value("ab")
+
+    assert encoded[2] == CODEC_PLAIN
+    assert decode_value(encoded, legacy_json=False) == "ab"
+
+
+def test_magic_byte_never_starts_utf8_text():
+    # 0xC1 is never valid in UTF-8, so a legacy string cannot be mistaken for an encoded value
+    with pytest.raises(UnicodeDecodeError):
+        CODEC_MAGIC.decode("utf-8")
+
+
+def test_unknown_codec_version_is_rejected():
+    encoded, _ = encode_value("text")
+
+    with pytest.raises(ValueError):
+        decode_value(encoded[:1] + bytes([CODEC_VERSION + 1]) + encoded[2:], legacy_json=False)
+
+
+def test_entries_written_before_the_codec_are_still_read():
+    binary_client.set("article:Black hole", "A région of spacetime.".encode("utf-8"))
+    binary_client.set("links:Black hole", json.dumps(["Event_horizon", "Spacetime"]))
+
+    assert get_article_from_cache("Black hole") == "A région of spacetime."
+    assert get_links_from_cache("Black hole") == ["Event_horizon", "Spacetime"]
+
+
+def test_corrupted_entries_read_as_misses():
+    binary_client.set("article:Black hole", CODEC_MAGIC + bytes([CODEC_VERSION, CODEC_ZLIB]) + b"not zlib")
+
+    assert get_article_from_cache("Black hole") is None
+
+
+def test_writes_count_raw_and_stored_bytes():
+    text = "Black holes bend light. " * 100
+    store_article_in_cache("Black hole", text)
+
+    counts = get_cache_byte_stats()["article"]
+
+    assert counts["writes"] == 1
+    assert counts["raw"] == len(json.dumps(text))
+    assert counts["stored"] < counts["raw"]
+    assert counts["compression_ratio"] == round(counts["stored"] / counts["raw"], 4)
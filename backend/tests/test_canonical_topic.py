@@ -0,0 +1,86 @@
+import pytest
+
+import app.content_retrieval as content_retrieval
+from app.cache import NEGATIVE_ERROR, NEGATIVE_MISSING, local_caches, store_negative_topic_in_cache
+from app.database import store_canonical_topic_in_db
+from app.suggest import fuzzy_index
+
+
+@pytest.fixture(autouse=True)
+def known_titles():
+    fuzzy_index.add(["World War I", "Apollo 11", "Black hole"])
+
+
+def _wikipedia_with(pages, failure=NEGATIVE_MISSING):
+    calls = []
+
+    def get_wiki_html(topic):
+        calls.append(topic)
+        if topic in pages:
+            store_canonical_topic_in_db(topic, topic)
+            return topic
+        store_negative_topic_in_cache(topic, failure)
+        return None
+    return get_wiki_html, calls
+
+
+@pytest.mark.parametrize("title", ["World War II", "Apollo 13"])
+def test_real_title_is_not_replaced_by_a_similar_known_one(monkeypatch, title):
+    get_wiki_html, calls = _wikipedia_with({title})
+    monkeypatch.setattr(content_retrieval, "get_wiki_html", get_wiki_html)
+
+    assert content_retrieval.get_canonical_topic(title) == title
+    assert calls == [title]
+
+
+def test_missing_title_falls_back_to_fuzzy_match(monkeypatch):
+    get_wiki_html, calls = _wikipedia_with(set())
+    monkeypatch.setattr(content_retrieval, "get_wiki_html", get_wiki_html)
+
+    assert content_retrieval.get_canonical_topic("Blak hole") == "Black hole"
+    # The miss is negative-cached, so the next lookup stays local
+    assert content_retrieval.get_canonical_topic("Blak hole") == "Black hole"
+    assert calls == ["Blak hole"]
+
+
+def test_upstream_error_does_not_fall_back_to_fuzzy_match(monkeypatch):
+    get_wiki_html, _ = _wikipedia_with(set(), failure=NEGATIVE_ERROR)
+    monkeypatch.setattr(content_retrieval, "get_wiki_html", get_wiki_html)
+
+    assert content_retrieval.get_canonical_topic("Blak hole") is None
+
+
+def test_find_canonical_topic_does_not_guess():
+    assert content_retrieval.find_canonical_topic("Blak hole") is None
+
+
+def test_ingest_leases_use_the_normalized_topic(monkeypatch):
+    keys = []
+    monkeypatch.setattr(content_retrieval, "get_canonical_topic", lambda topic: topic)
+    monkeypatch.setattr(content_retrieval, "single_flight", lambda stage, key, generate, lookup: keys.append((stage, key)))
+
+    for spelling in ("Black_hole", "black  HOLE"):
+        content_retrieval.get_article_text(spelling)
+        content_retrieval.get_article_links(spelling)
+
+    assert set(keys) == {("wiki", "black hole")}
+
+
+@pytest.mark.parametrize("failure", [NEGATIVE_MISSING, NEGATIVE_ERROR])
+def test_bulk_lookup_skips_negative_cached_titles(monkeypatch, failure):
+    calls = []
+
+    def resolve_canonical_titles(titles):
+        calls.append(titles)
+        return {title: title for title in titles}
+
+    monkeypatch.setattr(content_retrieval, "resolve_canonical_titles", resolve_canonical_titles)
+    store_negative_topic_in_cache("Blak hole", failure)
+    # Read the entry back from Redis, as another worker would
+    local_caches["negative"].clear()
+    store_canonical_topic_in_db("Apollo 11", "Apollo 11")
+
+    resolved = content_retrieval.get_canonical_topics(["Apollo 11", "Blak hole", "Event horizon"])
+
+    assert resolved == {"Apollo 11": "Apollo 11", "Event horizon": "Event horizon"}
+    assert calls == [["Event horizon"]]
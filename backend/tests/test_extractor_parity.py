@@ -0,0 +1,29 @@
+"""
+Golden corpus for extract_intro_and_links. expected.json holds what the
+BeautifulSoup/markdownify extractor produced for each page before it was
+removed; reviewed differences are recorded under "deviation" with the reason.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from app.wikipedia import extract_intro_and_links
+
+CORPUS = Path(__file__).parent / "fixtures" / "extractor"
+EXPECTED = json.loads((CORPUS / "expected.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("page", sorted(EXPECTED))
+def test_extractor_matches_the_previous_output(page):
+    expected = EXPECTED[page]
+
+    intro, links = extract_intro_and_links((CORPUS / f"{page}.html").read_text(encoding="utf-8"))
+
+    assert intro == expected.get("deviation", expected)["intro"]
+    # The old extractor collected links in a set, so only membership is comparable
+    assert sorted(links) == expected["links"]
+
+
+def test_every_page_has_an_expected_output():
+    assert {path.stem for path in CORPUS.glob("*.html")} == set(EXPECTED)
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+import app.content_retrieval as content_retrieval
+import app.freshness as freshness
+from app.cache import store_freshness_in_cache
+from app.database import store_ingested_page_in_db
+
+DAY = 86400
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    calls = []
+    monkeypatch.setattr(freshness, "schedule_refresh", lambda *args: calls.append(args))
+    # No early refresh by chance
+    monkeypatch.setattr(freshness.random, "random", lambda: 0.0)
+    monkeypatch.setattr(content_retrieval, "get_wiki_html", lambda topic: pytest.fail("Wikipedia was called"))
+    store_ingested_page_in_db("Black hole", {
+        "title": "Black hole",
+        "revid": 1,
+        "intro": "A black hole is a region of spacetime.",
+        "links": ["Spacetime", "Event_horizon"]
+    })
+    return calls
+
+
+def _article_age(seconds):
+    store_freshness_in_cache("Black hole", {"article": time.time() - seconds})
+
+
+@pytest.mark.parametrize("get", [content_retrieval.get_article_text, content_retrieval.get_article_links])
+def test_stale_article_is_served_and_refreshed_in_the_background(scheduled, get):
+    _article_age(freshness.FRESHNESS_POLICIES["article"]["soft"] + DAY)
+
+    assert get("Black hole")
+    assert scheduled == [("Black hole", "article", None)]
+
+
+@pytest.mark.parametrize("get", [content_retrieval.get_article_text, content_retrieval.get_article_links])
+def test_fresh_article_is_not_refreshed(scheduled, get):
+    _article_age(DAY)
+
+    assert get("Black hole")
+    assert scheduled == []
@@ -0,0 +1,50 @@
+import pytest
+
+from app.fuzzy import TrigramIndex, numerals
+
+TITLES = [
+    "World War I", "World War II", "Apollo 11", "Apollo 13", "Henry VII", "Henry VIII",
+    "Windows 10", "Windows 11", "Type 1 diabetes", "Type 2 diabetes", "Iron Man", "Iron Man 2",
+    "Black hole", "Photosynthesis"
+]
+
+
+@pytest.fixture
+def index():
+    index = TrigramIndex()
+    index.add(TITLES)
+    return index
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Blak hole", "Black hole"),
+    ("photosynthesys", "Photosynthesis"),
+    ("Wold War II", "World War II"),
+    ("Apolo 13", "Apollo 13"),
+])
+def test_near_miss_spellings_match(index, text, expected):
+    assert index.match(text) == expected
+
+
+@pytest.mark.parametrize("text, other", [
+    ("World War III", "World War II"),
+    ("Apollo 12", "Apollo 11"),
+    ("Henry VI", "Henry VII"),
+    ("Windows 12", "Windows 11"),
+    ("Type 3 diabetes", "Type 2 diabetes"),
+    ("Iron Man 3", "Iron Man 2"),
+])
+def test_titles_differing_in_numerals_never_match(index, text, other):
+    assert index.match(text) is None
+
+
+@pytest.mark.parametrize("text", ["World War II", "Apollo 13", "Henry VII", "Windows 11", "Type 2 diabetes", "Iron Man"])
+def test_known_titles_match_themselves(index, text):
+    assert index.match(text) == text
+
+
+def test_numerals():
+    assert numerals("world war ii") == {"ii"}
+    assert numerals("apollo 13") == {"13"}
+    assert numerals("type 2 diabetes") == {"2"}
+    assert numerals("black hole") == set()
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import event
+
+import app.database as database
+from app import db
+from app.database import get_links_from_db, store_ingested_pages_in_db, store_links_in_db
+from app.graph import expand_graph
+
+
+def _page(title, links):
+    return title, {"title": title, "revid": 1, "intro": f"About {title}.", "links": links}
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
+def test_each_frontier_reads_its_links_with_one_query(statements):
+    store_ingested_pages_in_db([
+        _page("Star", ["Sun", "Nuclear_fusion", "Galaxy"]),
+        _page("Sun", ["Star", "Solar_System"]),
+        _page("Nuclear fusion", ["Hydrogen"]),
+        _page("Galaxy", ["Star", "Milky_Way"])
+    ])
+    statements.clear()
+
+    graph = expand_graph("Star", depth=2, fanout=5, fetch_budget=0)
+
+    assert graph["nodes"] == ["Star", "Sun", "Nuclear fusion", "Galaxy", "Solar System", "Hydrogen", "Milky Way"]
+    assert graph["adjacency"][:4] == [[1, 2, 3], [0, 4], [5], [0, 6]]
+    assert graph["unexpanded"] == []
+    assert len([statement for statement in statements if "FROM link_edges" in statement]) == 2
+
+
+def test_upserts_fall_back_to_select_then_insert(monkeypatch):
+    monkeypatch.setattr(database, "_UPSERT_INSERTS", {})
+
+    store_links_in_db("Star", ["Sun", "Galaxy"])
+    store_links_in_db("Star", ["Galaxy", "Sun", "Nebula"])
+    assert get_links_from_db("Star") == ["Galaxy", "Sun", "Nebula"]
+
+    title, page = _page("Star", ["Sun"])
+    store_ingested_pages_in_db([(title, page)])
+    store_ingested_pages_in_db([("star", {**page, "intro": "A luminous spheroid of plasma."})])
+
+    assert database.get_canonical_topic_from_db("STAR") == "Star"
+    assert database.get_article_from_db("Star") == "A luminous spheroid of plasma."
+    assert get_links_from_db("Star") == ["Sun"]
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+import app.jobs as jobs
+import app.routes as routes
+from app.cache import NEGATIVE_MISSING, redis_client, store_negative_topic_in_cache
+
+QUEUED_ROUTES = [
+    ("GET", "/summary/{}"),
+    ("GET", "/learning-path/{}"),
+    ("POST", "/rerank-learning-path/{}")
+]
+
+
+def test_worker_process_starts_and_runs_a_job(monkeypatch):
+    monkeypatch.setattr(jobs, "WORKER_POLL_TIMEOUT", 1)
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "echo", lambda topic, level: {"topic": topic, "level": level})
+
+    stop = threading.Event()
+    # _worker_process builds its own app, as each spawned worker does
+    worker = threading.Thread(target=jobs._worker_process, args=(stop,), daemon=True)
+    worker.start()
+    try:
+        job = jobs.enqueue_job("echo", "Black hole", "advanced")
+        deadline = time.monotonic() + 10
+        while jobs.get_job(job["id"])["status"] in (jobs.JOB_QUEUED, jobs.JOB_RUNNING):
+            assert worker.is_alive(), "worker died"
+            assert time.monotonic() < deadline, "job was never processed"
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        worker.join(timeout=5)
+
+    finished = jobs.get_job(job["id"])
+    assert finished["status"] == jobs.JOB_DONE
+    assert finished["result"] == {"topic": "Black hole", "level": "advanced"}
+
+
+def test_enqueue_returns_the_active_job_for_duplicates():
+    first = jobs.enqueue_job("summary", "Black hole", "basic")
+    assert jobs.enqueue_job("summary", "black_hole", "basic")["id"] == first["id"]
+
+
+@pytest.mark.parametrize("method, path", QUEUED_ROUTES)
+def test_queue_mode_rejects_topics_that_recently_failed_to_resolve(monkeypatch, client, method, path):
+    monkeypatch.setattr(routes, "QUEUE_ENABLED", True)
+    store_negative_topic_in_cache("Qwxzv", NEGATIVE_MISSING)
+
+    response = client.open(path.format("Qwxzv"), method=method)
+
+    assert response.status_code == 404
+    assert redis_client.llen(jobs.QUEUE_KEY) == 0
+
+
+@pytest.mark.parametrize("method, path", QUEUED_ROUTES)
+def test_queue_mode_queues_topics_not_looked_up_yet(monkeypatch, client, method, path):
+    monkeypatch.setattr(routes, "QUEUE_ENABLED", True)
+
+    response = client.open(path.format("Black hole"), method=method)
+
+    assert response.status_code == 202
+    assert redis_client.llen(jobs.QUEUE_KEY) == 1
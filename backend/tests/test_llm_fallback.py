@@ -0,0 +1,59 @@
+import anthropic
+import httpx
+import pytest
+
+import app.content_retrieval as content_retrieval
+import app.jobs as jobs
+import app.llm as llm
+from app.database import store_ingested_page_in_db
+from app.ranking import refresh_graph_scores
+
+LINKS = ["Event horizon", "General relativity", "Hawking radiation", "Neutron star"]
+
+
+@pytest.fixture(autouse=True)
+def llm_down(monkeypatch):
+    def create(**kwargs):
+        raise anthropic.APIConnectionError(request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"))
+
+    monkeypatch.setattr(llm.client.messages, "create", create)
+    monkeypatch.setattr(content_retrieval, "get_wiki_html", lambda topic: pytest.fail("Wikipedia was called"))
+    store_ingested_page_in_db("Black hole", {
+        "title": "Black hole",
+        "revid": 1,
+        "intro": "A black hole is a region of spacetime where gravity is so strong that nothing can escape.",
+        "links": LINKS
+    })
+    refresh_graph_scores()
+
+
+def test_learning_path_falls_back_to_the_local_ranking(client):
+    response = client.get("/learning-path/Black hole")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["summary"] is None
+    assert body["degraded"] is True
+    assert sorted(body["links"]) == LINKS
+
+
+def test_rerank_falls_back_to_the_local_ranking(client):
+    response = client.post("/rerank-learning-path/Black hole")
+
+    assert response.status_code == 200
+    assert response.get_json()["degraded"] is True
+
+
+def test_summary_reports_an_error_instead_of_raising(client):
+    response = client.get("/summary/Black hole")
+
+    assert response.status_code == 500
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("kind", ["learning_path", "rerank"])
+def test_jobs_fall_back_to_the_local_ranking(kind):
+    result = jobs.JOB_HANDLERS[kind]("Black hole", "basic")
+
+    assert result["links"]
+    assert result["degraded"] is True
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from prometheus_client.parser import text_string_to_metric_families
+
+import app.metrics as metrics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = textwrap.dedent("""
+    import sys
+    from app.metrics import db_latency, record_cache_lookup
+
+    for _ in range(int(sys.argv[1])):
+        record_cache_lookup("redis", "article", hit=True)
+    db_latency.labels("SELECT").observe(0.002)
+""")
+
+
+def _run_worker(multiproc_dir, lookups):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(multiproc_dir)}
+    subprocess.run([sys.executable, "-c", WORKER, str(lookups)], cwd=BACKEND_DIR, env=env, check=True)
+
+
+def _samples(body):
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(body.decode())
+        for sample in family.samples
+    }
+
+
+def test_metrics_route_serves_the_text_format(client):
+    metrics.record_cache_lookup("l1", "summary", hit=False)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    key = ("knowledge_explorer_cache_lookups_total", (("key_type", "summary"), ("result", "miss"), ("tier", "l1")))
+    assert _samples(response.data)[key] >= 1
+
+
+def test_multiprocess_mode_sums_every_worker(tmp_path, monkeypatch):
+    _run_worker(tmp_path, 2)
+    _run_worker(tmp_path, 3)
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "MULTIPROC_DIR", str(tmp_path))
+
+    body, content_type = metrics.render_metrics()
+
+    samples = _samples(body)
+    lookups = ("knowledge_explorer_cache_lookups_total", (("key_type", "article"), ("result", "hit"), ("tier", "redis")))
+    assert samples[lookups] == 5
+    assert samples[("knowledge_explorer_db_query_duration_seconds_count", (("statement", "SELECT"),))] == 2
+    # Only the workers' files are read, not this process's own registry
+    assert not any(name == "knowledge_explorer_cache_lookups_total" and ("tier", "l1") in labels
+                   for name, labels in samples)
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+import sqlalchemy as sa
+from flask_migrate import upgrade
+
+from conftest import BACKEND_DIR
+
+MIGRATIONS = os.path.join(BACKEND_DIR, "migrations")
+
+
+@pytest.fixture
+def legacy_db(monkeypatch, tmp_path):
+    """A separate SQLite database at the baseline revision; migrations/env.py reads DATABASE_URL."""
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    upgrade(directory=MIGRATIONS, revision="0001_baseline")
+    engine = sa.create_engine(url)
+    yield engine
+    engine.dispose()
+
+
+def _columns(engine, table):
+    return {column["name"] for column in sa.inspect(engine).get_columns(table)}
+
+
+def test_baseline_is_the_schema_before_migrations_were_tracked(legacy_db):
+    assert _columns(legacy_db, "articles") == {"id", "topic", "full_text", "internal_links", "retrieved_at"}
+    assert _columns(legacy_db, "summaries") == {
+        "id", "topic", "basic_summary", "intermediate_summary", "advanced_summary", "generated_at"
+    }
+
+
+def test_upgrade_from_the_baseline_adds_article_revisions(legacy_db):
+    with legacy_db.begin() as conn:
+        conn.execute(sa.text("INSERT INTO articles (topic, full_text) VALUES ('Black hole', 'A region of spacetime.')"))
+
+    upgrade(directory=MIGRATIONS)
+
+    assert "revid" in _columns(legacy_db, "articles")
+    with legacy_db.connect() as conn:
+        assert conn.execute(sa.text("SELECT topic, revid FROM articles")).all() == [("Black hole", None)]
+
+
+def test_upgrade_from_the_baseline_backfills_summary_level_timestamps(legacy_db):
+    generated_at = "2026-01-02 03:04:05.000000"
+    with legacy_db.begin() as conn:
+        conn.execute(sa.text("INSERT INTO articles (topic, full_text) VALUES ('Black hole', 'A region of spacetime.')"))
+        conn.execute(
+            sa.text("INSERT INTO summaries (topic, basic_summary, generated_at) VALUES ('Black hole', 'Gravity wins.', :at)"),
+            {"at": generated_at}
+        )
+
+    upgrade(directory=MIGRATIONS)
+
+    with legacy_db.connect() as conn:
+        row = conn.execute(sa.text(
+            "SELECT basic_generated_at, intermediate_generated_at, advanced_generated_at FROM summaries"
+        )).one()
+    assert tuple(row) == (generated_at, None, None)
@@ -0,0 +1,62 @@
+import pytest
+
+import app.ranking as ranking
+from app.cache import GRAPH_SCORES_FRESH_KEY, redis_client
+from app.database import store_canonical_topics_in_db
+from app.singleflight import acquire_lease
+
+GRAPH = {
+    "Black hole": ["Event_horizon", "General_relativity", "Neutron_star"],
+    "Neutron star": ["General_relativity"],
+    "Pulsar": ["Neutron_star", "General_relativity"]
+}
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ranking, "get_link_graph_from_db", lambda: GRAPH)
+    monkeypatch.setattr(ranking, "schedule_graph_scores_refresh", lambda: calls.append(True))
+    return calls
+
+
+def test_local_ranking_reads_the_precomputed_scores(scheduled):
+    assert ranking.refresh_graph_scores() == 5
+
+    path = ranking.rank_links_locally("Black hole", ["Event_horizon", "Neutron_star", "General_relativity"])
+
+    # General relativity is linked from every other article
+    assert path[0] == "General relativity"
+    assert scheduled == []
+
+
+def test_stale_scores_are_used_and_recomputed_in_the_background(scheduled, monkeypatch):
+    ranking.refresh_graph_scores()
+    redis_client.delete(GRAPH_SCORES_FRESH_KEY)
+    monkeypatch.setattr(ranking, "get_link_graph_from_db", lambda: pytest.fail("scores were recomputed inline"))
+
+    path = ranking.rank_links_locally("Black hole", ["Event_horizon", "Neutron_star", "General_relativity"])
+
+    assert path[0] == "General relativity"
+    assert scheduled == [True]
+
+
+def test_without_scores_the_article_order_decides(scheduled):
+    links = ["Event_horizon", "Neutron_star", "General_relativity"]
+
+    assert ranking.rank_links_locally("Black hole", links) == ["Event horizon", "Neutron star", "General relativity"]
+    assert scheduled == [True]
+
+
+def test_one_recompute_at_a_time(scheduled):
+    acquire_lease("graph_scores", "*")
+
+    assert ranking.refresh_graph_scores() is None
+
+
+def test_local_ranking_returns_canonical_titles(scheduled):
+    store_canonical_topics_in_db({"Neutron_stars": "Neutron star", "Black_holes": "Black hole"})
+    links = ["Black_holes", "Neutron_stars", "Neutron_star", "Event_horizon"]
+
+    # Redirects resolve to titles already in the path, or to the topic itself
+    assert ranking.rank_links_locally("Black hole", links) == ["Neutron star", "Event horizon"]
@@ -0,0 +1,82 @@
+import pytest
+
+import app.search as search
+from app import db
+from app.database import store_ingested_page_in_db
+
+PAGES = {
+    "Black hole": "A black hole is a region of spacetime where gravity prevents anything from escaping.",
+    "Supermassive black hole": "A supermassive black hole is the largest type of black hole.",
+    "Hawking radiation": "Hawking radiation is thermal radiation released outside a black hole's event horizon.",
+    "Photosynthesis": "Photosynthesis is a process used by plants to convert light energy into chemical energy."
+}
+
+
+@pytest.fixture
+def stored_pages():
+    for topic, intro in PAGES.items():
+        store_ingested_page_in_db(topic, {"title": topic, "revid": 1, "intro": intro, "links": []})
+
+
+@pytest.fixture
+def wikipedia_search(monkeypatch):
+    calls = []
+
+    def search_wikipedia(query, limit):
+        calls.append(query)
+        return ["Black hole (disambiguation)"]
+
+    monkeypatch.setattr(search, "search_wikipedia", search_wikipedia)
+    return calls
+
+
+def test_stored_articles_are_searched_first(client, stored_pages, wikipedia_search):
+    body = client.get("/search?q=black hole").get_json()
+
+    assert body["source"] == "local"
+    assert {result["topic"] for result in body["results"]} == {"Black hole", "Supermassive black hole", "Hawking radiation"}
+    assert body["next_cursor"] is None
+    assert wikipedia_search == []
+
+
+def test_cursor_pages_through_every_match_once(client, stored_pages):
+    first = client.get("/search?q=black hole&limit=2").get_json()
+    second = client.get(f"/search?q=black hole&limit=2&cursor={first['next_cursor']}").get_json()
+
+    assert len(first["results"]) == 2
+    assert first["next_cursor"]
+    assert len(second["results"]) == 1
+    assert second["next_cursor"] is None
+    topics = [result["topic"] for result in first["results"] + second["results"]]
+    assert sorted(topics) == ["Black hole", "Hawking radiation", "Supermassive black hole"]
+
+
+def test_no_local_match_falls_back_to_wikipedia(client, stored_pages, wikipedia_search):
+    body = client.get("/search?q=quasar").get_json()
+
+    assert body["source"] == "wikipedia"
+    assert body["results"] == [{"topic": "Black hole (disambiguation)"}]
+    assert wikipedia_search == ["quasar"]
+
+
+def test_database_without_a_search_index_falls_back_to_wikipedia(client, monkeypatch, stored_pages, wikipedia_search):
+    bind = db.session.get_bind()
+    monkeypatch.setattr(bind.dialect, "name", "mysql")
+
+    response = client.get("/search?q=black hole")
+
+    assert response.status_code == 200
+    assert response.get_json()["source"] == "wikipedia"
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "bnVsbA==", search.encode_cursor(1.0, "x")[:-4]])
+def test_invalid_cursor_is_rejected(client, cursor):
+    response = client.get(f"/search?q=black hole&cursor={cursor}")
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor."}
+
+
+@pytest.mark.parametrize("query", ["", "q=", "q=black&limit=0", "q=black&limit=1000"])
+def test_invalid_parameters_are_rejected(client, query):
+    assert client.get(f"/search?{query}").status_code == 400
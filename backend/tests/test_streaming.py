@@ -0,0 +1,101 @@
+import json
+
+import anthropic
+import httpx
+import pytest
+
+import app.content_retrieval as content_retrieval
+from app.cache import NEGATIVE_MISSING, store_negative_topic_in_cache
+from app.content_retrieval import find_summary, save_summaries
+from app.database import store_ingested_page_in_db
+
+PIECES = ["A black hole ", "is a region ", "of spacetime."]
+
+
+@pytest.fixture(autouse=True)
+def stored_topic(monkeypatch):
+    monkeypatch.setattr(content_retrieval, "get_wiki_html", lambda topic: pytest.fail("Wikipedia was called"))
+    store_ingested_page_in_db("Black hole", {
+        "title": "Black hole",
+        "revid": 1,
+        "intro": "A black hole is a region of spacetime where gravity is so strong that nothing can escape.",
+        "links": ["Event_horizon"]
+    })
+
+
+def _model_writes(monkeypatch, pieces, error=None):
+    def stream_level_summary(text, level):
+        for piece in pieces:
+            yield piece
+        if error:
+            raise error
+        return "".join(pieces)
+
+    monkeypatch.setattr(content_retrieval, "stream_level_summary", stream_level_summary)
+
+
+def _events(response):
+    """Split an SSE body into (event, data) pairs, checking the framing."""
+    body = response.get_data(as_text=True)
+    assert body.endswith("\n\n")
+    events = []
+    for frame in body[:-2].split("\n\n"):
+        event_line, data_line = frame.split("\n")
+        assert event_line.startswith("event: ")
+        assert data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+def test_stream_sends_deltas_then_done(client, monkeypatch):
+    _model_writes(monkeypatch, PIECES)
+
+    response = client.get("/summary/Black hole/stream")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    events = _events(response)
+    assert events[:-1] == [("delta", {"text": piece}) for piece in PIECES]
+    assert events[-1] == ("done", {"topic": "Black hole", "level": "basic", "summary": "".join(PIECES)})
+    assert find_summary("Black hole", "basic") == "".join(PIECES)
+
+
+def test_stored_summary_is_sent_as_one_delta(client, monkeypatch):
+    save_summaries("Black hole", {"advanced": "Stored summary."})
+    _model_writes(monkeypatch, [], error=AssertionError("the model was called"))
+
+    events = _events(client.get("/summary/Black hole/stream?level=advanced"))
+
+    assert events == [
+        ("delta", {"text": "Stored summary."}),
+        ("done", {"topic": "Black hole", "level": "advanced", "summary": "Stored summary."})
+    ]
+
+
+def test_api_error_mid_stream_ends_with_an_error_event(client, monkeypatch):
+    error = anthropic.APIConnectionError(request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"))
+    _model_writes(monkeypatch, PIECES[:1], error=error)
+
+    events = _events(client.get("/summary/Black hole/stream"))
+
+    assert events[0] == ("delta", {"text": PIECES[0]})
+    assert events[-1] == ("error", {"error": "Failed to retrieve summary for 'Black hole'"})
+    assert find_summary("Black hole", "basic") is None
+
+
+def test_empty_summary_ends_with_an_error_event(client, monkeypatch):
+    _model_writes(monkeypatch, [])
+
+    events = _events(client.get("/summary/Black hole/stream"))
+
+    assert events == [("error", {"error": "Failed to retrieve summary for 'Black hole'"})]
+
+
+def test_errors_before_the_stream_are_plain_json(client):
+    store_negative_topic_in_cache("Qwxzv", NEGATIVE_MISSING)
+
+    assert client.get("/summary/Black hole/stream?level=expert").status_code == 400
+    response = client.get("/summary/Qwxzv/stream")
+    assert response.status_code == 404
+    assert "error" in response.get_json()
@@ -0,0 +1,86 @@
+import pytest
+
+import app.suggest as suggest
+from app.suggest import PrefixIndex, _entry_size
+
+TITLES = ["Black hole", "Black body", "Blackbody radiation", "Blue whale", "Neutron star"]
+
+
+@pytest.fixture
+def index():
+    index = PrefixIndex()
+    index.load(TITLES)
+    return index
+
+
+def _budget_for(*titles):
+    index = PrefixIndex()
+    return sum(_entry_size(index._entry(title)) for title in titles)
+
+
+def test_search_matches_normalized_prefixes_in_order(index):
+    assert index.search("black") == ["Black body", "Black hole", "Blackbody radiation"]
+    assert index.search("  BLACK_h") == ["Black hole"]
+    assert index.search("black", limit=2) == ["Black body", "Black hole"]
+    assert index.search("   ") == []
+
+
+def test_added_titles_are_searchable_before_they_are_merged(index):
+    index.add(["Black dwarf", "Black hole"])
+
+    assert index._recent
+    assert index.search("black") == ["Black body", "Black dwarf", "Black hole", "Blackbody radiation"]
+    assert index.stats()["titles"] == len(TITLES) + 1
+
+
+def test_recent_titles_are_merged_at_the_threshold(index, monkeypatch):
+    monkeypatch.setattr(suggest, "MERGE_THRESHOLD", 2)
+
+    index.add(["Black dwarf"])
+    assert len(index._recent) == 1
+    index.add(["Blazar", "Black dwarf"])
+
+    assert index._recent == []
+    assert index._entries == sorted(index._entries)
+    assert index.search("bla") == ["Black body", "Black dwarf", "Black hole", "Blackbody radiation", "Blazar"]
+
+
+def test_load_keeps_titles_added_while_it_ran(index):
+    index.add(["Black dwarf"])
+
+    index.load(["Black hole", "Quasar"])
+
+    assert index._recent == []
+    assert index.search("b", limit=25) == [
+        "Black body", "Black dwarf", "Black hole", "Blackbody radiation", "Blue whale"
+    ]
+    assert index.search("quasar") == ["Quasar"]
+
+
+def test_load_drops_titles_over_the_budget():
+    index = PrefixIndex(max_bytes=_budget_for("Black hole", "Blue whale"))
+
+    index.load(["Black hole", "Blue whale", "Neutron star"])
+
+    stats = index.stats()
+    assert stats["titles"] == 2
+    assert stats["dropped"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert index.search("neutron") == []
+
+
+def test_add_stops_at_the_budget():
+    index = PrefixIndex(max_bytes=_budget_for("Black hole", "Blue whale"))
+    index.load(["Black hole"])
+
+    index.add(["Blue whale", "Neutron star", "Black hole"])
+
+    stats = index.stats()
+    assert stats["titles"] == 2
+    assert stats["dropped"] == 1
+    assert stats["bytes"] == stats["max_bytes"]
+    assert index.search("neutron") == []
+
+    # A reload starts the count again
+    index.load(["Black hole"])
+    assert index.stats()["dropped"] == 0
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+import requests
+
+import app.wikipedia as wikipedia
+from app.warmup import load_progress
+
+
+@pytest.fixture
+def warm(app, tmp_path):
+    topics_file = tmp_path / "topics.txt"
+    progress_file = tmp_path / "progress.jsonl"
+
+    def run(topics, *options):
+        topics_file.write_text("\n".join(topics), encoding="utf-8")
+        result = app.test_cli_runner().invoke(
+            args=["cache", "warm", str(topics_file), "--progress", str(progress_file), *options]
+        )
+        entries = [json.loads(line) for line in progress_file.read_text(encoding="utf-8").splitlines()] \
+            if progress_file.exists() else []
+        return result, entries, str(progress_file)
+    return run
+
+
+def test_failed_title_lookup_is_retried_on_resume(warm, monkeypatch):
+    def wiki_get(params):
+        raise requests.ConnectionError("connection reset")
+    monkeypatch.setattr(wikipedia, "wiki_get", wiki_get)
+
+    result, entries, progress_path = warm(["Black hole"])
+
+    assert result.exit_code == 0
+    assert [entry["status"] for entry in entries] == ["failed"]
+    assert load_progress(progress_path) == set()
+
+
+def test_missing_title_is_not_retried(warm, monkeypatch):
+    monkeypatch.setattr(wikipedia, "wiki_get", lambda params: {
+        "query": {"pages": {"-1": {"ns": 0, "title": "Blakc hole", "missing": ""}}}
+    })
+
+    result, entries, progress_path = warm(["Blakc hole"])
+
+    assert result.exit_code == 0
+    assert [entry["status"] for entry in entries] == ["missing"]
+    assert load_progress(progress_path) == {"Blakc hole"}
+
+
+@pytest.mark.parametrize("option", ["--wiki-rate", "--anthropic-rate"])
+def test_rates_must_be_positive(warm, option):
+    result, entries, _ = warm(["Black hole"], option, "0")
+
+    assert result.exit_code == 2
+    assert entries == []
@@ -0,0 +1,98 @@
+import app.wiki_client as wiki_client
+import app.wikipedia as wikipedia
+from app.database import get_article_revision_from_db, store_ingested_page_in_db
+from app.wikipedia import extract_intro_and_links, extract_parsed_page, get_wiki_html
+
+SHORT_LEAD = """
+<div class="mw-parser-output">
+  <p><b>Mercury</b> is the first planet from the <a href="/wiki/Sun">Sun</a>
+  and the smallest in the <a href="/wiki/Solar_System">Solar System</a>.</p>
+  <ul><li><a href="/wiki/Mercury_(element)">Mercury (element)</a></li></ul>
+</div>
+"""
+
+DISAMBIGUATION = """
+<div class="mw-parser-output">
+  <p><b>Mercury</b> may refer to:</p>
+  <ul>
+    <li><a href="/wiki/Mercury_(planet)">Mercury (planet)</a></li>
+    <li><a href="/wiki/Mercury_(element)">Mercury (element)</a></li>
+  </ul>
+</div>
+"""
+
+
+def test_short_lead_keeps_its_paragraph_links():
+    intro, links = extract_intro_and_links(SHORT_LEAD, lead_only=True)
+
+    assert intro.startswith("Mercury is the first planet")
+    assert links == ["Sun", "Solar_System"]
+
+
+def test_short_full_page_is_treated_as_disambiguation():
+    _, links = extract_intro_and_links(DISAMBIGUATION)
+
+    assert links == ["Mercury_(planet)", "Mercury_(element)"]
+
+
+def test_flagged_disambiguation_lead_uses_its_lists(monkeypatch):
+    monkeypatch.setattr(wikipedia, "INGEST_MODE", "lead")
+    data = {"parse": {
+        "title": "Mercury",
+        "revid": 7,
+        "text": {"*": DISAMBIGUATION},
+        "properties": [{"name": "disambiguation", "*": ""}]
+    }}
+
+    assert extract_parsed_page("Mercury", data)["links"] == ["Mercury_(planet)", "Mercury_(element)"]
+
+
+def test_unflagged_lead_uses_its_paragraphs(monkeypatch):
+    monkeypatch.setattr(wikipedia, "INGEST_MODE", "lead")
+    data = {"parse": {"title": "Mercury (planet)", "revid": 7, "text": {"*": SHORT_LEAD}}}
+
+    assert extract_parsed_page("Mercury (planet)", data)["links"] == ["Sun", "Solar_System"]
+
+
+def _wikipedia_at(monkeypatch, revid):
+    calls = []
+
+    def wiki_get(params):
+        calls.append(params.get("action"))
+        if params["action"] == "parse":
+            return {"parse": {"title": "Mercury (planet)", "revid": revid, "text": {"*": SHORT_LEAD}}}
+        return {"query": {"pages": {"1": {"title": "Mercury (planet)", "revisions": [{"revid": revid}]}}}}
+
+    monkeypatch.setattr(wikipedia, "wiki_get", wiki_get)
+    monkeypatch.setattr(wiki_client, "wiki_get", wiki_get)
+    monkeypatch.setattr(wikipedia, "needs_link_top_up", lambda links: False)
+    return calls
+
+
+def test_new_page_is_parsed_without_a_revision_probe(monkeypatch):
+    calls = _wikipedia_at(monkeypatch, 7)
+
+    assert get_wiki_html("Mercury (planet)") == "Mercury (planet)"
+    assert calls == ["parse"]
+    assert get_article_revision_from_db("Mercury (planet)") == 7
+
+
+def test_stored_page_at_the_same_revision_is_not_reparsed(monkeypatch):
+    store_ingested_page_in_db("Mercury (planet)", {
+        "title": "Mercury (planet)", "revid": 7, "intro": "Mercury is a planet.", "links": ["Sun"]
+    })
+    calls = _wikipedia_at(monkeypatch, 7)
+
+    assert get_wiki_html("Mercury (planet)") == "Mercury (planet)"
+    assert calls == ["query"]
+
+
+def test_stored_page_at_a_new_revision_is_reparsed(monkeypatch):
+    store_ingested_page_in_db("Mercury (planet)", {
+        "title": "Mercury (planet)", "revid": 7, "intro": "Mercury is a planet.", "links": ["Sun"]
+    })
+    calls = _wikipedia_at(monkeypatch, 8)
+
+    assert get_wiki_html("Mercury (planet)") == "Mercury (planet)"
+    assert calls == ["query", "parse"]
+    assert get_article_revision_from_db("Mercury (planet)") == 8